@@ -0,0 +1 @@
+"""Micro-benchmarks for the template generation pipeline."""
@@ -0,0 +1,78 @@
+"""Drive requests straight through an ASGI app, without a server or HTTP client."""
+import asyncio
+import time
+from typing import List, Optional, Tuple
+
+# (method, path, body, expected status)
+Request = Tuple[str, str, bytes, int]
+
+
+async def call_asgi(app, method: str, path: str, body: bytes = b"",
+                    expected_status: Optional[int] = None) -> bytes:
+    """Send one request through an ASGI app and return the response body."""
+    path, _, query = path.partition("?")
+    headers = [(b"content-length", str(len(body)).encode())]
+    if body:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 12345),
+        "server": ("127.0.0.1", 80),
+    }
+    sent = False
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            if expected_status is not None and message["status"] != expected_status:
+                raise RuntimeError(f"{method} {path}: unexpected status {message['status']}")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(chunks)
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def measure_requests(app, requests: List[Request], number: int) -> dict:
+    """Replay requests number times after one warm-up pass.
+
+    Returns p50/p99 wall latency and mean CPU time per request, in microseconds.
+    """
+    for request in requests:
+        await call_asgi(app, *request)
+
+    latencies = []
+    cpu_started = time.process_time()
+    for _ in range(number):
+        for request in requests:
+            started = time.perf_counter()
+            await call_asgi(app, *request)
+            latencies.append(time.perf_counter() - started)
+    cpu = time.process_time() - cpu_started
+
+    return {
+        "p50_us": round(percentile(latencies, 0.50) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 0.99) * 1e6, 1),
+        "cpu_us_per_request": round(cpu / len(latencies) * 1e6, 1),
+    }
@@ -0,0 +1,35 @@
+"""Time template generation per language, bypassing the service cache.
+
+Run with ``python -m benchmarks.bench_generation``. Prints one JSON object
+per language with the mean time to generate each template in the corpus.
+"""
+import json
+import timeit
+
+from src.generators.factory import GeneratorFactory
+
+from .corpus import LANGUAGES, SIGNATURES
+
+
+def run(number: int = 2000) -> list:
+    results = []
+    for language in LANGUAGES:
+        generator = GeneratorFactory.get_generator(language)
+
+        def generate_all():
+            for signature in SIGNATURES:
+                generator.generate_template(signature)
+
+        seconds = min(timeit.repeat(generate_all, number=number, repeat=3))
+        per_template = seconds / (number * len(SIGNATURES))
+        results.append({
+            "language": language,
+            "ns_per_template": round(per_template * 1e9, 1),
+            "templates_per_second": round(1 / per_template),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    for result in run():
+        print(json.dumps(result))
@@ -0,0 +1,116 @@
+"""Time the I/O overhead of generated harnesses on multi-MB inputs.
+
+Run with ``python -m benchmarks.bench_harness``. Each generated template is
+run in a fresh process with its solution returning its input unchanged, so
+the wall time is the harness itself: start-up, reading and parsing stdin,
+and writing the result. "default" is the standard prologue, "fast_io" the
+one emitted with ``GenerationOptions(fast_io=True)`` and "binary" reads the
+same numbers in the ``input_format="binary"`` layout. C++ templates are
+compiled first and only the binary is timed. Languages whose toolchain is
+not installed are skipped.
+"""
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from src.binary_format import encode_test_case
+from src.generators.factory import GeneratorFactory
+from src.models import FunctionSignature, GenerationOptions, InputFormat
+
+SIGNATURE = FunctionSignature(function_name="echo",
+                              parameters=[{"name": "nums", "type": "int[]"}],
+                              returns={"type": "int[]"})
+
+SIZES = [100000, 1000000]
+
+VARIANTS = {
+    "default": GenerationOptions(),
+    "fast_io": GenerationOptions(fast_io=True),
+    "binary": GenerationOptions(fast_io=True, input_format=InputFormat.BINARY),
+}
+
+# language -> (file name, command prefix, solution body replacing the placeholder)
+RUNNERS = {
+    "python": ("solution.py", [sys.executable], "        return nums"),
+    "javascript": ("solution.js", ["node"], "    return nums;"),
+    "cpp": ("solution.cpp", [], "        return nums;"),
+}
+
+_PLACEHOLDER = re.compile(r"( *)# Write your logic here\n *pass|( *)// Write your logic here\n *[^\n]*")
+
+
+def nlohmann_include_dir() -> Optional[str]:
+    """Find an include directory containing nlohmann/json.hpp, or None."""
+    candidates = [os.environ.get("NLOHMANN_JSON_INCLUDE"), "/usr/include", "/usr/local/include", "/opt/homebrew/include"]
+    for prefix_tool in ("conda", "brew"):
+        tool = shutil.which(prefix_tool)
+        if tool:
+            candidates.append(os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(tool))), "include"))
+    for candidate in candidates:
+        if candidate and os.path.exists(os.path.join(candidate, "nlohmann", "json.hpp")):
+            return candidate
+    return None
+
+
+def compile_cpp(source_path: str, binary_path: str) -> None:
+    """Compile a generated C++ template the way a judge would."""
+    include = nlohmann_include_dir()
+    subprocess.run(["g++", "-std=c++17", "-O2", f"-I{include}", source_path, "-o", binary_path],
+                   check=True, capture_output=True)
+
+
+def _available(language: str) -> bool:
+    if language == "cpp":
+        return shutil.which("g++") is not None and nlohmann_include_dir() is not None
+    return shutil.which(RUNNERS[language][1][0]) is not None
+
+
+def _run_seconds(command: list, payload: bytes) -> float:
+    started = time.perf_counter()
+    subprocess.run(command, input=payload, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - started
+
+
+def run(number: int = 5) -> list:
+    results = []
+    for size in SIZES:
+        values = {"nums": [random.randint(-10**9, 10**9) for _ in range(size)]}
+        payloads = {
+            InputFormat.JSON: json.dumps(values).encode(),
+            InputFormat.BINARY: encode_test_case(SIGNATURE, values),
+        }
+        for language, (filename, command, body) in RUNNERS.items():
+            if not _available(language):
+                continue
+            generator = GeneratorFactory.get_generator(language)
+            for variant, options in VARIANTS.items():
+                payload = payloads[options.input_format]
+                template = _PLACEHOLDER.sub(lambda _: body, generator.generate_template(SIGNATURE, options), count=1)
+                with tempfile.TemporaryDirectory() as directory:
+                    path = os.path.join(directory, filename)
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(template)
+                    if language == "cpp":
+                        binary = os.path.join(directory, "solution")
+                        compile_cpp(path, binary)
+                        path = binary
+                    seconds = min(_run_seconds(command + [path], payload) for _ in range(number))
+                results.append({
+                    "language": language,
+                    "variant": variant,
+                    "input_mb": round(len(payload) / 1e6, 1),
+                    "harness_ms": round(seconds * 1e3, 1),
+                })
+    return results
+
+
+if __name__ == "__main__":
+    for result in run():
+        print(json.dumps(result))
@@ -0,0 +1,39 @@
+"""End-to-end latency of the HTTP routes, driven through the ASGI app in-process.
+
+Run with ``python -m benchmarks.bench_http``. Covers ``POST /api/v1/template``,
+its cacheable GET form and ``POST /api/v1/template/batch`` (the whole corpus
+in one language per request), with the template cache warm.
+"""
+import asyncio
+import json
+
+from src.main import app, template_url
+
+from .asgi import measure_requests
+from .corpus import LANGUAGES, SIGNATURES, request_bodies, request_body
+
+
+async def run_async(number: int) -> list:
+    results = []
+    for language in LANGUAGES:
+        routes = {
+            "post": [("POST", "/api/v1/template", body, 201) for body in request_bodies(language)],
+            "get": [("GET", template_url(signature, language), b"", 200) for signature in SIGNATURES],
+            "batch": [("POST", "/api/v1/template/batch", json.dumps({
+                "items": [request_body(signature, language) for signature in SIGNATURES]
+            }).encode(), 200)],
+        }
+        for route, requests in routes.items():
+            result = {"language": language, "route": route}
+            result.update(await measure_requests(app, requests, number))
+            results.append(result)
+    return results
+
+
+def run(number: int = 200) -> list:
+    return asyncio.run(run_async(number))
+
+
+if __name__ == "__main__":
+    for result in run():
+        print(json.dumps(result))
@@ -0,0 +1,41 @@
+"""Measure type mapper throughput over the corpus types.
+
+Run with ``python -m benchmarks.bench_mappers``. For each language, "warm"
+maps every corpus type with the parse cache populated (the steady state of
+a server), "cold" clears the parse cache first so each type is re-parsed.
+"""
+import json
+import timeit
+
+from src.type_mappers import get_type_mapper, parse_type
+
+from .corpus import LANGUAGES, TYPES
+
+
+def run(number: int = 5000) -> list:
+    results = []
+    for language in LANGUAGES:
+        mapper = get_type_mapper(language)
+
+        def map_all():
+            for dsl_type in TYPES:
+                mapper.map_type(dsl_type)
+
+        def map_all_cold():
+            parse_type.cache_clear()
+            map_all()
+
+        warm = min(timeit.repeat(map_all, number=number, repeat=3)) / (number * len(TYPES))
+        cold = min(timeit.repeat(map_all_cold, number=number, repeat=3)) / (number * len(TYPES))
+        results.append({
+            "language": language,
+            "warm_ns_per_type": round(warm * 1e9, 1),
+            "cold_ns_per_type": round(cold * 1e9, 1),
+            "types_per_second": round(1 / warm),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    for result in run():
+        print(json.dumps(result))
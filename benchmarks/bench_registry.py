@@ -0,0 +1,80 @@
+"""Compare per-request generator construction with the shared registry.
+
+Run with ``python -m benchmarks.bench_registry``. Prints one JSON object per
+language with the time and retained memory per lookup for both paths.
+"""
+import json
+import timeit
+import tracemalloc
+
+from src.generators.factory import GeneratorFactory
+from src.type_mappers import (
+    CppTypeMapper,
+    JavaScriptTypeMapper,
+    JavaTypeMapper,
+    PythonTypeMapper,
+)
+
+from .corpus import LANGUAGES
+
+
+def legacy_get_type_mapper(language: str):
+    """The pre-registry get_type_mapper: builds four mappers to return one."""
+    mappers = {
+        'python': PythonTypeMapper(),
+        'java': JavaTypeMapper(),
+        'cpp': CppTypeMapper(),
+        'javascript': JavaScriptTypeMapper()
+    }
+    
+    if language not in mappers:
+        raise ValueError(f"Unsupported language: {language}")
+    
+    return mappers[language]
+
+
+def construct_per_request(language: str):
+    """The old hot path: a new generator running the old TemplateGenerator.__init__."""
+    generator_class = GeneratorFactory._generators[language]
+    generator = generator_class.__new__(generator_class)
+    generator.language = language
+    generator.type_mapper = legacy_get_type_mapper(language)
+    return generator
+
+
+def registry_lookup(language: str):
+    """The current hot path: a dictionary lookup of the shared instance."""
+    return GeneratorFactory.get_generator(language)
+
+
+def retained_bytes_per_call(func, language: str, calls: int = 10000) -> float:
+    """Average bytes still allocated per call while all results are alive."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    results = [func(language) for _ in range(calls)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return (after - before) / calls
+
+
+def seconds_per_call(func, language: str, calls: int = 100000) -> float:
+    return min(timeit.repeat(lambda: func(language), number=calls, repeat=3)) / calls
+
+
+def run(number: int = 100000) -> list:
+    results = []
+    for language in LANGUAGES:
+        results.append({
+            "language": language,
+            "per_request_ns": round(seconds_per_call(construct_per_request, language, number) * 1e9, 1),
+            "registry_ns": round(seconds_per_call(registry_lookup, language, number) * 1e9, 1),
+            "per_request_bytes": round(retained_bytes_per_call(construct_per_request, language), 1),
+            "registry_bytes": round(retained_bytes_per_call(registry_lookup, language), 1),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    for result in run():
+        print(json.dumps(result))
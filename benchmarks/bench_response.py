@@ -0,0 +1,63 @@
+"""Compare the template route's response serialization before and after FastJSONResponse.
+
+Run with ``python -m benchmarks.bench_response``. Both routes share one
+TemplateService with a warm cache, so the numbers isolate the HTTP layer:
+"model" returns a TemplateResponse through FastAPI's response_model path
+(the original route), "fast" returns the pre-built FastJSONResponse used by
+``POST /api/v1/template``. Requests are driven straight through the ASGI
+app, and each result line reports p50/p99 wall latency and mean CPU time
+per request for one language.
+"""
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import FastAPI, Header, Response, status
+
+from src.cache import template_cache_key, template_etag
+from src.main import app as fast_app, _etag_matches, _render_template, template_url
+from src.models import TemplateRequest, TemplateResponse
+
+from .asgi import measure_requests
+from .corpus import LANGUAGES, request_bodies
+
+model_app = FastAPI()
+
+
+@model_app.post("/api/v1/template", response_model=TemplateResponse, status_code=status.HTTP_201_CREATED)
+async def generate_template_model(
+    request: TemplateRequest,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
+    """The route as it was before FastJSONResponse: same headers, model return."""
+    headers = {
+        "ETag": template_etag(template_cache_key(request.signature, request.language)),
+        "Content-Location": template_url(request.signature, request.language.value)
+    }
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    result = _render_template(request)
+    response.headers.update(headers)
+    return result
+
+
+async def run_async(number: int) -> list:
+    results = []
+    for language in LANGUAGES:
+        requests = [("POST", "/api/v1/template", body, 201) for body in request_bodies(language)]
+        for variant, app in (("model", model_app), ("fast", fast_app)):
+            result = {"language": language, "variant": variant}
+            result.update(await measure_requests(app, requests, number))
+            results.append(result)
+    return results
+
+
+def run(number: int = 400) -> list:
+    return asyncio.run(run_async(number))
+
+
+if __name__ == "__main__":
+    for result in run():
+        print(json.dumps(result))
@@ -0,0 +1,42 @@
+"""Time TemplateService.generate_template with and without the template cache.
+
+Run with ``python -m benchmarks.bench_service``. "uncached" measures the
+full request path (key building, generation, response model) on a service
+with the cache disabled, "cached" the same calls answered from the cache.
+"""
+import json
+import timeit
+
+from src.models import TemplateRequest
+from src.service import TemplateService
+
+from .corpus import LANGUAGES, SIGNATURES, request_body
+
+
+def run(number: int = 2000) -> list:
+    services = {
+        "uncached": TemplateService(cache_enabled=False),
+        "cached": TemplateService(),
+    }
+    results = []
+    for language in LANGUAGES:
+        requests = [TemplateRequest.model_validate(request_body(signature, language)) for signature in SIGNATURES]
+        for variant, service in services.items():
+            def generate_all():
+                for request in requests:
+                    service.generate_template(request)
+
+            generate_all()
+            per_request = min(timeit.repeat(generate_all, number=number, repeat=3)) / (number * len(requests))
+            results.append({
+                "language": language,
+                "variant": variant,
+                "ns_per_request": round(per_request * 1e9, 1),
+                "requests_per_second": round(1 / per_request),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    for result in run():
+        print(json.dumps(result))
@@ -0,0 +1,56 @@
+"""Shared benchmark corpus: realistic signatures and the request bodies built from them."""
+import json
+from typing import List
+
+from src.models import FunctionSignature
+
+LANGUAGES = ['python', 'java', 'cpp', 'javascript']
+
+SIGNATURES = [
+    FunctionSignature(function_name="fibonacci",
+                      parameters=[{"name": "n", "type": "int"}],
+                      returns={"type": "int"}),
+    FunctionSignature(function_name="isPalindrome",
+                      parameters=[{"name": "s", "type": "string"}],
+                      returns={"type": "bool"}),
+    FunctionSignature(function_name="twoSum",
+                      parameters=[{"name": "nums", "type": "int[]"}, {"name": "target", "type": "int"}],
+                      returns={"type": "int[]"}),
+    FunctionSignature(function_name="groupAnagrams",
+                      parameters=[{"name": "strs", "type": "List<string>"}],
+                      returns={"type": "List<List<string>>"}),
+    FunctionSignature(function_name="merge",
+                      parameters=[{"name": "intervals", "type": "List<List<int>>"}],
+                      returns={"type": "List<List<int>>"}),
+    FunctionSignature(function_name="numIslands",
+                      parameters=[{"name": "grid", "type": "int[][]"}],
+                      returns={"type": "int"}),
+    FunctionSignature(function_name="invertTree",
+                      parameters=[{"name": "root", "type": "Tree<int>"}],
+                      returns={"type": "Tree<int>"}),
+    FunctionSignature(function_name="isSameTree",
+                      parameters=[{"name": "p", "type": "Tree<int>"}, {"name": "q", "type": "Tree<int>"}],
+                      returns={"type": "bool"}),
+    FunctionSignature(function_name="detectCycle",
+                      parameters=[{"name": "graph", "type": "Graph"}],
+                      returns={"type": "bool"}),
+]
+
+TYPES = sorted({param.type for signature in SIGNATURES for param in signature.parameters}
+               | {signature.returns.type for signature in SIGNATURES})
+
+
+def request_body(signature: FunctionSignature, language: str) -> dict:
+    """Build a TemplateRequest payload for one corpus signature."""
+    return {
+        "question_id": signature.function_name,
+        "title": signature.function_name,
+        "description": "",
+        "signature": signature.model_dump(),
+        "language": language,
+    }
+
+
+def request_bodies(language: str) -> List[bytes]:
+    """Encoded TemplateRequest payloads for the whole corpus in one language."""
+    return [json.dumps(request_body(signature, language)).encode() for signature in SIGNATURES]
@@ -0,0 +1,146 @@
+"""Run the benchmark suite and write machine-readable results.
+
+Usage::
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --only generation mappers --quick
+    python -m benchmarks.run --compare baseline.json --threshold 0.15
+
+The output is one JSON document: run metadata plus one row per measurement,
+tagged with its benchmark name. With ``--compare``, every metric is checked
+against the matching row of an earlier run and the exit code is 1 if any got
+worse by more than the threshold.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.generators import GENERATOR_VERSION
+
+from . import (
+    bench_generation,
+    bench_harness,
+    bench_http,
+    bench_mappers,
+    bench_registry,
+    bench_response,
+    bench_service,
+)
+
+# name -> (run function, iterations for a full run, iterations with --quick)
+SUITES = {
+    "generation": (bench_generation.run, 2000, 100),
+    "mappers": (bench_mappers.run, 5000, 200),
+    "service": (bench_service.run, 2000, 100),
+    "registry": (bench_registry.run, 100000, 2000),
+    "http": (bench_http.run, 200, 10),
+    "response": (bench_response.run, 400, 10),
+    "harness": (bench_harness.run, 5, 1),
+}
+
+Row = Dict[str, Any]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suites(names: List[str], quick: bool = False) -> Dict[str, Any]:
+    """Run the named suites and return the results document."""
+    results: List[Row] = []
+    for name in names:
+        run, number, quick_number = SUITES[name]
+        for row in run(quick_number if quick else number):
+            results.append(dict(benchmark=name, **row))
+
+    return {
+        "metadata": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "generator_version": GENERATOR_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def _row_key(row: Row) -> Tuple:
+    return tuple(sorted((name, value) for name, value in row.items() if isinstance(value, str)))
+
+
+def _higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_second")
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Row]:
+    """Return every metric in current that regressed by more than threshold.
+
+    Rows are matched on their string fields (benchmark, language, variant...).
+    Throughput metrics (``*_per_second``) regress when they drop, everything
+    else (times and bytes) when it grows.
+    """
+    previous = {_row_key(row): row for row in baseline["results"]}
+    regressions = []
+    for row in current["results"]:
+        old = previous.get(_row_key(row))
+        if old is None:
+            continue
+        for metric, value in row.items():
+            old_value = old.get(metric)
+            if isinstance(value, str) or not isinstance(old_value, (int, float)) or old_value <= 0:
+                continue
+            change = (value - old_value) / old_value
+            if _higher_is_better(metric):
+                change = -change
+            if change > threshold:
+                regression = {name: value for name, value in row.items() if isinstance(value, str)}
+                regression.update(metric=metric, baseline=old_value, current=value, change=round(change, 3))
+                regressions.append(regression)
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Run the benchmark suite")
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITES), help="Suites to run (default: all)")
+    parser.add_argument("--quick", action="store_true", help="Few iterations, for smoke runs")
+    parser.add_argument("--output", "-o", default="-", help="Results JSON file, or - for stdout (default)")
+    parser.add_argument("--compare", help="Baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative change counted as a regression (default: 0.10)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    document = run_suites(args.only or list(SUITES), quick=args.quick)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            document["regressions"] = compare(json.load(f), document, args.threshold)
+
+    text = json.dumps(document, indent=2) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    for regression in document.get("regressions", []):
+        sys.stderr.write(f"regression: {json.dumps(regression)}\n")
+    return 1 if document.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Compact binary encoding of test case inputs.
+
+Harnesses generated with ``input_format="binary"`` read this layout from
+stdin instead of JSON. All numbers are little-endian:
+
+* ``int`` int32, ``long`` int64, ``float`` float32, ``double`` float64
+* ``bool`` one byte, 0 or 1
+* ``string`` uint32 byte length, then the UTF-8 bytes
+* ``T[]`` and ``List<T>`` uint32 element count, then each element
+
+A test case is its parameters in signature order. In multi harness mode
+test cases are simply concatenated. Trees, graphs and unknown types have
+no binary form.
+"""
+import struct
+from typing import Any, Dict, Iterable
+
+from .models import FunctionSignature
+from .type_mappers import TypeNode, parse_type
+
+
+# DSL primitive -> struct format code
+SCALAR_FORMATS = {
+    'int': 'i',
+    'long': 'q',
+    'float': 'f',
+    'double': 'd',
+    'bool': '?',
+}
+
+_COUNT = struct.Struct('<I')
+
+
+def _check_scalars(name: str, values: Iterable[Any]) -> None:
+    # struct accepts any truthy value for '?' and bools for numbers
+    if name == 'bool':
+        if not all(type(value) is bool for value in values):
+            raise ValueError("Expected booleans")
+    elif any(isinstance(value, bool) for value in values):
+        raise ValueError(f"Expected {name} values, got a boolean")
+
+
+def check_binary_type(node: TypeNode) -> None:
+    """Raise ValueError unless node can be read from the binary layout."""
+    for inner in node.walk():
+        if inner.kind == 'primitive' or inner.kind in ('array', 'list'):
+            continue
+        raise ValueError(f"Unsupported type for binary input: {inner.name}")
+
+
+def _encode(node: TypeNode, value: Any, out: bytearray) -> None:
+    if node.kind == 'primitive':
+        if node.name == 'string':
+            if not isinstance(value, str):
+                raise ValueError(f"Expected a string, got {value!r}")
+            encoded = value.encode('utf-8')
+            out += _COUNT.pack(len(encoded))
+            out += encoded
+        else:
+            _check_scalars(node.name, (value,))
+            out += struct.pack('<' + SCALAR_FORMATS[node.name], value)
+        return
+
+    if not isinstance(value, list):
+        raise ValueError(f"Expected a list, got {value!r}")
+    element = node.element
+    if element.kind == 'primitive' and element.name != 'string':
+        # One pack call for the whole array
+        _check_scalars(element.name, value)
+        out += struct.pack(f'<I{len(value)}{SCALAR_FORMATS[element.name]}', len(value), *value)
+        return
+    out += _COUNT.pack(len(value))
+    for item in value:
+        _encode(element, item, out)
+
+
+def encode_test_case(signature: FunctionSignature, values: Dict[str, Any]) -> bytes:
+    """Encode one test case, given as a parameter name -> JSON value mapping."""
+    out = bytearray()
+    for param in signature.parameters:
+        node = parse_type(param.type)
+        check_binary_type(node)
+        if param.name not in values:
+            raise ValueError(f"Missing value for parameter '{param.name}'")
+        try:
+            _encode(node, values[param.name], out)
+        except (struct.error, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid value for parameter '{param.name}': {e}")
+    return bytes(out)
+
+
+def encode_test_cases(signature: FunctionSignature, cases: Iterable[Dict[str, Any]]) -> bytes:
+    """Encode test cases back to back, as a multi-mode binary harness reads them."""
+    encoded = []
+    for index, case in enumerate(cases):
+        try:
+            encoded.append(encode_test_case(signature, case))
+        except ValueError as e:
+            raise ValueError(f"Case {index}: {e}")
+    return b''.join(encoded)
@@ -0,0 +1,295 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+from .generators import DEFAULT_OPTIONS, GENERATOR_VERSION
+from .models import FunctionSignature, GenerationOptions
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+
+TemplateKey = Tuple[str, str, Tuple[Tuple[str, str], ...], str, Tuple[Any, ...]]
+
+_OPTION_FIELDS = tuple(GenerationOptions.model_fields)
+
+
+def template_cache_key(
+    signature: FunctionSignature,
+    language: str,
+    options: Optional[GenerationOptions] = None
+) -> TemplateKey:
+    """Build the cache key for a (signature, language, options) triple.
+
+    Only the inputs the generators actually read are part of the key, so
+    requests that differ in question_id, title or description share an entry.
+    The key is a plain tuple, so a cache hit costs one dictionary lookup.
+    """
+    if options is None:
+        options = DEFAULT_OPTIONS
+    return (
+        str(getattr(language, "value", language)),
+        signature.function_name,
+        tuple((param.name, param.type) for param in signature.parameters),
+        signature.returns.type,
+        tuple(getattr(options, name) for name in _OPTION_FIELDS),
+    )
+
+
+@lru_cache(maxsize=4096)
+def template_digest(key: TemplateKey) -> str:
+    """Return a stable SHA-256 content address for a cache key.
+
+    Use this wherever the key has to leave the process (HTTP headers,
+    files, shared caches); in-process lookups use the tuple directly.
+    """
+    canonical = json.dumps(key, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def template_etag(key: TemplateKey) -> str:
+    """Return the strong HTTP ETag for the template a key generates."""
+    return f'"{GENERATOR_VERSION}-{template_digest(key)}"'
+
+
+class TemplateCache:
+    """Thread-safe, bounded LRU cache of generated templates."""
+
+    def __init__(self, max_size: int = 1024, enabled: bool = True):
+        if max_size < 0:
+            raise ValueError("Cache size cannot be negative")
+        self.max_size = max_size
+        self.enabled = enabled and max_size > 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Return the cached template for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: str) -> None:
+        """Store a template, evicting the least recently used entry if full."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def get_many(self, keys: Sequence[TemplateKey]) -> Dict[TemplateKey, str]:
+        """Return the cached templates among keys; misses are left out."""
+        found = {}
+        for key in keys:
+            value = TemplateCache.get(self, key)
+            if value is not None:
+                found[key] = value
+        return found
+    
+    def put_many(self, items: Mapping[TemplateKey, str]) -> None:
+        """Store several templates."""
+        for key, value in items.items():
+            TemplateCache.put(self, key, value)
+
+    def clear(self) -> None:
+        """Drop every cached template and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+DEFAULT_SHARED_TTL = 86400
+
+
+def shared_cache_key(key: TemplateKey) -> str:
+    """Return the shared-store key of a template; it changes with the generator version."""
+    return f"template:{GENERATOR_VERSION}:{template_digest(key)}"
+
+
+class SharedCacheBackend(ABC):
+    """A networked key-value store shared by every server process."""
+    
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """Fetch several values in one round trip; missing keys give None."""
+        pass
+    
+    @abstractmethod
+    def set_many(self, items: Mapping[str, str], ttl: int) -> None:
+        """Store several values, each expiring after ttl seconds, in one round trip."""
+        pass
+
+
+class RedisCacheBackend(SharedCacheBackend):
+    """Shared backend for Redis or any server speaking its protocol.
+    
+    ``client`` is a ``redis.Redis``-compatible object; use from_url to
+    build one from the optional redis package.
+    """
+    
+    def __init__(self, client: Any):
+        self.client = client
+    
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 0.1) -> "RedisCacheBackend":
+        """Connect lazily to url; commands fail fast after timeout seconds."""
+        if redis is None:
+            raise ValueError("The redis package is required for a Redis cache (pip install redis)")
+        return cls(redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout))
+    
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        return [
+            value.decode("utf-8") if isinstance(value, bytes) else value
+            for value in self.client.mget(keys)
+        ]
+    
+    def set_many(self, items: Mapping[str, str], ttl: int) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(key, value, ex=ttl)
+        pipeline.execute()
+
+
+class TieredTemplateCache(TemplateCache):
+    """The in-process LRU in front of a SharedCacheBackend.
+    
+    Local misses are looked up in the shared store and shared hits are kept
+    locally; new templates are written to both tiers. get_many and put_many
+    use one round trip for any number of keys. A failing backend is logged
+    and skipped for retry_after seconds, so an unreachable store only turns
+    shared lookups into misses. clear() flushes the local tier only; shared
+    entries expire after ttl seconds. A disabled cache skips both tiers.
+    """
+    
+    def __init__(
+        self,
+        backend: SharedCacheBackend,
+        max_size: int = 1024,
+        enabled: bool = True,
+        ttl: int = DEFAULT_SHARED_TTL,
+        retry_after: float = 5.0
+    ):
+        super().__init__(max_size=max_size, enabled=enabled)
+        self.backend = backend
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+        self._retry_at = 0.0
+    
+    def get(self, key: Hashable) -> Optional[str]:
+        value = super().get(key)
+        if value is None and self.enabled:
+            value = self._shared_get([key]).get(key)
+        return value
+    
+    def put(self, key: Hashable, value: str) -> None:
+        super().put(key, value)
+        if self.enabled:
+            self._shared_set({key: value})
+    
+    def get_many(self, keys: Sequence[TemplateKey]) -> Dict[TemplateKey, str]:
+        found = super().get_many(keys)
+        missing = [key for key in keys if key not in found]
+        if missing and self.enabled:
+            found.update(self._shared_get(missing))
+        return found
+    
+    def put_many(self, items: Mapping[TemplateKey, str]) -> None:
+        super().put_many(items)
+        if items and self.enabled:
+            self._shared_set(items)
+    
+    def _available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+    
+    def _backend_failed(self, error: Exception) -> None:
+        with self._lock:
+            self.shared_errors += 1
+            self._retry_at = time.monotonic() + self.retry_after
+        logger.warning("Shared template cache unavailable, retrying in %.0fs: %s", self.retry_after, error)
+    
+    def _shared_get(self, keys: Sequence[TemplateKey]) -> Dict[TemplateKey, str]:
+        if not self._available():
+            return {}
+        try:
+            values = self.backend.get_many([shared_cache_key(key) for key in keys])
+        except Exception as e:
+            self._backend_failed(e)
+            return {}
+        found = {key: value for key, value in zip(keys, values) if value is not None}
+        with self._lock:
+            self.shared_hits += len(found)
+            self.shared_misses += len(keys) - len(found)
+        super().put_many(found)
+        return found
+    
+    def _shared_set(self, items: Mapping[TemplateKey, str]) -> None:
+        if not self._available():
+            return
+        try:
+            self.backend.set_many({shared_cache_key(key): value for key, value in items.items()}, self.ttl)
+        except Exception as e:
+            self._backend_failed(e)
+    
+    def clear(self) -> None:
+        super().clear()
+        with self._lock:
+            self.shared_hits = 0
+            self.shared_misses = 0
+            self.shared_errors = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats["shared"] = {
+                "available": self._available(),
+                "ttl": self.ttl,
+                "hits": self.shared_hits,
+                "misses": self.shared_misses,
+                "errors": self.shared_errors,
+            }
+        return stats
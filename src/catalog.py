@@ -0,0 +1,142 @@
+"""Pre-generated template catalogs served from a memory-mapped file.
+
+``python -m src.cli build-catalog`` writes every template of a known set of
+requests into one file; TemplateService then answers those requests by
+reading the template straight out of the mapping. Every worker process maps
+the same file, so the operating system keeps a single page-cache copy.
+
+Layout (little-endian):
+
+* header: magic ``TPLCAT01``, the generator version (16 bytes, NUL padded),
+  the entry count (uint32) and the blob offset (uint64)
+* index: one entry per template, sorted by key digest: the SHA-256 digest
+  of the template cache key (32 bytes), the blob offset (uint64) and the
+  UTF-8 length (uint32) of the template
+* blob: the UTF-8 templates; identical templates are stored once
+"""
+import mmap
+import os
+import struct
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .cache import TemplateKey, template_digest
+from .generators import GENERATOR_VERSION
+
+
+MAGIC = b"TPLCAT01"
+
+_HEADER = struct.Struct("<8s16sIQ")
+_ENTRY = struct.Struct("<32sQI")
+_DIGEST_SIZE = 32
+
+
+def catalog_digest(key: TemplateKey) -> bytes:
+    """Return the raw SHA-256 digest a catalog indexes a cache key under."""
+    return bytes.fromhex(template_digest(key))
+
+
+def write_catalog(path: str, templates: Iterable[Tuple[bytes, str]]) -> int:
+    """Write (digest, template) pairs to a catalog file and return the entry count.
+
+    The file is written next to path and renamed over it, so processes that
+    still map an older catalog keep reading a consistent file.
+    """
+    entries: Dict[bytes, str] = dict(templates)
+    blob = bytearray()
+    offsets: Dict[str, Tuple[int, int]] = {}
+    index = bytearray()
+    for digest in sorted(entries):
+        template = entries[digest]
+        if template not in offsets:
+            encoded = template.encode("utf-8")
+            offsets[template] = (len(blob), len(encoded))
+            blob += encoded
+        offset, length = offsets[template]
+        index += _ENTRY.pack(digest, offset, length)
+
+    header = _HEADER.pack(MAGIC, GENERATOR_VERSION.encode("ascii"), len(entries), _HEADER.size + len(index))
+    temporary_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(temporary_path, "wb") as f:
+            f.write(header)
+            f.write(index)
+            f.write(blob)
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return len(entries)
+
+
+class TemplateCatalog:
+    """Read-only, memory-mapped template catalog.
+
+    Lookups binary-search the index inside the mapping, so opening a
+    catalog copies nothing but its header.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"Not a template catalog: {path}")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, blob_offset = _HEADER.unpack_from(self._map)
+        version = version.rstrip(b"\0").decode("ascii", "replace")
+        if magic != MAGIC or blob_offset != _HEADER.size + count * _ENTRY.size or blob_offset > size:
+            self._map.close()
+            raise ValueError(f"Not a template catalog: {path}")
+        if version != GENERATOR_VERSION:
+            self._map.close()
+            raise ValueError(
+                f"Catalog {path} was built by generator version {version}, not {GENERATOR_VERSION}"
+            )
+
+        self.path = path
+        self.count = count
+        self._blob_offset = blob_offset
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get(self, key: TemplateKey) -> Optional[str]:
+        """Return the catalogued template for a cache key, or None."""
+        digest = catalog_digest(key)
+        mapped = self._map
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            position = _HEADER.size + middle * _ENTRY.size
+            candidate = mapped[position:position + _DIGEST_SIZE]
+            if candidate < digest:
+                low = middle + 1
+            elif candidate > digest:
+                high = middle
+            else:
+                _, offset, length = _ENTRY.unpack_from(mapped, position)
+                start = self._blob_offset + offset
+                template = mapped[start:start + length].decode("utf-8")
+                with self._lock:
+                    self.hits += 1
+                return template
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def close(self) -> None:
+        self._map.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the catalog counters."""
+        with self._lock:
+            return {
+                "path": self.path,
+                "size": self.count,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,264 @@
+"""Command-line interface for offline bulk template generation.
+
+Usage::
+
+    python -m src.cli generate requests.jsonl --output templates.jsonl
+    python -m src.cli generate requests.jsonl --output-dir templates/ --workers 8
+    python -m src.cli build-catalog requests.jsonl --output catalog.bin
+
+Each input line is a TemplateRequest. Templates are generated by calling
+TemplateService directly, fanned out over a process pool in chunks.
+build-catalog writes them into a memory-mapped catalog for TEMPLATE_CATALOG_PATH.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+
+from .cache import template_cache_key
+from .catalog import catalog_digest, write_catalog
+from .models import TemplateRequest
+from .service import TemplateService, format_validation_errors
+
+FILE_EXTENSIONS = {
+    'python': 'py',
+    'java': 'java',
+    'cpp': 'cpp',
+    'javascript': 'js'
+}
+
+Chunk = List[Tuple[int, str]]
+
+# Per-process service, created by _init_worker (or lazily when run inline)
+_service: Optional[TemplateService] = None
+
+
+def _init_worker() -> None:
+    global _service
+    _service = TemplateService()
+
+
+def _generate_chunk(chunk: Chunk, include_digest: bool = False) -> List[Dict[str, Any]]:
+    """Generate templates for a chunk of (line number, JSON line) pairs.
+
+    With include_digest, successful results also carry the hex catalog
+    digest of their cache key.
+    """
+    if _service is None:
+        _init_worker()
+
+    results = []
+    for line_number, line in chunk:
+        result: Dict[str, Any] = {"line": line_number}
+        try:
+            request = TemplateRequest.model_validate_json(line)
+            result["question_id"] = request.question_id
+            result["language"] = request.language.value
+            _service.validate_request(request)
+            result["template"] = _service.generate_template(request).template
+            if include_digest:
+                key = template_cache_key(request.signature, request.language, request.options)
+                result["digest"] = catalog_digest(key).hex()
+        except ValidationError as e:
+            result["error"] = "Validation failed"
+            result["details"] = format_validation_errors(e)
+        except ValueError as e:
+            result["error"] = str(e)
+        results.append(result)
+    return results
+
+
+def _read_chunks(lines: Iterable[str], chunk_size: int) -> Iterator[Chunk]:
+    """Group non-blank input lines into chunks, keeping 1-based line numbers."""
+    chunk: Chunk = []
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        chunk.append((line_number, line))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _run_chunks(
+    chunks: Iterator[Chunk],
+    workers: int,
+    ordered: bool,
+    include_digest: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Generate every chunk, yielding results as chunks complete.
+
+    At most a few chunks per worker are in flight, so the input is never
+    read into memory all at once.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _generate_chunk(chunk, include_digest)
+        return
+
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_generate_chunk, chunk, include_digest))
+            while len(pending) >= max_pending:
+                yield from _collect(pending, ordered)
+        while pending:
+            yield from _collect(pending, ordered)
+
+
+def _collect(pending: deque, ordered: bool) -> Iterator[Dict[str, Any]]:
+    """Yield the results of the next finished chunk (the oldest one if ordered)."""
+    if ordered:
+        yield from pending.popleft().result()
+        return
+
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+        yield from future.result()
+
+
+def _safe_path_part(value: str) -> str:
+    """Make a question_id safe to use as a directory name."""
+    cleaned = re.sub(r'[^A-Za-z0-9._-]+', '_', value).strip('.')
+    return cleaned or '_'
+
+
+def _template_path(output_dir: str, result: Dict[str, Any]) -> str:
+    directory = os.path.join(output_dir, _safe_path_part(result["question_id"]), result["language"])
+    return os.path.join(directory, f"Solution.{FILE_EXTENSIONS[result['language']]}")
+
+
+def _write_template_file(path: str, result: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(result["template"])
+
+
+def generate(args: argparse.Namespace, stdout: Optional[TextIO] = None, stderr: Optional[TextIO] = None) -> int:
+    """Run the generate command and return the process exit code."""
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    started = time.perf_counter()
+    succeeded = failed = 0
+
+    input_file = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    output_file = None
+    # Template path -> line that wrote it; question_ids may map to the same directory
+    written: Dict[str, int] = {}
+    if args.output_dir is None:
+        output_file = stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+
+    try:
+        chunks = _read_chunks(input_file, args.chunk_size)
+        for result in _run_chunks(chunks, args.workers, ordered=not args.unordered):
+            path = None
+            if output_file is None and "error" not in result:
+                path = _template_path(args.output_dir, result)
+                if path in written:
+                    result = {
+                        key: result[key] for key in ("line", "question_id", "language")
+                    }
+                    result["error"] = f"Output path {path} was already written by line {written[path]}"
+                else:
+                    written[path] = result["line"]
+
+            if "error" in result:
+                failed += 1
+            else:
+                succeeded += 1
+
+            if output_file is not None:
+                output_file.write(json.dumps(result) + "\n")
+            elif "error" in result:
+                stderr.write(f"line {result['line']}: {result['error']} {json.dumps(result.get('details'))}\n")
+            else:
+                _write_template_file(path, result)
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not None and output_file is not stdout:
+            output_file.close()
+
+    elapsed = time.perf_counter() - started
+    stderr.write(f"Generated {succeeded} templates ({failed} errors) in {elapsed:.2f}s\n")
+    return 1 if failed else 0
+
+
+def build_catalog(args: argparse.Namespace, stderr: Optional[TextIO] = None) -> int:
+    """Run the build-catalog command and return the process exit code."""
+    stderr = stderr or sys.stderr
+    started = time.perf_counter()
+    templates: Dict[bytes, str] = {}
+    failed = 0
+
+    input_file = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    try:
+        chunks = _read_chunks(input_file, args.chunk_size)
+        for result in _run_chunks(chunks, args.workers, ordered=False, include_digest=True):
+            if "error" in result:
+                failed += 1
+                stderr.write(f"line {result['line']}: {result['error']} {json.dumps(result.get('details'))}\n")
+            else:
+                templates[bytes.fromhex(result["digest"])] = result["template"]
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+
+    count = write_catalog(args.output, templates.items())
+    elapsed = time.perf_counter() - started
+    stderr.write(f"Wrote {count} templates ({failed} errors) to {args.output} in {elapsed:.2f}s\n")
+    return 1 if failed else 0
+
+
+def _add_pool_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes; 1 runs inline (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="Requests per worker task (default: 256)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Universal Code Template Generator")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate", help="Generate templates from a JSONL file of TemplateRequests")
+    generate_parser.add_argument("input", help="Input JSONL file, or - for stdin")
+    destination = generate_parser.add_mutually_exclusive_group()
+    destination.add_argument("--output", "-o", default="-", help="Output JSONL file, or - for stdout (default)")
+    destination.add_argument("--output-dir", help="Write <question_id>/<language>/Solution.<ext> files under this directory")
+    _add_pool_arguments(generate_parser)
+    generate_parser.add_argument("--unordered", action="store_true",
+                                 help="Write results as chunks finish instead of in input order")
+    generate_parser.set_defaults(handler=generate)
+
+    catalog_parser = subparsers.add_parser(
+        "build-catalog", help="Pre-generate templates into a memory-mapped catalog for TEMPLATE_CATALOG_PATH"
+    )
+    catalog_parser.add_argument("input", help="Input JSONL file of TemplateRequests, or - for stdin")
+    catalog_parser.add_argument("--output", "-o", required=True, help="Catalog file to write")
+    _add_pool_arguments(catalog_parser)
+    catalog_parser.set_defaults(handler=build_catalog)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "chunk_size", 1) < 1:
+        parser.error("--chunk-size must be at least 1")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import List
-from ..models import FunctionSignature
-from ..type_mappers import get_type_mapper
+from typing import List, Optional
+from ..models import FunctionSignature, GenerationOptions
+from ..type_mappers import get_type_mapper, parse_type
+
+
+# Bump whenever generated output changes, so cached templates and ETags
+# issued by older releases stop matching.
+GENERATOR_VERSION = "7"
+
+DEFAULT_OPTIONS = GenerationOptions()
+
+# Instrumented harnesses write one line per solution call to stderr:
+#   #instrument wall_ns=<int> cpu_ns=<int> peak_kb=<int>
+INSTRUMENT_TAG = "#instrument"
+
+# Stack size of the thread that runs large_stack harnesses
+LARGE_STACK_MB = 256
 
 
 class TemplateGenerator(ABC):
@@ -12,8 +26,8 @@ class TemplateGenerator(ABC):
         self.type_mapper = get_type_mapper(language)
     
     @abstractmethod
-    def generate_template(self, signature: FunctionSignature) -> str:
-        """Generate a complete code template."""
+    def generate_template(self, signature: FunctionSignature, options: Optional[GenerationOptions] = None) -> str:
+        """Generate a complete code template; options default to DEFAULT_OPTIONS."""
         pass
     
     def get_all_types(self, signature: FunctionSignature) -> List[str]:
@@ -21,3 +35,11 @@ class TemplateGenerator(ABC):
         types = [param.type for param in signature.parameters]
         types.append(signature.returns.type)
         return types
+    
+    def _is_tree_type(self, dsl_type: str) -> bool:
+        """Check if the type is, or contains, a tree type."""
+        return parse_type(dsl_type).contains('tree')
+    
+    def _uses_tree(self, dsl_types: List[str]) -> bool:
+        """Check if any of the types needs the TreeNode helpers."""
+        return any(self._is_tree_type(t) for t in dsl_types)
@@ -1,89 +1,21 @@
-from typing import List
-from ..models import FunctionSignature
-from . import TemplateGenerator
+from textwrap import indent as indent_lines
+from typing import List, Optional
+from ..binary_format import check_binary_type
+from ..models import FunctionSignature, GenerationOptions, HarnessMode, InputFormat
+from ..type_mappers import TypeNode, parse_type
+from . import DEFAULT_OPTIONS, INSTRUMENT_TAG, LARGE_STACK_MB, TemplateGenerator
+from .fragments import CompiledTemplate
 
 
-class CppGenerator(TemplateGenerator):
-    """Template generator for C++."""
-    
-    def __init__(self):
-        super().__init__('cpp')
-    
-    def generate_template(self, signature: FunctionSignature) -> str:
-        """Generate C++ template."""
-        # Get all types for imports
-        all_types = self.get_all_types(signature)
-        imports = self.type_mapper.get_imports(all_types)
-        
-        # Standard includes
-        standard_includes = [
-            '#include <iostream>',
-            '#include <string>',
-            '#include <vector>',
-            '#include <queue>',
-            '#include <sstream>'
-        ]
-        
-        # Combine imports
-        all_imports = standard_includes + imports
-        imports_section = "\n".join(sorted(set(all_imports))) + "\n"
-        
-        # Add JSON library
-        json_include = '#include <nlohmann/json.hpp>\n'
-        
-        # Using declarations
-        using_section = '''using namespace std;
-using json = nlohmann::json;
-
-'''
-        
-        # Add TreeNode definition if needed
-        tree_node_def = ""
-        if any('Tree' in t for t in all_types):
-            tree_node_def = self._get_tree_node_definition() + "\n\n"
-        
-        # Generate function signature
-        params = []
-        for param in signature.parameters:
-            param_type = self.type_mapper.map_type(param.type)
-            params.append(f"{param_type} {param.name}")
-        
-        return_type = self.type_mapper.map_type(signature.returns.type)
-        
-        class_template = f'''{imports_section}{json_include}
-{using_section}{tree_node_def}class Solution {{
-public:
-    {return_type} {signature.function_name}({", ".join(params)}) {{
-        // Write your logic here
-        {self._get_default_return(signature.returns.type)}
-    }}
-}};
-
-{self._generate_helper_functions(all_types)}
+STANDARD_INCLUDES = [
+    '#include <iostream>',
+    '#include <string>',
+    '#include <vector>',
+    '#include <queue>',
+    '#include <sstream>'
+]
 
-int main() {{
-    // Do not edit below this line
-    string input;
-    string line;
-    while (getline(cin, line)) {{
-        input += line;
-    }}
-    
-    json data = json::parse(input);
-    Solution solution;
-    
-    {self._generate_parameter_extraction(signature)}
-    
-    {self._generate_function_call_and_output(signature)}
-    
-    return 0;
-}}'''
-        
-        return class_template
-    
-    def _get_tree_node_definition(self) -> str:
-        """Get TreeNode struct definition."""
-        return '''// Definition for a binary tree node
+TREE_NODE_DEFINITION = '''// Definition for a binary tree node
 struct TreeNode {
     int val;
     TreeNode *left;
@@ -91,31 +23,11 @@ struct TreeNode {
     TreeNode() : val(0), left(nullptr), right(nullptr) {}
     TreeNode(int x) : val(x), left(nullptr), right(nullptr) {}
     TreeNode(int x, TreeNode *left, TreeNode *right) : val(x), left(left), right(right) {}
-};'''
-    
-    def _get_default_return(self, return_type: str) -> str:
-        """Get appropriate default return statement."""
-        if 'Tree' in return_type:
-            return "return nullptr;"
-        elif return_type == 'Graph':
-            return "return {};"
-        elif 'vector' in return_type or 'List' in return_type:
-            return "return {};"
-        elif return_type in ['int', 'long long']:
-            return "return 0;"
-        elif return_type in ['float', 'double']:
-            return "return 0.0;"
-        elif return_type == 'bool':
-            return "return false;"
-        elif return_type == 'string':
-            return 'return "";'
-        else:
-            return "return {};"
-    
-    def _generate_helper_functions(self, all_types: List[str]) -> str:
-        """Generate helper functions if needed."""
-        if any('Tree' in t for t in all_types):
-            return '''TreeNode* deserializeTree(const json& data) {
+};
+
+'''
+
+TREE_DESERIALIZE = '''TreeNode* deserializeTree(const json& data) {
     if (data.empty()) return nullptr;
     
     TreeNode* root = new TreeNode(data[0]);
@@ -142,13 +54,48 @@ struct TreeNode {
     
     return root;
 }
+'''
 
+# fast_io: every node of a tree comes from one array allocation. Nodes are
+# stored in level order, so the array doubles as the BFS queue.
+TREE_DESERIALIZE_ARENA = '''TreeNode* deserializeTree(const json& data) {
+    if (data.empty() || data[0].is_null()) return nullptr;
+    
+    size_t count = 0;
+    for (const auto& value : data) {
+        if (!value.is_null()) count++;
+    }
+    TreeNode* nodes = new TreeNode[count];
+    
+    size_t next = 0;
+    nodes[next++].val = data[0].get<int>();
+    size_t i = 1;
+    for (size_t parent = 0; parent < next && i < data.size(); parent++) {
+        if (!data[i].is_null()) {
+            nodes[next].val = data[i].get<int>();
+            nodes[parent].left = &nodes[next++];
+        }
+        i++;
+        
+        if (i < data.size() && !data[i].is_null()) {
+            nodes[next].val = data[i].get<int>();
+            nodes[parent].right = &nodes[next++];
+        }
+        i++;
+    }
+    
+    return nodes;
+}
+'''
+
+TREE_SERIALIZE = '''
 json serializeTree(TreeNode* root) {
     json result = json::array();
     if (!root) return result;
     
     queue<TreeNode*> q;
     q.push(root);
+    size_t keep = 0;
     
     while (!q.empty()) {
         TreeNode* node = q.front();
@@ -156,6 +103,7 @@ json serializeTree(TreeNode* root) {
         
         if (node) {
             result.push_back(node->val);
+            keep = result.size();
             q.push(node->left);
             q.push(node->right);
         } else {
@@ -163,40 +111,355 @@ json serializeTree(TreeNode* root) {
         }
     }
     
-    // Remove trailing nulls
-    while (!result.empty() && result.back().is_null()) {
-        result.erase(result.end() - 1);
-    }
+    // Remove trailing nulls in a single erase
+    result.erase(result.begin() + keep, result.end());
     
     return result;
 }
 
 '''
-        return ""
+
+TEMPLATE = CompiledTemplate('''@{includes}
+#include <nlohmann/json.hpp>
+
+using namespace std;
+using json = nlohmann::json;
+
+@{tree_node}class Solution {
+public:
+    @{return_type} @{function_name}(@{params}) {
+        // Write your logic here
+        @{default_return}
+    }
+};
+
+@{helper_functions}
+
+@{main}''')
+
+MAIN_FUNCTION = CompiledTemplate('''int main() {
+    // Do not edit below this line
+@{driver}
+    
+    return 0;
+}''')
+
+# large_stack: the harness runs on a thread whose stack is sized here, so deep
+# recursion in solutions does not overflow the default 8 MiB main stack
+LARGE_STACK_MAIN_FUNCTION = CompiledTemplate('''void runHarness() {
+    // Do not edit below this line
+@{driver}
+}
+
+int main() {
+    pthread_attr_t attr;
+    pthread_attr_init(&attr);
+    pthread_attr_setstacksize(&attr, size_t(@{stack_mb}) << 20);
+    pthread_t thread;
+    pthread_create(&thread, &attr, [](void*) -> void* { runHarness(); return nullptr; }, nullptr);
+    pthread_join(thread, nullptr);
+    return 0;
+}''')
+
+SINGLE_DRIVER = CompiledTemplate('''@{read_input}
+    
+    json data = json::parse(input);
+    Solution solution;
+    
+@{param_extraction}
+    
+@{call_and_output}''')
+
+# One NDJSON test case per line, a fresh Solution and one flushed result line each
+MULTI_DRIVER = CompiledTemplate('''@{sync}    string line;
+    while (getline(cin, line)) {
+        if (line.find_first_not_of(" \\t\\r") == string::npos) continue;
+        
+        json data = json::parse(line);
+        Solution solution;
+        
+@{param_extraction}
+        
+@{call_and_output}
+    }''')
+
+BINARY_INCLUDES = ['#include <cstdint>', '#include <cstdio>', '#include <cstring>']
+
+# input_format=binary: stdin is read in 64 KiB blocks and numeric arrays are
+# copied out with a single memcpy (the host is assumed little-endian).
+BINARY_READER = '''struct BinaryReader {
+    vector<char> bytes;
+    size_t offset = 0;
+    
+    template <typename T>
+    T scalar() {
+        T value;
+        memcpy(&value, bytes.data() + offset, sizeof(T));
+        offset += sizeof(T);
+        return value;
+    }
+    
+    uint32_t count() { return scalar<uint32_t>(); }
+    
+    bool flag() { return bytes[offset++] != 0; }
+    
+    string text() {
+        uint32_t size = count();
+        string value(bytes.data() + offset, size);
+        offset += size;
+        return value;
+    }
+    
+    template <typename T>
+    vector<T> array() {
+        vector<T> values(count());
+        memcpy(values.data(), bytes.data() + offset, values.size() * sizeof(T));
+        offset += values.size() * sizeof(T);
+        return values;
+    }
+    
+    template <typename Read>
+    auto list(Read read) -> vector<decltype(read())> {
+        vector<decltype(read())> values(count());
+        for (size_t i = 0; i < values.size(); i++) {
+            values[i] = read();
+        }
+        return values;
+    }
+};
+
+BinaryReader readBinaryInput() {
+    BinaryReader reader;
+    char chunk[1 << 16];
+    size_t got;
+    while ((got = fread(chunk, 1, sizeof(chunk), stdin)) > 0) {
+        reader.bytes.insert(reader.bytes.end(), chunk, chunk + got);
+    }
+    return reader;
+}
+
+'''
+
+BINARY_SINGLE_DRIVER = CompiledTemplate('''    BinaryReader data = readBinaryInput();
+    Solution solution;
+    
+@{param_extraction}
+    
+@{call_and_output}''')
+
+BINARY_MULTI_DRIVER = CompiledTemplate('''    BinaryReader data = readBinaryInput();
+    while (data.offset < data.bytes.size()) {
+        Solution solution;
+        
+@{param_extraction}
+        
+@{call_and_output}
+    }''')
+
+# DSL primitive -> BinaryReader expression
+BINARY_PRIMITIVES = {
+    'int': 'data.scalar<int>()',
+    'long': 'data.scalar<long long>()',
+    'float': 'data.scalar<float>()',
+    'double': 'data.scalar<double>()',
+    'bool': 'data.flag()',
+    'string': 'data.text()',
+}
+
+INSTRUMENT_INCLUDES = ['#include <chrono>', '#include <ctime>', '#include <sys/resource.h>']
+
+# ru_maxrss is the process's peak resident set size, in KiB on Linux
+INSTRUMENTED_CALL = CompiledTemplate('''timespec cpuStart, cpuEnd;
+clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &cpuStart);
+auto started = chrono::steady_clock::now();
+auto result = @{function_call};
+long long wallNs = chrono::duration_cast<chrono::nanoseconds>(chrono::steady_clock::now() - started).count();
+clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &cpuEnd);
+long long cpuNs = (cpuEnd.tv_sec - cpuStart.tv_sec) * 1000000000LL + (cpuEnd.tv_nsec - cpuStart.tv_nsec);
+rusage usage;
+getrusage(RUSAGE_SELF, &usage);
+cerr << "@{tag} wall_ns=" << wallNs << " cpu_ns=" << cpuNs << " peak_kb=" << usage.ru_maxrss << endl;''')
+
+UNSYNC_STREAMS = '''    ios::sync_with_stdio(false);
+    cin.tie(nullptr);
+    
+'''
+
+READ_INPUT_LINES = '''    string input;
+    string line;
+    while (getline(cin, line)) {
+        input += line;
+    }'''
+
+# fast_io: unsynced iostreams, and stdin read in 64 KiB blocks into one buffer,
+# reserved up front when stdin is a regular file of known size
+READ_INPUT_BULK = '''    ios::sync_with_stdio(false);
+    cin.tie(nullptr);
     
-    def _generate_parameter_extraction(self, signature: FunctionSignature) -> str:
+    string input;
+    struct stat info;
+    if (fstat(fileno(stdin), &info) == 0 && S_ISREG(info.st_mode) && info.st_size > 0) {
+        input.reserve(info.st_size);
+    }
+    static char chunk[1 << 16];
+    size_t bytes;
+    while ((bytes = fread(chunk, 1, sizeof(chunk), stdin)) > 0) {
+        input.append(chunk, bytes);
+    }'''
+
+
+class CppGenerator(TemplateGenerator):
+    """Template generator for C++."""
+    
+    def __init__(self):
+        super().__init__('cpp')
+    
+    def generate_template(self, signature: FunctionSignature, options: Optional[GenerationOptions] = None) -> str:
+        """Generate C++ template."""
+        options = options or DEFAULT_OPTIONS
+        
+        # Get all types for imports
+        all_types = self.get_all_types(signature)
+        imports = self.type_mapper.get_imports(all_types)
+        uses_tree = self._uses_tree(all_types)
+        
+        # Generate function signature
+        params = [
+            f"{self.type_mapper.map_type(param.type)} {param.name}"
+            for param in signature.parameters
+        ]
+        
+        includes = STANDARD_INCLUDES + imports
+        if options.fast_io:
+            includes = includes + ['#include <cstdio>', '#include <sys/stat.h>']
+        if options.instrument:
+            includes = includes + INSTRUMENT_INCLUDES
+        if options.large_stack:
+            includes = includes + ['#include <pthread.h>']
+        binary = options.input_format == InputFormat.BINARY
+        if binary:
+            includes = includes + BINARY_INCLUDES
+        
+        return TEMPLATE.render(
+            includes="\n".join(sorted(set(includes))),
+            tree_node=TREE_NODE_DEFINITION if uses_tree else "",
+            return_type=self.type_mapper.map_type(signature.returns.type),
+            function_name=signature.function_name,
+            params=", ".join(params),
+            default_return=self._get_default_return(signature.returns.type),
+            helper_functions=(self._generate_tree_helpers(options) if uses_tree else "") + (BINARY_READER if binary else ""),
+            main=self._generate_main(signature, options)
+        )
+    
+    def _generate_main(self, signature: FunctionSignature, options: GenerationOptions) -> str:
+        """Generate main, running the driver on a large-stack thread when requested."""
+        driver = self._generate_driver(signature, options)
+        if options.large_stack:
+            return LARGE_STACK_MAIN_FUNCTION.render(driver=driver, stack_mb=str(LARGE_STACK_MB))
+        return MAIN_FUNCTION.render(driver=driver)
+    
+    def _generate_driver(self, signature: FunctionSignature, options: GenerationOptions) -> str:
+        """Generate the body of main: read test input, call the solution, print results."""
+        if options.input_format == InputFormat.BINARY:
+            return self._generate_binary_driver(signature, options)
+        if options.harness_mode == HarnessMode.MULTI:
+            return MULTI_DRIVER.render(
+                sync=UNSYNC_STREAMS if options.fast_io else "",
+                param_extraction=self._generate_parameter_extraction(signature, indent="        "),
+                call_and_output=self._generate_function_call_and_output(
+                    signature, indent="        ", line_end="endl", instrument=options.instrument
+                )
+            )
+        return SINGLE_DRIVER.render(
+            read_input=READ_INPUT_BULK if options.fast_io else READ_INPUT_LINES,
+            param_extraction=self._generate_parameter_extraction(signature),
+            # endl flushes; fast_io leaves the single flush to program exit
+            call_and_output=self._generate_function_call_and_output(
+                signature, line_end="'\\n'" if options.fast_io else "endl", instrument=options.instrument
+            )
+        )
+    
+    def _generate_binary_driver(self, signature: FunctionSignature, options: GenerationOptions) -> str:
+        """Generate a main body that reads parameters from the binary input layout."""
+        multi = options.harness_mode == HarnessMode.MULTI
+        indent = "        " if multi else "    "
+        lines = []
+        for param in signature.parameters:
+            node = parse_type(param.type)
+            check_binary_type(node)
+            lines.append(f"{indent}auto {param.name} = {self._binary_read_expression(node)};")
+        
+        driver = BINARY_MULTI_DRIVER if multi else BINARY_SINGLE_DRIVER
+        return driver.render(
+            param_extraction="\n".join(lines),
+            call_and_output=self._generate_function_call_and_output(
+                signature,
+                indent=indent,
+                line_end="endl" if multi or not options.fast_io else "'\\n'",
+                instrument=options.instrument
+            )
+        )
+    
+    def _binary_read_expression(self, node: TypeNode) -> str:
+        """Return a BinaryReader expression that decodes node."""
+        if node.kind == 'primitive':
+            return BINARY_PRIMITIVES[node.name]
+        element = node.element
+        if element.kind == 'primitive' and element.name not in ('bool', 'string'):
+            return f"data.array<{self.type_mapper.render(element)}>()"
+        return f"data.list([&] {{ return {self._binary_read_expression(element)}; }})"
+    
+    def _generate_tree_helpers(self, options: GenerationOptions) -> str:
+        """Pick the tree (de)serialization helpers for the options."""
+        deserialize = TREE_DESERIALIZE_ARENA if options.fast_io else TREE_DESERIALIZE
+        return deserialize + TREE_SERIALIZE
+    
+    def _get_default_return(self, return_type: str) -> str:
+        """Get appropriate default return statement."""
+        if self._is_tree_type(return_type):
+            return "return nullptr;"
+        elif return_type == 'Graph':
+            return "return {};"
+        elif 'vector' in return_type or 'List' in return_type:
+            return "return {};"
+        elif return_type in ['int', 'long long']:
+            return "return 0;"
+        elif return_type in ['float', 'double']:
+            return "return 0.0;"
+        elif return_type == 'bool':
+            return "return false;"
+        elif return_type == 'string':
+            return 'return "";'
+        else:
+            return "return {};"
+    
+    def _generate_parameter_extraction(self, signature: FunctionSignature, indent: str = "    ") -> str:
         """Generate parameter extraction code."""
         lines = []
         for param in signature.parameters:
             if self._is_tree_type(param.type):
-                lines.append(f'    TreeNode* {param.name} = deserializeTree(data["{param.name}"]);')
+                lines.append(f'{indent}TreeNode* {param.name} = deserializeTree(data["{param.name}"]);')
             elif param.type == 'Graph':
-                lines.append(f'    auto {param.name} = data["{param.name}"].get<unordered_map<int, vector<int>>>();')
+                lines.append(f'{indent}auto {param.name} = data["{param.name}"].get<unordered_map<int, vector<int>>>();')
             else:
                 cpp_type = self.type_mapper.map_type(param.type)
-                lines.append(f'    auto {param.name} = data["{param.name}"].get<{cpp_type}>();')
+                lines.append(f'{indent}auto {param.name} = data["{param.name}"].get<{cpp_type}>();')
         return "\n".join(lines)
     
-    def _generate_function_call_and_output(self, signature: FunctionSignature) -> str:
+    def _generate_function_call_and_output(
+        self,
+        signature: FunctionSignature,
+        indent: str = "    ",
+        line_end: str = "endl",
+        instrument: bool = False
+    ) -> str:
         """Generate function call and output code."""
         param_names = [param.name for param in signature.parameters]
         function_call = f"solution.{signature.function_name}({', '.join(param_names)})"
         
-        if self._is_tree_type(signature.returns.type):
-            return f"    auto result = {function_call};\n    cout << serializeTree(result) << endl;"
+        if instrument:
+            call = indent_lines(INSTRUMENTED_CALL.render(function_call=function_call, tag=INSTRUMENT_TAG), indent)
         else:
-            return f"    auto result = {function_call};\n    cout << json(result) << endl;"
-    
-    def _is_tree_type(self, dsl_type: str) -> bool:
-        """Check if the type is a tree type."""
-        return 'Tree' in dsl_type
+            call = f"{indent}auto result = {function_call};"
+        result = "serializeTree(result)" if self._is_tree_type(signature.returns.type) else "json(result)"
+        return f"{call}\n{indent}cout << {result} << {line_end};"
@@ -1,24 +1,58 @@
+import threading
+from typing import Dict, Optional, Type
+
 from .python_generator import PythonGenerator
 from .java_generator import JavaGenerator
 from .cpp_generator import CppGenerator
 from .javascript_generator import JavaScriptGenerator
 from . import TemplateGenerator
+from ..type_mappers import TypeMapper, _register_type_mapper
 
 
 class GeneratorFactory:
-    """Factory class for creating template generators."""
+    """Factory class for creating template generators.
+    
+    Generators hold no per-request state, so each language gets a single
+    shared instance that is created on first use and reused afterwards.
+    """
     
-    _generators = {
+    _generators: Dict[str, Type[TemplateGenerator]] = {
         'python': PythonGenerator,
         'java': JavaGenerator,
         'cpp': CppGenerator,
         'javascript': JavaScriptGenerator
     }
     
+    _instances: Dict[str, TemplateGenerator] = {}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def register(
+        cls,
+        language: str,
+        generator_class: Type[TemplateGenerator],
+        type_mapper: Optional[TypeMapper] = None
+    ) -> None:
+        """Register (or replace) the generator class, and optionally the type mapper, for a language."""
+        with cls._lock:
+            if type_mapper is not None:
+                _register_type_mapper(language, type_mapper)
+            cls._generators[language] = generator_class
+            cls._instances.pop(language, None)
+    
     @classmethod
     def get_generator(cls, language: str) -> TemplateGenerator:
-        """Get the appropriate template generator for the language."""
+        """Get the shared template generator for the language."""
+        generator = cls._instances.get(language)
+        if generator is not None:
+            return generator
+        
         if language not in cls._generators:
             raise ValueError(f"Unsupported language: {language}")
         
-        return cls._generators[language]()
+        with cls._lock:
+            generator = cls._instances.get(language)
+            if generator is None:
+                generator = cls._generators[language]()
+                cls._instances[language] = generator
+        return generator
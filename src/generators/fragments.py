@@ -0,0 +1,40 @@
+import re
+from typing import List, Tuple
+
+
+_SLOT_PATTERN = re.compile(r'@\{(\w+)\}')
+
+
+class CompiledTemplate:
+    """A code template split once into static text and named slots.
+
+    Slots are written ``@{name}``, which does not clash with the braces of
+    any target language. The template is parsed at import time, so
+    rendering only fills the slots and joins the parts once.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self._parts: List[str] = []
+        self._slots: List[Tuple[int, str]] = []
+
+        position = 0
+        for match in _SLOT_PATTERN.finditer(source):
+            if match.start() > position:
+                self._parts.append(source[position:match.start()])
+            self._slots.append((len(self._parts), match.group(1)))
+            self._parts.append('')
+            position = match.end()
+        if position < len(source):
+            self._parts.append(source[position:])
+
+    @property
+    def slot_names(self) -> List[str]:
+        return [name for _, name in self._slots]
+
+    def render(self, **values: str) -> str:
+        """Fill every slot and return the rendered text."""
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            parts[index] = values[name]
+        return ''.join(parts)
@@ -1,77 +1,14 @@
-from typing import List
-from ..models import FunctionSignature
-from . import TemplateGenerator
+from textwrap import indent
+from typing import Dict, List, Optional
+from ..binary_format import check_binary_type
+from ..models import FunctionSignature, GenerationOptions, HarnessMode, InputFormat
+from ..type_mappers import TypeNode, parse_type
+from . import DEFAULT_OPTIONS, INSTRUMENT_TAG, LARGE_STACK_MB, TemplateGenerator
+from .fragments import CompiledTemplate
 
 
-class JavaGenerator(TemplateGenerator):
-    """Template generator for Java."""
-    
-    def __init__(self):
-        super().__init__('java')
-    
-    def generate_template(self, signature: FunctionSignature) -> str:
-        """Generate Java template."""
-        # Get all types for imports
-        all_types = self.get_all_types(signature)
-        imports = self.type_mapper.get_imports(all_types)
-        
-        # Build imports section
-        imports_section = ""
-        if imports:
-            imports_section = "\n".join(imports) + "\n"
-        
-        # Add TreeNode definition if needed
-        tree_node_def = ""
-        if any('Tree' in t for t in all_types):
-            tree_node_def = "\n" + self._get_tree_node_definition() + "\n"
-        
-        # Generate function signature
-        params = []
-        for param in signature.parameters:
-            param_type = self.type_mapper.map_type(param.type)
-            params.append(f"{param_type} {param.name}")
-        
-        return_type = self.type_mapper.map_type(signature.returns.type)
-        
-        class_template = f'''{imports_section}
-import com.google.gson.*;
-import java.util.*;
-import java.io.*;
-
-public class Solution {{
-    public {return_type} {signature.function_name}({", ".join(params)}) {{
-        // Write your logic here
-        return null;
-    }}
-    
-    public static void main(String[] args) throws IOException {{
-        // Do not edit below this line
-        BufferedReader reader = new BufferedReader(new InputStreamReader(System.in));
-        StringBuilder sb = new StringBuilder();
-        String line;
-        while ((line = reader.readLine()) != null) {{
-            sb.append(line);
-        }}
-        
-        Gson gson = new Gson();
-        JsonObject data = gson.fromJson(sb.toString(), JsonObject.class);
-        
-        Solution solution = new Solution();
-        {self._generate_parameter_extraction(signature)}
-        
-        {self._generate_function_call(signature)}
-        
-        System.out.println(gson.toJson(result));
-    }}
-    
-    {self._generate_helper_methods(all_types)}
-}}{tree_node_def}'''
-        
-        return class_template
-    
-    def _get_tree_node_definition(self) -> str:
-        """Get TreeNode class definition."""
-        return '''// Definition for a binary tree node
+TREE_NODE_DEFINITION = '''
+// Definition for a binary tree node
 class TreeNode {
     int val;
     TreeNode left;
@@ -83,35 +20,10 @@ class TreeNode {
         this.left = left;
         this.right = right;
     }
-}'''
-    
-    def _generate_parameter_extraction(self, signature: FunctionSignature) -> str:
-        """Generate parameter extraction code."""
-        lines = []
-        for param in signature.parameters:
-            if self._is_tree_type(param.type):
-                lines.append(f"        TreeNode {param.name} = deserializeTree(data.getAsJsonArray(\"{param.name}\"));")
-            elif param.type == 'Graph':
-                lines.append(f"        Map<Integer, List<Integer>> {param.name} = gson.fromJson(data.get(\"{param.name}\"), new TypeToken<Map<Integer, List<Integer>>>(){{}}.getType());")
-            else:
-                java_type = self.type_mapper.map_type(param.type)
-                lines.append(f"        {java_type} {param.name} = gson.fromJson(data.get(\"{param.name}\"), {self._get_type_token(param.type)});")
-        return "\n".join(lines)
-    
-    def _generate_function_call(self, signature: FunctionSignature) -> str:
-        """Generate function call code."""
-        param_names = [param.name for param in signature.parameters]
-        return_type = self.type_mapper.map_type(signature.returns.type)
-        
-        if self._is_tree_type(signature.returns.type):
-            return f"        {return_type} result = solution.{signature.function_name}({', '.join(param_names)});\n        JsonArray serialized = serializeTree(result);\n        result = serialized;"
-        else:
-            return f"        {return_type} result = solution.{signature.function_name}({', '.join(param_names)});"
-    
-    def _generate_helper_methods(self, all_types: List[str]) -> str:
-        """Generate helper methods if needed."""
-        if any('Tree' in t for t in all_types):
-            return '''
+}
+'''
+
+TREE_HELPER_METHODS = '''
     private static TreeNode deserializeTree(JsonArray data) {
         if (data == null || data.size() == 0) return null;
         
@@ -164,13 +76,655 @@ class TreeNode {
         
         return result;
     }'''
-        return ""
+
+TEMPLATE = CompiledTemplate('''@{imports}
+import com.google.gson.*;
+@{io_imports}@{instrument_imports}import java.util.*;
+import java.io.*;
+
+public class Solution {
+    public @{return_type} @{function_name}(@{params}) {
+        // Write your logic here
+        return null;
+    }
+    
+@{main_method}
+    
+    @{helper_methods}
+}@{tree_node}''')
+
+MAIN_METHOD = CompiledTemplate('''    public static void main(String[] args) throws IOException {
+        // Do not edit below this line
+@{main_body}
+    }''')
+
+# large_stack: the harness runs on a thread whose stack is sized here, so deep
+# recursion in solutions does not overflow; its failure is rethrown from main
+LARGE_STACK_MAIN_METHOD = CompiledTemplate('''    public static void main(String[] args) throws Exception {
+        Throwable[] failure = new Throwable[1];
+        Thread thread = new Thread(null, () -> {
+            try {
+                runHarness();
+            } catch (Throwable e) {
+                failure[0] = e;
+            }
+        }, "harness", @{stack_mb}L << 20);
+        thread.start();
+        thread.join();
+        if (failure[0] instanceof Exception) throw (Exception) failure[0];
+        if (failure[0] != null) throw (Error) failure[0];
+    }
+    
+    private static void runHarness() throws IOException {
+        // Do not edit below this line
+@{main_body}
+    }''')
+
+MAIN_BODY = CompiledTemplate('''        BufferedReader reader = new BufferedReader(new InputStreamReader(System.in));
+        StringBuilder sb = new StringBuilder();
+        String line;
+        while ((line = reader.readLine()) != null) {
+            sb.append(line);
+        }
+        
+        Gson gson = new Gson();
+        JsonObject data = gson.fromJson(sb.toString(), JsonObject.class);
+        
+        Solution solution = new Solution();
+@{param_extraction}
+        
+@{function_call}
+        
+        System.out.println(gson.toJson(@{output}));''')
+
+# One NDJSON test case per line, a fresh Solution and one flushed result line each
+MULTI_MAIN_BODY = CompiledTemplate('''        BufferedReader reader = new BufferedReader(new InputStreamReader(System.in));
+        PrintWriter out = new PrintWriter(new BufferedWriter(new OutputStreamWriter(System.out)));
+        Gson gson = new Gson();
+        String line;
+        while ((line = reader.readLine()) != null) {
+            if (line.isBlank()) continue;
+            JsonObject data = gson.fromJson(line, JsonObject.class);
+            
+            Solution solution = new Solution();
+@{param_extraction}
+            
+@{function_call}
+            
+            out.println(gson.toJson(@{output}));
+            out.flush();
+        }''')
+
+# fast_io: a JsonReader streams stdin and each parameter is decoded straight
+# into its Java type, so no JsonObject DOM or input String is ever built.
+STREAM_IMPORTS = '''import com.google.gson.stream.*;
+import java.nio.charset.StandardCharsets;
+'''
+
+STREAM_MAIN_BODY = CompiledTemplate('''        JsonReader reader = new JsonReader(new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8), 1 << 16));
+@{declarations}
+        reader.beginObject();
+        while (reader.hasNext()) {
+            switch (reader.nextName()) {
+@{cases}
+                default:
+                    reader.skipValue();
+            }
+        }
+        reader.endObject();
+        
+        Solution solution = new Solution();
+@{function_call}
+        
+        Writer out = new BufferedWriter(new OutputStreamWriter(System.out, StandardCharsets.UTF_8), 1 << 16);
+@{write_result}
+        out.write("\\n");
+        out.flush();''')
+
+# A lenient JsonReader accepts a stream of top-level objects, one per test case
+STREAM_MULTI_MAIN_BODY = CompiledTemplate('''        JsonReader reader = new JsonReader(new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8), 1 << 16));
+        reader.setLenient(true);
+        Writer out = new BufferedWriter(new OutputStreamWriter(System.out, StandardCharsets.UTF_8), 1 << 16);
+        while (reader.peek() != JsonToken.END_DOCUMENT) {
+@{declarations}
+            reader.beginObject();
+            while (reader.hasNext()) {
+                switch (reader.nextName()) {
+@{cases}
+                    default:
+                        reader.skipValue();
+                }
+            }
+            reader.endObject();
+            
+            Solution solution = new Solution();
+@{function_call}
+            
+@{write_result}
+            out.write("\\n");
+            out.flush();
+        }''')
+
+STREAM_TREE_HELPERS = '''
+    private static TreeNode readTree(JsonReader reader) throws IOException {
+        int[] values = new int[16];
+        boolean[] present = new boolean[16];
+        int size = 0;
+        reader.beginArray();
+        while (reader.hasNext()) {
+            if (size == values.length) {
+                values = Arrays.copyOf(values, size * 2);
+                present = Arrays.copyOf(present, size * 2);
+            }
+            if (reader.peek() == JsonToken.NULL) {
+                reader.nextNull();
+            } else {
+                values[size] = reader.nextInt();
+                present[size] = true;
+            }
+            size++;
+        }
+        reader.endArray();
+        if (size == 0 || !present[0]) return null;
+        
+        // Nodes are stored in level order, so the array doubles as the BFS queue
+        TreeNode[] nodes = new TreeNode[size];
+        int next = 0;
+        nodes[next++] = new TreeNode(values[0]);
+        int i = 1;
+        for (int parent = 0; parent < next && i < size; parent++) {
+            if (present[i]) {
+                nodes[parent].left = nodes[next++] = new TreeNode(values[i]);
+            }
+            i++;
+            if (i < size && present[i]) {
+                nodes[parent].right = nodes[next++] = new TreeNode(values[i]);
+            }
+            i++;
+        }
+        return nodes[0];
+    }
+    
+    private static void writeTree(TreeNode root, JsonWriter writer) throws IOException {
+        writer.beginArray();
+        List<TreeNode> queue = new ArrayList<>();
+        if (root != null) queue.add(root);
+        int last = 0;
+        for (int head = 0; head < queue.size(); head++) {
+            TreeNode node = queue.get(head);
+            if (node != null) {
+                last = head;
+                queue.add(node.left);
+                queue.add(node.right);
+            }
+        }
+        for (int i = 0; i < queue.size() && i <= last; i++) {
+            TreeNode node = queue.get(i);
+            if (node != null) {
+                writer.value(node.val);
+            } else {
+                writer.nullValue();
+            }
+        }
+        writer.endArray();
+        writer.flush();
+    }'''
+
+PRIMITIVE_ARRAY_READER = CompiledTemplate('''
+    private static @{element}[] @{name}(JsonReader reader) throws IOException {
+        @{element}[] values = new @{element}[16];
+        int size = 0;
+        reader.beginArray();
+        while (reader.hasNext()) {
+            if (size == values.length) values = Arrays.copyOf(values, size * 2);
+            values[size++] = @{read_element};
+        }
+        reader.endArray();
+        return size == values.length ? values : Arrays.copyOf(values, size);
+    }''')
+
+OBJECT_ARRAY_READER = CompiledTemplate('''
+    private static @{element}[] @{name}(JsonReader reader) throws IOException {
+        List<@{element}> values = new ArrayList<>();
+        reader.beginArray();
+        while (reader.hasNext()) {
+            values.add(@{read_element});
+        }
+        reader.endArray();
+        return values.toArray(@{empty_array});
+    }''')
+
+LIST_READER = CompiledTemplate('''
+    private static List<@{element}> @{name}(JsonReader reader) throws IOException {
+        List<@{element}> values = new ArrayList<>();
+        reader.beginArray();
+        while (reader.hasNext()) {
+            values.add(@{read_element});
+        }
+        reader.endArray();
+        return values;
+    }''')
+
+GRAPH_READER = '''
+    private static Map<Integer, List<Integer>> readGraph(JsonReader reader) throws IOException {
+        Map<Integer, List<Integer>> graph = new HashMap<>();
+        reader.beginObject();
+        while (reader.hasNext()) {
+            int node = Integer.parseInt(reader.nextName());
+            List<Integer> neighbors = new ArrayList<>();
+            reader.beginArray();
+            while (reader.hasNext()) {
+                neighbors.add(reader.nextInt());
+            }
+            reader.endArray();
+            graph.put(node, neighbors);
+        }
+        reader.endObject();
+        return graph;
+    }'''
+
+# input_format=binary: stdin is read once into a little-endian ByteBuffer and
+# numeric arrays are bulk-copied through typed buffer views.
+BINARY_IMPORTS = '''import java.nio.*;
+import java.nio.charset.StandardCharsets;
+'''
+
+BINARY_MAIN_BODY = CompiledTemplate('''        ByteBuffer data = ByteBuffer.wrap(System.in.readAllBytes()).order(ByteOrder.LITTLE_ENDIAN);
+@{declarations}
+        
+        Solution solution = new Solution();
+@{function_call}
+        
+        System.out.println(new Gson().toJson(@{output}));''')
+
+BINARY_MULTI_MAIN_BODY = CompiledTemplate('''        ByteBuffer data = ByteBuffer.wrap(System.in.readAllBytes()).order(ByteOrder.LITTLE_ENDIAN);
+        PrintWriter out = new PrintWriter(new BufferedWriter(new OutputStreamWriter(System.out)));
+        Gson gson = new Gson();
+        while (data.hasRemaining()) {
+@{declarations}
+            
+            Solution solution = new Solution();
+@{function_call}
+            
+            out.println(gson.toJson(@{output}));
+            out.flush();
+        }''')
+
+BINARY_NUMERIC_ARRAY_READER = CompiledTemplate('''
+    private static @{element}[] @{name}(ByteBuffer data) {
+        @{element}[] values = new @{element}[data.getInt()];
+        data.@{view}().get(values);
+        data.position(data.position() + values.length * @{boxed}.BYTES);
+        return values;
+    }''')
+
+BINARY_BOOLEAN_ARRAY_READER = '''
+    private static boolean[] readBooleanArray(ByteBuffer data) {
+        boolean[] values = new boolean[data.getInt()];
+        for (int i = 0; i < values.length; i++) {
+            values[i] = data.get() != 0;
+        }
+        return values;
+    }'''
+
+BINARY_OBJECT_ARRAY_READER = CompiledTemplate('''
+    private static @{element}[] @{name}(ByteBuffer data) {
+        int count = data.getInt();
+        List<@{element}> values = new ArrayList<>(count);
+        for (int i = 0; i < count; i++) {
+            values.add(@{read_element});
+        }
+        return values.toArray(@{empty_array});
+    }''')
+
+BINARY_LIST_READER = CompiledTemplate('''
+    private static List<@{element}> @{name}(ByteBuffer data) {
+        int count = data.getInt();
+        List<@{element}> values = new ArrayList<>(count);
+        for (int i = 0; i < count; i++) {
+            values.add(@{read_element});
+        }
+        return values;
+    }''')
+
+BINARY_STRING_READER = '''
+    private static String readString(ByteBuffer data) {
+        byte[] bytes = new byte[data.getInt()];
+        data.get(bytes);
+        return new String(bytes, StandardCharsets.UTF_8);
+    }'''
+
+# DSL primitive -> (ByteBuffer expression, typed buffer view for bulk array reads)
+BINARY_PRIMITIVES = {
+    'int': ('data.getInt()', 'asIntBuffer'),
+    'long': ('data.getLong()', 'asLongBuffer'),
+    'float': ('data.getFloat()', 'asFloatBuffer'),
+    'double': ('data.getDouble()', 'asDoubleBuffer'),
+    'bool': ('(data.get() != 0)', None),
+    'string': ('readString(data)', None),
+}
+
+INSTRUMENT_IMPORTS = '''import java.lang.management.*;
+'''
+
+# Heap pool peaks are reset before the call, so peak_kb is this call's peak heap usage
+INSTRUMENTED_CALL = CompiledTemplate('''ThreadMXBean cpuClock = ManagementFactory.getThreadMXBean();
+List<MemoryPoolMXBean> memoryPools = ManagementFactory.getMemoryPoolMXBeans();
+for (MemoryPoolMXBean pool : memoryPools) pool.resetPeakUsage();
+long startedCpu = cpuClock.getCurrentThreadCpuTime();
+long started = System.nanoTime();
+@{function_call}
+long wallNs = System.nanoTime() - started;
+long cpuNs = cpuClock.getCurrentThreadCpuTime() - startedCpu;
+long peakBytes = 0;
+for (MemoryPoolMXBean pool : memoryPools) {
+    if (pool.getType() == MemoryType.HEAP) peakBytes += pool.getPeakUsage().getUsed();
+}
+System.err.println("@{tag} wall_ns=" + wallNs + " cpu_ns=" + cpuNs + " peak_kb=" + peakBytes / 1024);''')
+
+# Primitive arrays are copied out of the JsonObject with a typed loop instead of
+# gson.fromJson(..., int[].class), which boxes every element into a list and
+# fills the array through reflection.
+JSON_PRIMITIVE_ARRAY_READER = CompiledTemplate('''
+    private static @{element}[] @{name}(JsonArray array) {
+        @{element}[] values = @{new_array};
+        for (int i = 0; i < values.length; i++) {
+            values[i] = @{read_element};
+        }
+        return values;
+    }''')
+
+# DSL primitive -> JsonElement accessor for JSON_PRIMITIVE_ARRAY_READER
+JSON_PRIMITIVE_ACCESSORS = {
+    'int': 'getAsInt',
+    'long': 'getAsLong',
+    'float': 'getAsFloat',
+    'double': 'getAsDouble',
+    'bool': 'getAsBoolean',
+}
+
+# DSL primitive -> (JsonReader expression, helper name suffix, Java default value)
+STREAM_PRIMITIVES = {
+    'int': ('reader.nextInt()', 'Int', '0'),
+    'long': ('reader.nextLong()', 'Long', '0L'),
+    'float': ('(float) reader.nextDouble()', 'Float', '0f'),
+    'double': ('reader.nextDouble()', 'Double', '0.0'),
+    'bool': ('reader.nextBoolean()', 'Boolean', 'false'),
+    'string': ('reader.nextString()', 'String', 'null'),
+}
+
+
+class JavaGenerator(TemplateGenerator):
+    """Template generator for Java."""
+    
+    def __init__(self):
+        super().__init__('java')
+    
+    def generate_template(self, signature: FunctionSignature, options: Optional[GenerationOptions] = None) -> str:
+        """Generate Java template."""
+        options = options or DEFAULT_OPTIONS
+        
+        # Get all types for imports
+        all_types = self.get_all_types(signature)
+        imports = self.type_mapper.get_imports(all_types)
+        uses_tree = self._uses_tree(all_types)
+        
+        # Generate function signature
+        params = [
+            f"{self.type_mapper.map_type(param.type)} {param.name}"
+            for param in signature.parameters
+        ]
+        
+        multi = options.harness_mode == HarnessMode.MULTI
+        binary = options.input_format == InputFormat.BINARY
+        readers: Dict[str, str] = {}
+        if binary:
+            main_body = self._generate_binary_main_body(signature, readers, multi, options.instrument)
+            helper_methods = "\n    ".join(([TREE_HELPER_METHODS] if uses_tree else []) + list(readers.values()))
+        elif options.fast_io:
+            main_body = self._generate_stream_main_body(signature, readers, multi, options.instrument)
+            helper_methods = "\n    ".join(([STREAM_TREE_HELPERS] if uses_tree else []) + list(readers.values()))
+        else:
+            param_extraction = self._generate_parameter_extraction(signature, readers)
+            function_call = self._generate_function_call(signature, options.instrument)
+            output = "serializeTree(result)" if self._is_tree_type(signature.returns.type) else "result"
+            if multi:
+                main_body = MULTI_MAIN_BODY.render(
+                    param_extraction=indent(param_extraction, "    "),
+                    function_call=indent(function_call, "    "),
+                    output=output
+                )
+            else:
+                main_body = MAIN_BODY.render(
+                    param_extraction=param_extraction,
+                    function_call=function_call,
+                    output=output
+                )
+            helper_methods = "\n    ".join(([TREE_HELPER_METHODS] if uses_tree else []) + list(readers.values()))
+        
+        return TEMPLATE.render(
+            imports="\n".join(imports) + "\n" if imports else "",
+            io_imports=BINARY_IMPORTS if binary else STREAM_IMPORTS if options.fast_io else "",
+            instrument_imports=INSTRUMENT_IMPORTS if options.instrument else "",
+            return_type=self.type_mapper.map_type(signature.returns.type),
+            function_name=signature.function_name,
+            params=", ".join(params),
+            main_method=self._generate_main_method(main_body, options),
+            helper_methods=helper_methods,
+            tree_node=TREE_NODE_DEFINITION if uses_tree else ""
+        )
+    
+    def _generate_main_method(self, main_body: str, options: GenerationOptions) -> str:
+        """Wrap the main body in main, on a large-stack thread when requested."""
+        if options.large_stack:
+            return LARGE_STACK_MAIN_METHOD.render(main_body=main_body, stack_mb=str(LARGE_STACK_MB))
+        return MAIN_METHOD.render(main_body=main_body)
+    
+    def _generate_parameter_extraction(self, signature: FunctionSignature, readers: Dict[str, str]) -> str:
+        """Generate parameter extraction code, adding any primitive array helper it calls to readers."""
+        lines = []
+        for param in signature.parameters:
+            node = parse_type(param.type)
+            if self._is_primitive_array(node):
+                lines.append(
+                    f"        {self.type_mapper.render(node)} {param.name} = "
+                    f"{self._json_array_expression(node, readers)}(data.getAsJsonArray(\"{param.name}\"));"
+                )
+            elif self._is_tree_type(param.type):
+                lines.append(f"        TreeNode {param.name} = deserializeTree(data.getAsJsonArray(\"{param.name}\"));")
+            elif param.type == 'Graph':
+                lines.append(f"        Map<Integer, List<Integer>> {param.name} = gson.fromJson(data.get(\"{param.name}\"), new TypeToken<Map<Integer, List<Integer>>>(){{}}.getType());")
+            else:
+                java_type = self.type_mapper.map_type(param.type)
+                lines.append(f"        {java_type} {param.name} = gson.fromJson(data.get(\"{param.name}\"), {self._get_type_token(param.type)});")
+        return "\n".join(lines)
+    
+    def _generate_function_call(self, signature: FunctionSignature, instrument: bool = False) -> str:
+        """Generate function call code, timed and reported to stderr when instrumented."""
+        param_names = [param.name for param in signature.parameters]
+        return_type = self.type_mapper.map_type(signature.returns.type)
+        call = f"{return_type} result = solution.{signature.function_name}({', '.join(param_names)});"
+        if instrument:
+            call = INSTRUMENTED_CALL.render(function_call=call, tag=INSTRUMENT_TAG)
+        return indent(call, "        ")
+    
+    def _is_primitive_array(self, node: TypeNode) -> bool:
+        """Check for an array (of arrays) of a non-string primitive, e.g. int[] or double[][]."""
+        if node.kind != 'array':
+            return False
+        element = node.element
+        return element.name in JSON_PRIMITIVE_ACCESSORS if element.kind == 'primitive' else self._is_primitive_array(element)
+    
+    def _json_array_expression(self, node: TypeNode, readers: Dict[str, str]) -> str:
+        """Name the JsonArray helper converting to node's Java array type, adding it to readers."""
+        name = f"to{self._stream_suffix(node)}"
+        if name not in readers:
+            element = node.element
+            if element.kind == 'primitive':
+                read_element = f"array.get(i).{JSON_PRIMITIVE_ACCESSORS[element.name]}()"
+            else:
+                read_element = f"{self._json_array_expression(element, readers)}(array.get(i).getAsJsonArray())"
+            java_element = self.type_mapper.render(element)
+            readers[name] = JSON_PRIMITIVE_ARRAY_READER.render(
+                element=java_element,
+                name=name,
+                new_array=self._new_array(java_element, "array.size()"),
+                read_element=read_element
+            )
+        return name
     
     def _get_type_token(self, dsl_type: str) -> str:
         """Get TypeToken for Gson deserialization."""
         java_type = self.type_mapper.map_type(dsl_type)
         return f"{java_type}.class"
+
+    
+    def _generate_stream_main_body(
+        self,
+        signature: FunctionSignature,
+        readers: Dict[str, str],
+        multi: bool = False,
+        instrument: bool = False
+    ) -> str:
+        """Generate the fast_io main body, collecting the reader helpers it needs."""
+        declarations = []
+        cases = []
+        for param in signature.parameters:
+            node = parse_type(param.type)
+            java_type = self.type_mapper.render(node)
+            default = STREAM_PRIMITIVES[node.name][2] if node.kind == 'primitive' else 'null'
+            declarations.append(f"        {java_type} {param.name} = {default};")
+            cases.append(
+                f'                case "{param.name}":\n'
+                f'                    {param.name} = {self._stream_read_expression(node, readers)};\n'
+                f'                    break;'
+            )
+        
+        if self._is_tree_type(signature.returns.type):
+            write_result = "        writeTree(result, new JsonWriter(out));"
+        else:
+            write_result = "        new Gson().toJson(result, out);"
+        
+        function_call = self._generate_function_call(signature, instrument)
+        if multi:
+            return STREAM_MULTI_MAIN_BODY.render(
+                declarations=indent("\n".join(declarations), "    "),
+                cases=indent("\n".join(cases), "    "),
+                function_call=indent(function_call, "    "),
+                write_result=indent(write_result, "    ")
+            )
+        return STREAM_MAIN_BODY.render(
+            declarations="\n".join(declarations),
+            cases="\n".join(cases),
+            function_call=function_call,
+            write_result=write_result
+        )
+    
+    def _generate_binary_main_body(
+        self,
+        signature: FunctionSignature,
+        readers: Dict[str, str],
+        multi: bool = False,
+        instrument: bool = False
+    ) -> str:
+        """Generate a main body reading the binary input layout, collecting the reader helpers it needs."""
+        declarations = []
+        for param in signature.parameters:
+            node = parse_type(param.type)
+            check_binary_type(node)
+            java_type = self.type_mapper.render(node)
+            declarations.append(f"        {java_type} {param.name} = {self._binary_read_expression(node, readers)};")
+        
+        function_call = self._generate_function_call(signature, instrument)
+        output = "serializeTree(result)" if self._is_tree_type(signature.returns.type) else "result"
+        if multi:
+            return BINARY_MULTI_MAIN_BODY.render(
+                declarations=indent("\n".join(declarations), "    "),
+                function_call=indent(function_call, "    "),
+                output=output
+            )
+        return BINARY_MAIN_BODY.render(
+            declarations="\n".join(declarations),
+            function_call=function_call,
+            output=output
+        )
+    
+    def _binary_read_expression(self, node: TypeNode, readers: Dict[str, str]) -> str:
+        """Return a ByteBuffer expression decoding node, adding any helper it calls to readers."""
+        if node.kind == 'primitive':
+            if node.name == 'string':
+                readers.setdefault("readString", BINARY_STRING_READER)
+            return BINARY_PRIMITIVES[node.name][0]
+        
+        name = f"read{self._stream_suffix(node)}"
+        if name not in readers:
+            element = node.element
+            read_element = self._binary_read_expression(element, readers)
+            java_element = self.type_mapper.render(element)
+            boxed = self.type_mapper.BOXED_TYPES.get(java_element, java_element)
+            if node.kind == 'list':
+                readers[name] = BINARY_LIST_READER.render(element=boxed, name=name, read_element=read_element)
+            elif element.kind == 'primitive' and BINARY_PRIMITIVES[element.name][1]:
+                readers[name] = BINARY_NUMERIC_ARRAY_READER.render(
+                    element=java_element, name=name, view=BINARY_PRIMITIVES[element.name][1], boxed=boxed
+                )
+            elif element.kind == 'primitive' and element.name == 'bool':
+                readers[name] = BINARY_BOOLEAN_ARRAY_READER
+            else:
+                readers[name] = BINARY_OBJECT_ARRAY_READER.render(
+                    element=java_element, name=name, read_element=read_element,
+                    empty_array=self._empty_array(java_element)
+                )
+        return f"{name}(data)"
+    
+    def _stream_read_expression(self, node: TypeNode, readers: Dict[str, str]) -> str:
+        """Return a JsonReader expression decoding node, adding any helper it calls to readers."""
+        if node.kind == 'primitive':
+            return STREAM_PRIMITIVES[node.name][0]
+        if node.kind == 'tree':
+            return "readTree(reader)"
+        if node.kind == 'graph':
+            readers.setdefault("readGraph", GRAPH_READER)
+            return "readGraph(reader)"
+        if node.kind not in ('array', 'list'):
+            raise ValueError(f"Unsupported type for fast_io: {node.name}")
+        
+        name = f"read{self._stream_suffix(node)}"
+        if name not in readers:
+            element = node.element
+            read_element = self._stream_read_expression(element, readers)
+            java_element = self.type_mapper.render(element)
+            if node.kind == 'list':
+                boxed = self.type_mapper.BOXED_TYPES.get(java_element, java_element)
+                readers[name] = LIST_READER.render(element=boxed, name=name, read_element=read_element)
+            elif element.kind == 'primitive' and element.name != 'string':
+                readers[name] = PRIMITIVE_ARRAY_READER.render(
+                    element=java_element, name=name, read_element=read_element
+                )
+            else:
+                readers[name] = OBJECT_ARRAY_READER.render(
+                    element=java_element, name=name, read_element=read_element,
+                    empty_array=self._empty_array(java_element)
+                )
+        return f"{name}(reader)"
+    
+    def _stream_suffix(self, node: TypeNode) -> str:
+        """Name a reader helper after its type: int[][] -> IntArrayArray."""
+        if node.kind == 'primitive':
+            return STREAM_PRIMITIVES[node.name][1]
+        if node.kind == 'array':
+            return self._stream_suffix(node.element) + "Array"
+        if node.kind == 'list':
+            return self._stream_suffix(node.element) + "List"
+        return node.kind.capitalize()
+    
+    def _empty_array(self, java_element: str) -> str:
+        """Array creation expression for toArray: int[] -> new int[0][], List<X> -> new List[0]."""
+        return self._new_array(java_element, "0")
     
-    def _is_tree_type(self, dsl_type: str) -> bool:
-        """Check if the type is a tree type."""
-        return 'Tree' in dsl_type
+    def _new_array(self, java_element: str, size: str) -> str:
+        """Array creation expression for size elements: (int[], n) -> new int[n][]."""
+        if '<' in java_element:
+            java_element = java_element[:java_element.index('<')] + java_element[java_element.rindex('>') + 1:]
+        name, bracket, rest = java_element.partition('[')
+        return f"new {name}[{size}]{bracket}{rest}"
@@ -1,110 +1,44 @@
-from typing import List
-from ..models import FunctionSignature
-from . import TemplateGenerator
+from textwrap import indent
+from typing import Optional
+from ..binary_format import check_binary_type
+from ..models import FunctionSignature, GenerationOptions, HarnessMode, InputFormat
+from ..type_mappers import TypeNode, parse_type
+from . import DEFAULT_OPTIONS, INSTRUMENT_TAG, LARGE_STACK_MB, TemplateGenerator
+from .fragments import CompiledTemplate
 
 
-class JavaScriptGenerator(TemplateGenerator):
-    """Template generator for JavaScript."""
-    
-    def __init__(self):
-        super().__init__('javascript')
-    
-    def generate_template(self, signature: FunctionSignature) -> str:
-        """Generate JavaScript template."""
-        all_types = self.get_all_types(signature)
-        
-        # Add TreeNode definition if needed
-        tree_node_def = ""
-        if any('Tree' in t for t in all_types):
-            tree_node_def = self._get_tree_node_definition() + "\n\n"
-        
-        # Generate function signature
-        params = [param.name for param in signature.parameters]
-        
-        mapped_return_type = self.type_mapper.map_type(signature.returns.type)
-        
-        function_template = f'''{tree_node_def}/**
- * @param {{{"}, {".join([f"{param.name}: {self.type_mapper.map_type(param.type)}" for param in signature.parameters])}}}
- * @return {{{mapped_return_type}}}
- */
-function {signature.function_name}({", ".join(params)}) {{
-    // Write your logic here
-    {self._get_default_return(mapped_return_type)}
-}}
-
-{self._generate_helper_functions(all_types)}
-
-// Do not edit below this line
-const readline = require('readline');
-const rl = readline.createInterface({{
-    input: process.stdin,
-    output: process.stdout
-}});
-
-let input = '';
-rl.on('line', (line) => {{
-    input += line;
-}});
-
-rl.on('close', () => {{
-    const data = JSON.parse(input);
-    
-    {self._generate_parameter_extraction(signature)}
-    
-    {self._generate_function_call_and_output(signature)}
-}});'''
-        
-        return function_template
-    
-    def _get_tree_node_definition(self) -> str:
-        """Get TreeNode class definition."""
-        return '''// Definition for a binary tree node
+TREE_NODE_DEFINITION = '''// Definition for a binary tree node
 function TreeNode(val, left, right) {
     this.val = (val===undefined ? 0 : val);
     this.left = (left===undefined ? null : left);
     this.right = (right===undefined ? null : right);
-}'''
-    
-    def _get_default_return(self, return_type: str) -> str:
-        """Get appropriate default return statement."""
-        if 'Tree' in return_type:
-            return "return null;"
-        elif return_type == 'Map<number, number[]>':
-            return "return new Map();"
-        elif 'number[]' in return_type or '[]' in return_type:
-            return "return [];"
-        elif return_type == 'number':
-            return "return 0;"
-        elif return_type == 'boolean':
-            return "return false;"
-        elif return_type == 'string':
-            return 'return "";'
-        else:
-            return "return null;"
-    
-    def _generate_helper_functions(self, all_types: List[str]) -> str:
-        """Generate helper functions if needed."""
-        if any('Tree' in t for t in all_types):
-            return '''
+}
+
+'''
+
+TREE_HELPER_FUNCTIONS = '''
 function deserializeTree(data) {
-    if (!data || data.length === 0) return null;
+    if (!data || data.length === 0 || data[0] === null) return null;
     
     const root = new TreeNode(data[0]);
-    const queue = [root];
+    // Index-based queue, sized once: every node is enqueued at most once
+    const queue = new Array(data.length);
+    queue[0] = root;
+    let head = 0, tail = 1;
     let i = 1;
     
-    while (queue.length > 0 && i < data.length) {
-        const node = queue.shift();
+    while (head < tail && i < data.length) {
+        const node = queue[head++];
         
-        if (i < data.length && data[i] !== null) {
+        if (data[i] !== null) {
             node.left = new TreeNode(data[i]);
-            queue.push(node.left);
+            queue[tail++] = node.left;
         }
         i++;
         
         if (i < data.length && data[i] !== null) {
             node.right = new TreeNode(data[i]);
-            queue.push(node.right);
+            queue[tail++] = node.right;
         }
         i++;
     }
@@ -117,11 +51,13 @@ function serializeTree(root) {
     
     const result = [];
     const queue = [root];
+    let last = 0;
     
-    while (queue.length > 0) {
-        const node = queue.shift();
+    for (let head = 0; head < queue.length; head++) {
+        const node = queue[head];
         
         if (node) {
+            last = result.length;
             result.push(node.val);
             queue.push(node.left);
             queue.push(node.right);
@@ -130,35 +66,344 @@ function serializeTree(root) {
         }
     }
     
-    // Remove trailing nulls
-    while (result.length > 0 && result[result.length - 1] === null) {
-        result.pop();
+    // Drop the trailing nulls in one step
+    result.length = last + 1;
+    return result;
+}'''
+
+TEMPLATE = CompiledTemplate('''@{tree_node}/**
+ * @param {@{jsdoc_params}}
+ * @return {@{return_type}}
+ */
+function @{function_name}(@{params}) {
+    // Write your logic here
+    @{default_return}
+}
+
+@{helper_functions}
+
+// Do not edit below this line
+@{driver}''')
+
+DRIVER = CompiledTemplate('''@{read_input}
+    
+@{param_extraction}
+    
+@{call_and_output}
+@{end_input}''')
+
+# large_stack: Node cannot grow the main thread's stack, so the file re-runs
+# itself on a worker thread with a bigger one. Streamed stdin is piped to the
+# worker; synchronous readers read file descriptor 0 directly.
+LARGE_STACK_LAUNCHER = CompiledTemplate('''const { Worker, isMainThread } = require('worker_threads');
+if (isMainThread) {
+    const worker = new Worker(__filename, { stdin: @{pipe_stdin}, resourceLimits: { stackSizeMb: @{stack_mb} } });
+@{pipe}    worker.on('exit', (code) => { process.exitCode = code; });
+} else {
+@{driver}
+}''')
+
+# Collect stdin as Buffer chunks and decode once at the end
+READ_INPUT_CHUNKS = '''const chunks = [];
+process.stdin.on('data', (chunk) => chunks.push(chunk));
+process.stdin.on('end', () => {
+    const data = JSON.parse(Buffer.concat(chunks).toString('utf8'));'''
+
+# fast_io: one synchronous read of file descriptor 0, no event loop round trips
+READ_INPUT_SYNC = '''(() => {
+    const data = JSON.parse(require('fs').readFileSync(0, 'utf8'));'''
+
+# multi: one NDJSON test case per line, answered as soon as the line arrives
+READ_LINES = '''const rl = require('readline').createInterface({ input: process.stdin, crlfDelay: Infinity });
+rl.on('line', (line) => {
+    if (!line.trim()) return;
+    const data = JSON.parse(line);'''
+
+READ_LINES_SYNC = '''for (const line of require('fs').readFileSync(0, 'utf8').split('\\n')) {
+    if (!line.trim()) continue;
+    const data = JSON.parse(line);'''
+
+# (harness_mode, fast_io) -> (input prologue, closing line)
+DRIVERS = {
+    (HarnessMode.SINGLE, False): (READ_INPUT_CHUNKS, "});"),
+    (HarnessMode.SINGLE, True): (READ_INPUT_SYNC, "})();"),
+    (HarnessMode.MULTI, False): (READ_LINES, "});"),
+    (HarnessMode.MULTI, True): (READ_LINES_SYNC, "}"),
+}
+
+# input_format=binary. Numeric arrays are decoded through one typed-array view
+# (native byte order, little-endian on every platform Node supports).
+BINARY_READER = '''class BinaryReader {
+    constructor(buffer) {
+        this.buffer = buffer;
+        this.view = new DataView(buffer.buffer, buffer.byteOffset, buffer.byteLength);
+        this.offset = 0;
+    }
+    
+    count() {
+        const value = this.view.getUint32(this.offset, true);
+        this.offset += 4;
+        return value;
     }
     
-    return result;
+    int32() {
+        const value = this.view.getInt32(this.offset, true);
+        this.offset += 4;
+        return value;
+    }
+    
+    int64() {
+        const value = Number(this.view.getBigInt64(this.offset, true));
+        this.offset += 8;
+        return value;
+    }
+    
+    float32() {
+        const value = this.view.getFloat32(this.offset, true);
+        this.offset += 4;
+        return value;
+    }
+    
+    float64() {
+        const value = this.view.getFloat64(this.offset, true);
+        this.offset += 8;
+        return value;
+    }
+    
+    bool() {
+        return this.view.getUint8(this.offset++) !== 0;
+    }
+    
+    string() {
+        const size = this.count();
+        const value = this.buffer.toString('utf8', this.offset, this.offset + size);
+        this.offset += size;
+        return value;
+    }
+    
+    typedArray(Type) {
+        const count = this.count();
+        const bytes = count * Type.BYTES_PER_ELEMENT;
+        const start = this.buffer.byteOffset + this.offset;
+        this.offset += bytes;
+        // Views need an aligned offset; unaligned data is copied out first
+        if (start % Type.BYTES_PER_ELEMENT === 0) {
+            return new Type(this.buffer.buffer, start, count);
+        }
+        return new Type(this.buffer.buffer.slice(start, start + bytes));
+    }
+    
+    list(read) {
+        const count = this.count();
+        const values = new Array(count);
+        for (let i = 0; i < count; i++) {
+            values[i] = read();
+        }
+        return values;
+    }
+}'''
+
+BINARY_DRIVERS = {
+    HarnessMode.SINGLE: ('''(() => {
+    const data = new BinaryReader(require('fs').readFileSync(0));''', "})();"),
+    HarnessMode.MULTI: ('''const data = new BinaryReader(require('fs').readFileSync(0));
+while (data.offset < data.buffer.length) {''', "}"),
+}
+
+# DSL primitive -> (BinaryReader scalar method, typed array expression)
+BINARY_PRIMITIVES = {
+    'int': ('int32', 'Array.from(data.typedArray(Int32Array))'),
+    'long': ('int64', 'Array.from(data.typedArray(BigInt64Array), Number)'),
+    'float': ('float32', 'Array.from(data.typedArray(Float32Array))'),
+    'double': ('float64', 'Array.from(data.typedArray(Float64Array))'),
+    'bool': ('bool', None),
+    'string': ('string', None),
+}
+
+# typed_arrays: DSL primitive -> typed array class. JSON numbers are doubles,
+# so float[] widens to Float64Array rather than losing precision.
+TYPED_ARRAYS = {
+    'int': 'Int32Array',
+    'float': 'Float64Array',
+    'double': 'Float64Array',
+}
+
+# typed_arrays: BinaryReader expression for each TYPED_ARRAYS entry
+BINARY_TYPED_ARRAYS = {
+    'int': 'data.typedArray(Int32Array)',
+    'float': 'Float64Array.from(data.typedArray(Float32Array))',
+    'double': 'data.typedArray(Float64Array)',
+}
+
+# JSON.stringify writes typed arrays as objects keyed by index
+TYPED_ARRAY_REPLACER = '''function typedArrayReplacer(key, value) {
+    return ArrayBuffer.isView(value) ? Array.from(value) : value;
 }'''
-        return ""
+
+# maxRSS is the process's peak resident set size in KiB
+INSTRUMENTED_CALL = CompiledTemplate('''    const startedCpu = process.cpuUsage();
+    const started = process.hrtime.bigint();
+    const result = @{function_call};
+    const wallNs = process.hrtime.bigint() - started;
+    const cpu = process.cpuUsage(startedCpu);
+    const cpuNs = (cpu.user + cpu.system) * 1000;
+    process.stderr.write(`@{tag} wall_ns=${wallNs} cpu_ns=${cpuNs} peak_kb=${process.resourceUsage().maxRSS}\\n`);''')
+
+
+class JavaScriptGenerator(TemplateGenerator):
+    """Template generator for JavaScript."""
     
-    def _generate_parameter_extraction(self, signature: FunctionSignature) -> str:
+    def __init__(self):
+        super().__init__('javascript')
+    
+    def generate_template(self, signature: FunctionSignature, options: Optional[GenerationOptions] = None) -> str:
+        """Generate JavaScript template."""
+        options = options or DEFAULT_OPTIONS
+        all_types = self.get_all_types(signature)
+        uses_tree = self._uses_tree(all_types)
+        
+        typed_arrays = options.typed_arrays
+        return_node = parse_type(signature.returns.type)
+        mapped_return_type = self._jsdoc_type(return_node, typed_arrays)
+        jsdoc_params = [
+            f"{param.name}: {self._jsdoc_type(parse_type(param.type), typed_arrays)}"
+            for param in signature.parameters
+        ]
+        # Solutions may return typed arrays wherever the return type holds numbers
+        typed_return = typed_arrays and not self._is_tree_type(signature.returns.type)
+        
+        binary = options.input_format == InputFormat.BINARY
+        if binary:
+            read_input, end_input = BINARY_DRIVERS[options.harness_mode]
+            param_extraction = self._generate_binary_extraction(signature, typed_arrays)
+        else:
+            read_input, end_input = DRIVERS[(options.harness_mode, options.fast_io)]
+            param_extraction = self._generate_parameter_extraction(signature, typed_arrays)
+        helper_functions = ([TREE_HELPER_FUNCTIONS] if uses_tree else []) + ([BINARY_READER] if binary else [])
+        if typed_return:
+            helper_functions.append(TYPED_ARRAY_REPLACER)
+        
+        driver = DRIVER.render(
+            read_input=read_input,
+            param_extraction=param_extraction,
+            call_and_output=self._generate_function_call_and_output(signature, options),
+            end_input=end_input
+        )
+        if options.large_stack:
+            pipe_stdin = read_input in (READ_INPUT_CHUNKS, READ_LINES)
+            driver = LARGE_STACK_LAUNCHER.render(
+                pipe_stdin="true" if pipe_stdin else "false",
+                pipe="    process.stdin.pipe(worker.stdin);\n" if pipe_stdin else "",
+                stack_mb=str(LARGE_STACK_MB),
+                driver=indent(driver, "    ", lambda line: True)
+            )
+        
+        return TEMPLATE.render(
+            tree_node=TREE_NODE_DEFINITION if uses_tree else "",
+            jsdoc_params="}, {".join(jsdoc_params),
+            return_type=mapped_return_type,
+            function_name=signature.function_name,
+            params=", ".join(param.name for param in signature.parameters),
+            default_return=(
+                f"return new {mapped_return_type}(0);" if mapped_return_type in TYPED_ARRAYS.values()
+                else self._get_default_return(mapped_return_type)
+            ),
+            helper_functions="\n\n".join(helper_functions),
+            driver=driver
+        )
+    
+    def _get_default_return(self, return_type: str) -> str:
+        """Get appropriate default return statement."""
+        if 'Tree' in return_type:
+            return "return null;"
+        elif return_type == 'Map<number, number[]>':
+            return "return new Map();"
+        elif 'number[]' in return_type or '[]' in return_type:
+            return "return [];"
+        elif return_type == 'number':
+            return "return 0;"
+        elif return_type == 'boolean':
+            return "return false;"
+        elif return_type == 'string':
+            return 'return "";'
+        else:
+            return "return null;"
+    
+    def _jsdoc_type(self, node: TypeNode, typed_arrays: bool) -> str:
+        """JSDoc type for node, naming typed arrays where typed_arrays applies."""
+        if not typed_arrays or not self._has_typed_array(node):
+            return self.type_mapper.render(node)
+        element = node.element
+        if node.kind == 'array' and element.kind == 'primitive':
+            return TYPED_ARRAYS[element.name]
+        return f"{self._jsdoc_type(element, typed_arrays)}[]"
+    
+    def _has_typed_array(self, node: TypeNode) -> bool:
+        """Check whether node is, or holds, an array of a TYPED_ARRAYS primitive."""
+        return any(
+            inner.kind == 'array' and inner.element.kind == 'primitive' and inner.element.name in TYPED_ARRAYS
+            for inner in node.walk()
+        )
+    
+    def _typed_array_expression(self, node: TypeNode, value: str) -> str:
+        """Convert the parsed JSON value of node to its typed_arrays form."""
+        if not self._has_typed_array(node):
+            return value
+        element = node.element
+        if node.kind == 'array' and element.kind == 'primitive':
+            return f"{TYPED_ARRAYS[element.name]}.from({value})"
+        return f"{value}.map((item) => {self._typed_array_expression(element, 'item')})"
+    
+    def _generate_parameter_extraction(self, signature: FunctionSignature, typed_arrays: bool = False) -> str:
         """Generate parameter extraction code."""
         lines = []
         for param in signature.parameters:
             if self._is_tree_type(param.type):
                 lines.append(f"    const {param.name} = deserializeTree(data.{param.name});")
+            elif typed_arrays:
+                value = self._typed_array_expression(parse_type(param.type), f"data.{param.name}")
+                lines.append(f"    const {param.name} = {value};")
             else:
                 lines.append(f"    const {param.name} = data.{param.name};")
         return "\n".join(lines)
     
-    def _generate_function_call_and_output(self, signature: FunctionSignature) -> str:
+    def _generate_binary_extraction(self, signature: FunctionSignature, typed_arrays: bool = False) -> str:
+        """Generate parameter extraction from the binary input layout."""
+        lines = []
+        for param in signature.parameters:
+            node = parse_type(param.type)
+            check_binary_type(node)
+            lines.append(f"    const {param.name} = {self._binary_read_expression(node, typed_arrays)};")
+        return "\n".join(lines)
+    
+    def _binary_read_expression(self, node: TypeNode, typed_arrays: bool = False) -> str:
+        """Return a BinaryReader expression that decodes node."""
+        if node.kind == 'primitive':
+            return f"data.{BINARY_PRIMITIVES[node.name][0]}()"
+        element = node.element
+        if typed_arrays and node.kind == 'array' and element.kind == 'primitive' and element.name in TYPED_ARRAYS:
+            return BINARY_TYPED_ARRAYS[element.name]
+        if element.kind == 'primitive' and BINARY_PRIMITIVES[element.name][1]:
+            return BINARY_PRIMITIVES[element.name][1]
+        return f"data.list(() => {self._binary_read_expression(element, typed_arrays)})"
+    
+    def _generate_function_call_and_output(self, signature: FunctionSignature, options: GenerationOptions) -> str:
         """Generate function call and output code."""
         param_names = [param.name for param in signature.parameters]
         function_call = f"{signature.function_name}({', '.join(param_names)})"
         
         if self._is_tree_type(signature.returns.type):
-            return f"    const result = {function_call};\n    console.log(JSON.stringify(serializeTree(result)));"
+            result = "serializeTree(result)"
+        elif options.typed_arrays:
+            result = "result, typedArrayReplacer"
         else:
-            return f"    const result = {function_call};\n    console.log(JSON.stringify(result));"
-    
-    def _is_tree_type(self, dsl_type: str) -> bool:
-        """Check if the type is a tree type."""
-        return 'Tree' in dsl_type
+            result = "result"
+        if options.fast_io:
+            output = f"process.stdout.write(JSON.stringify({result}) + '\\n');"
+        else:
+            output = f"console.log(JSON.stringify({result}));"
+        if options.instrument:
+            call = INSTRUMENTED_CALL.render(function_call=function_call, tag=INSTRUMENT_TAG)
+        else:
+            call = f"    const result = {function_call};"
+        return f"{call}\n    {output}"
@@ -1,84 +1,34 @@
-from typing import List
-from ..models import FunctionSignature
-from . import TemplateGenerator
+from textwrap import indent
+from typing import Optional
+from ..binary_format import SCALAR_FORMATS, check_binary_type
+from ..models import FunctionSignature, GenerationOptions, HarnessMode, InputFormat
+from ..type_mappers import TypeNode, parse_type
+from . import DEFAULT_OPTIONS, INSTRUMENT_TAG, LARGE_STACK_MB, TemplateGenerator
+from .fragments import CompiledTemplate
 
 
-class PythonGenerator(TemplateGenerator):
-    """Template generator for Python."""
-    
-    def __init__(self):
-        super().__init__('python')
-    
-    def generate_template(self, signature: FunctionSignature) -> str:
-        """Generate Python template."""
-        # Get all types for imports
-        all_types = self.get_all_types(signature)
-        imports = self.type_mapper.get_imports(all_types)
-        
-        # Build imports section
-        imports_section = ""
-        if imports:
-            imports_section = "\n".join(imports) + "\n\n"
-        
-        # Add TreeNode definition if needed
-        tree_node_def = ""
-        if any('Tree' in t for t in all_types):
-            tree_node_def = self._get_tree_node_definition() + "\n\n"
-        
-        # Generate function signature
-        params = []
-        for param in signature.parameters:
-            param_type = self.type_mapper.map_type(param.type)
-            params.append(f"{param.name}: {param_type}")
-        
-        return_type = self.type_mapper.map_type(signature.returns.type)
-        
-        function_def = f"class Solution:\n"
-        function_def += f"    def {signature.function_name}(self, {', '.join(params)}) -> {return_type}:\n"
-        function_def += f"        # Write your logic here\n"
-        function_def += f"        pass\n\n"
-        
-        # Generate main section with I/O handling
-        main_section = self._generate_main_section(signature)
-        
-        return imports_section + tree_node_def + function_def + main_section
-    
-    def _get_tree_node_definition(self) -> str:
-        """Get TreeNode class definition."""
-        return '''# Definition for a binary tree node
+# Tree annotations such as TreeNode[int] must not be evaluated at runtime
+TREE_FUTURE_IMPORT = 'from __future__ import annotations\n\n'
+
+TREE_NODE_DEFINITION = '''# Definition for a binary tree node
 class TreeNode:
     def __init__(self, val=0, left=None, right=None):
         self.val = val
         self.left = left
-        self.right = right'''
-    
-    def _generate_main_section(self, signature: FunctionSignature) -> str:
-        """Generate the main section with I/O handling."""
-        # Build parameter extraction logic
-        param_extraction = []
-        for param in signature.parameters:
-            if self._is_tree_type(param.type):
-                param_extraction.append(f"    {param.name} = self._deserialize_tree(data['{param.name}'])")
-            elif param.type == 'Graph':
-                param_extraction.append(f"    {param.name} = data['{param.name}']")
-            else:
-                param_extraction.append(f"    {param.name} = data['{param.name}']")
-        
-        # Build function call
-        param_names = [param.name for param in signature.parameters]
-        function_call = f"solution.{signature.function_name}({', '.join(param_names)})"
-        
-        # Build result serialization
-        if self._is_tree_type(signature.returns.type):
-            result_handling = f"    result = {function_call}\n    print(json.dumps(self._serialize_tree(result)))"
-        else:
-            result_handling = f"    result = {function_call}\n    print(json.dumps(result))"
-        
-        main_template = f'''if __name__ == "__main__":
+        self.right = right
+
+'''
+
+TEMPLATE = CompiledTemplate('''@{future_import}@{imports}@{tree_node}class Solution:
+    def @{function_name}(self, @{params}) -> @{return_type}:
+        # Write your logic here
+        pass
+
+if __name__ == "__main__":
     # Do not edit below this line
     import sys
     import json
-    
+@{instrument_imports}    
     class TreeHelper:
         @staticmethod
         def _deserialize_tree(data):
@@ -97,9 +47,11 @@ class TreeNode:
         def _serialize_tree(root):
             if not root:
                 return []
-            result, queue = [], [root]
-            while queue:
-                node = queue.pop(0)
+            # Level order over an index, so each node is visited once
+            result, queue, index = [], [root], 0
+            while index < len(queue):
+                node = queue[index]
+                index += 1
                 if node:
                     result.append(node.val)
                     queue.append(node.left)
@@ -111,16 +63,228 @@ class TreeNode:
                 result.pop()
             return result
     
-    data = json.loads(sys.stdin.read())
+@{binary_reader}@{driver}''')
+
+SINGLE_DRIVER = CompiledTemplate('''    data = @{read_input}
     solution = Solution()
     helper = TreeHelper()
     
-{chr(10).join(param_extraction)}
+@{param_extraction}
+    
+@{function_call}
+    @{write_output}''')
+
+# One NDJSON test case per line, a fresh Solution and one flushed result line each
+MULTI_DRIVER = CompiledTemplate('''    helper = TreeHelper()
+    for line in @{input_lines}:
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        solution = Solution()
+        
+@{param_extraction}
+        
+@{function_call}
+        @{write_output}
+        sys.stdout.flush()''')
+
+# input_format=binary: each numeric array is a single struct.unpack_from call
+BINARY_READER = '''    import struct
+    
+    class BinaryReader:
+        def __init__(self, data):
+            self.data = data
+            self.offset = 0
+        
+        def scalar(self, code):
+            value, = struct.unpack_from('<' + code, self.data, self.offset)
+            self.offset += struct.calcsize(code)
+            return value
+        
+        def count(self):
+            return self.scalar('I')
+        
+        def array(self, code):
+            count = self.count()
+            values = list(struct.unpack_from(f'<{count}{code}', self.data, self.offset))
+            self.offset += count * struct.calcsize(code)
+            return values
+        
+        def string(self):
+            size = self.count()
+            value = self.data[self.offset:self.offset + size].decode('utf-8')
+            self.offset += size
+            return value
     
-{result_handling}'''
+'''
+
+BINARY_MULTI_DRIVER = CompiledTemplate('''    helper = TreeHelper()
+    data = BinaryReader(sys.stdin.buffer.read())
+    while data.offset < len(data.data):
+        solution = Solution()
+        
+@{param_extraction}
         
-        return main_template
+@{function_call}
+        @{write_output}
+        sys.stdout.flush()''')
+
+# Deep recursion needs both a higher recursion limit and a bigger C stack
+# than the main thread has; a failure in the thread is re-raised here.
+LARGE_STACK_LAUNCHER = CompiledTemplate('''    import threading
+    
+    def main():
+@{driver}
+    
+    def run():
+        try:
+            main()
+        except BaseException as error:
+            failure.append(error)
     
-    def _is_tree_type(self, dsl_type: str) -> bool:
-        """Check if the type is a tree type."""
-        return 'Tree' in dsl_type
+    failure = []
+    sys.setrecursionlimit(1 << 20)
+    threading.stack_size(@{stack_mb} << 20)
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if failure:
+        raise failure[0]''')
+
+INSTRUMENT_IMPORTS = '''    import time
+    import resource
+'''
+
+# ru_maxrss is the process's peak resident set size, in KiB on Linux
+INSTRUMENTED_CALL = CompiledTemplate('''started_cpu = time.process_time_ns()
+started = time.perf_counter_ns()
+result = @{function_call}
+wall_ns = time.perf_counter_ns() - started
+cpu_ns = time.process_time_ns() - started_cpu
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sys.stderr.write(f"@{tag} wall_ns={wall_ns} cpu_ns={cpu_ns} peak_kb={peak_kb}\\n")''')
+
+
+class PythonGenerator(TemplateGenerator):
+    """Template generator for Python."""
+    
+    def __init__(self):
+        super().__init__('python')
+    
+    def generate_template(self, signature: FunctionSignature, options: Optional[GenerationOptions] = None) -> str:
+        """Generate Python template."""
+        options = options or DEFAULT_OPTIONS
+        
+        # Get all types for imports
+        all_types = self.get_all_types(signature)
+        imports = self.type_mapper.get_imports(all_types)
+        
+        # Generate function signature
+        params = [
+            f"{param.name}: {self.type_mapper.map_type(param.type)}"
+            for param in signature.parameters
+        ]
+        uses_tree = self._uses_tree(all_types)
+        
+        return TEMPLATE.render(
+            future_import=TREE_FUTURE_IMPORT if uses_tree else "",
+            imports="\n".join(imports) + "\n\n" if imports else "",
+            tree_node=TREE_NODE_DEFINITION if uses_tree else "",
+            function_name=signature.function_name,
+            params=", ".join(params),
+            return_type=self.type_mapper.map_type(signature.returns.type),
+            instrument_imports=INSTRUMENT_IMPORTS if options.instrument else "",
+            binary_reader=BINARY_READER if options.input_format == InputFormat.BINARY else "",
+            driver=self._generate_main(signature, options)
+        )
+    
+    def _generate_main(self, signature: FunctionSignature, options: GenerationOptions) -> str:
+        """Generate the driver, moved onto a large-stack thread when requested."""
+        driver = self._generate_driver(signature, options)
+        if options.large_stack:
+            return LARGE_STACK_LAUNCHER.render(
+                driver=indent(driver, "    ", lambda line: True),
+                stack_mb=str(LARGE_STACK_MB)
+            )
+        return driver
+    
+    def _generate_driver(self, signature: FunctionSignature, options: GenerationOptions) -> str:
+        """Generate the code that reads test input, calls the solution and prints results."""
+        if options.input_format == InputFormat.BINARY:
+            return self._generate_binary_driver(signature, options)
+        if options.harness_mode == HarnessMode.MULTI:
+            return MULTI_DRIVER.render(
+                input_lines="sys.stdin.buffer" if options.fast_io else "sys.stdin",
+                param_extraction=self._generate_parameter_extraction(signature, indent="        "),
+                function_call=indent(self._generate_function_call(signature, options), "        "),
+                write_output=self._generate_output(signature, options)
+            )
+        return SINGLE_DRIVER.render(
+            read_input="json.loads(sys.stdin.buffer.read())" if options.fast_io else "json.loads(sys.stdin.read())",
+            param_extraction=self._generate_parameter_extraction(signature),
+            function_call=indent(self._generate_function_call(signature, options), "    "),
+            write_output=self._generate_output(signature, options)
+        )
+    
+    def _generate_binary_driver(self, signature: FunctionSignature, options: GenerationOptions) -> str:
+        """Generate a driver that reads parameters from the binary input layout."""
+        multi = options.harness_mode == HarnessMode.MULTI
+        indent_text = "        " if multi else "    "
+        lines = []
+        for param in signature.parameters:
+            node = parse_type(param.type)
+            check_binary_type(node)
+            lines.append(f"{indent_text}{param.name} = {self._binary_read_expression(node)}")
+        param_extraction = "\n".join(lines)
+        function_call = indent(self._generate_function_call(signature, options), indent_text)
+        write_output = self._generate_output(signature, options)
+        
+        if multi:
+            return BINARY_MULTI_DRIVER.render(
+                param_extraction=param_extraction,
+                function_call=function_call,
+                write_output=write_output
+            )
+        return SINGLE_DRIVER.render(
+            read_input="BinaryReader(sys.stdin.buffer.read())",
+            param_extraction=param_extraction,
+            function_call=function_call,
+            write_output=write_output
+        )
+    
+    def _binary_read_expression(self, node: TypeNode) -> str:
+        """Return a BinaryReader expression that decodes node."""
+        if node.kind == 'primitive':
+            if node.name == 'string':
+                return "data.string()"
+            return f"data.scalar('{SCALAR_FORMATS[node.name]}')"
+        element = node.element
+        if element.kind == 'primitive' and element.name != 'string':
+            return f"data.array('{SCALAR_FORMATS[element.name]}')"
+        return f"[{self._binary_read_expression(element)} for _ in range(data.count())]"
+    
+    def _generate_function_call(self, signature: FunctionSignature, options: GenerationOptions) -> str:
+        """Generate the solution call, timed and reported to stderr when instrumented."""
+        param_names = [param.name for param in signature.parameters]
+        function_call = f"solution.{signature.function_name}({', '.join(param_names)})"
+        if options.instrument:
+            return INSTRUMENTED_CALL.render(function_call=function_call, tag=INSTRUMENT_TAG)
+        return f"result = {function_call}"
+    
+    def _generate_output(self, signature: FunctionSignature, options: GenerationOptions) -> str:
+        """Generate the statement that prints the result."""
+        result = "helper._serialize_tree(result)" if self._is_tree_type(signature.returns.type) else "result"
+        if options.fast_io:
+            # One buffered write instead of print's separate text and newline writes
+            return f'sys.stdout.write(json.dumps({result}) + "\\n")'
+        return f"print(json.dumps({result}))"
+    
+    def _generate_parameter_extraction(self, signature: FunctionSignature, indent: str = "    ") -> str:
+        """Generate parameter extraction code."""
+        lines = []
+        for param in signature.parameters:
+            if self._is_tree_type(param.type):
+                lines.append(f"{indent}{param.name} = helper._deserialize_tree(data['{param.name}'])")
+            else:
+                lines.append(f"{indent}{param.name} = data['{param.name}']")
+        return "\n".join(lines)
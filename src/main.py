@@ -1,10 +1,32 @@
-from fastapi import FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
-import traceback
+from typing import Optional
+from urllib.parse import urlencode
+import base64
+import json
+import logging
+import os
 
-from .models import TemplateRequest, TemplateResponse, ErrorResponse
-from .service import TemplateService
+from .binary_format import encode_test_cases
+from .cache import DEFAULT_SHARED_TTL, RedisCacheBackend, SharedCacheBackend, template_cache_key, template_etag
+from .catalog import TemplateCatalog
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .models import (
+    BatchTemplateRequest,
+    BinaryInputRequest,
+    BatchTemplateResponse,
+    ErrorResponse,
+    FunctionSignature,
+    GenerationOptions,
+    ProfilerSettings,
+    SupportedLanguage,
+    TemplateRequest,
+    TemplateResponse,
+)
+from .responses import FastJSONResponse, NDJSONStreamingResponse
+from .service import TemplateService, format_validation_errors
 
 app = FastAPI(
     title="Universal Code Template Generator API",
@@ -12,8 +34,85 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Initialize the template service
-template_service = TemplateService()
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_BATCH_MAX_ITEMS = 1000
+DEFAULT_STREAM_MAX_LINE_BYTES = 1024 * 1024
+TEMPLATE_CACHE_CONTROL = "public, max-age=86400"
+
+
+def _int_from_env(name: str, default: int, minimum: int = 0) -> int:
+    """Read an integer setting, falling back to the default on bad values."""
+    raw_value = os.environ.get(name)
+    if raw_value is None:
+        return default
+    try:
+        value = int(raw_value)
+    except ValueError:
+        value = minimum - 1
+    if value < minimum:
+        logger.error(
+            "Invalid %s %r: expected an integer >= %d, using %d",
+            name, raw_value, minimum, default
+        )
+        return default
+    return value
+
+
+def _cache_size_from_env() -> int:
+    """Read TEMPLATE_CACHE_SIZE, falling back to the default on bad values."""
+    return _int_from_env("TEMPLATE_CACHE_SIZE", DEFAULT_CACHE_SIZE)
+
+
+def _profile_sample_every_from_env() -> int:
+    """Read TEMPLATE_PROFILE_SAMPLE_EVERY; the default 0 leaves profiling off."""
+    return _int_from_env("TEMPLATE_PROFILE_SAMPLE_EVERY", 0)
+
+
+BatchTemplateRequest.max_items = _int_from_env(
+    "TEMPLATE_BATCH_MAX_ITEMS", DEFAULT_BATCH_MAX_ITEMS, minimum=1
+)
+
+STREAM_MAX_LINE_BYTES = _int_from_env(
+    "TEMPLATE_STREAM_MAX_LINE_BYTES", DEFAULT_STREAM_MAX_LINE_BYTES, minimum=1
+)
+
+
+def _catalog_from_env() -> Optional[TemplateCatalog]:
+    """Open the catalog at TEMPLATE_CATALOG_PATH; a missing or stale one is logged and skipped."""
+    path = os.environ.get("TEMPLATE_CATALOG_PATH")
+    if not path:
+        return None
+    try:
+        catalog = TemplateCatalog(path)
+    except (OSError, ValueError) as e:
+        logger.error("Not using template catalog %s: %s", path, e)
+        return None
+    logger.info("Serving %d catalogued templates from %s", len(catalog), path)
+    return catalog
+
+
+def _shared_cache_from_env() -> Optional[SharedCacheBackend]:
+    """Connect to the shared cache at TEMPLATE_REDIS_URL, if one is configured."""
+    url = os.environ.get("TEMPLATE_REDIS_URL")
+    if not url:
+        return None
+    try:
+        return RedisCacheBackend.from_url(url)
+    except ValueError as e:
+        logger.error("Not using shared template cache: %s", e)
+        return None
+
+
+# Initialize the template service (TEMPLATE_CACHE_SIZE=0 disables caching)
+template_service = TemplateService(
+    cache_size=_cache_size_from_env(),
+    profile_sample_every=_profile_sample_every_from_env(),
+    catalog=_catalog_from_env(),
+    shared_cache=_shared_cache_from_env(),
+    shared_cache_ttl=_int_from_env("TEMPLATE_REDIS_TTL", DEFAULT_SHARED_TTL, minimum=1)
+)
 
 
 @app.get("/")
@@ -28,16 +127,107 @@ async def health_check():
     return {"status": "healthy", "service": "template-generator"}
 
 
+def encode_signature_token(signature: FunctionSignature) -> str:
+    """Encode a signature as a URL-safe token for the cacheable GET route."""
+    canonical = json.dumps(signature.model_dump(mode="json"), separators=(",", ":"))
+    return base64.urlsafe_b64encode(canonical.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_signature_token(token: str) -> FunctionSignature:
+    """Decode a token produced by encode_signature_token."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid signature token")
+    return FunctionSignature.model_validate_json(raw)
+
+
+def template_url(signature: FunctionSignature, language: str, options: Optional[GenerationOptions] = None) -> str:
+    """Return the cacheable GET URL for a template; non-default options become query parameters."""
+    url = f"/api/v1/template/{language}/{encode_signature_token(signature)}"
+    if options is not None:
+        changed = options.model_dump(mode="json", exclude_defaults=True)
+        if changed:
+            url += "?" + urlencode({name: json.dumps(value).strip('"') for name, value in changed.items()})
+    return url
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag.
+
+    "*" is not honored: the ETag is computed before the request is validated,
+    so it would answer 304 for requests that cannot produce a template.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def _render_template(request: TemplateRequest) -> TemplateResponse:
+    """Validate and generate a template, mapping failures to HTTP errors.
+    
+    Routes run this in the threadpool: generation and shared cache lookups
+    block, and concurrent identical requests must overlap to be coalesced.
+    """
+    try:
+        # Validate the request
+        template_service.validate_request(request)
+        
+        # Generate the template
+        response = template_service.generate_template(request)
+        
+        return response
+        
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "Validation failed",
+                "details": format_validation_errors(e)
+            }
+        )
+    
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": str(e),
+                "details": None
+            }
+        )
+    
+    except Exception:
+        logger.exception("Unexpected error generating a %s template", request.language.value)
+        
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": "Internal server error",
+                "details": None
+            }
+        )
+
+
 @app.post(
     "/api/v1/template",
     response_model=TemplateResponse,
     status_code=status.HTTP_201_CREATED,
     responses={
+        304: {"description": "Not Modified - If-None-Match matched the template ETag"},
         400: {"model": ErrorResponse, "description": "Bad Request - Validation Error"},
         500: {"model": ErrorResponse, "description": "Internal Server Error"}
     }
 )
-async def generate_template(request: TemplateRequest):
+async def generate_template(
+    request: TemplateRequest,
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Generate a code template for the specified programming language and problem signature.
     
@@ -45,31 +235,185 @@ async def generate_template(request: TemplateRequest):
     and the target programming language, then returns a compilable/runnable template that hides
     all I/O and boilerplate from the end user.
     
+    The response carries an `ETag`; sending it back in `If-None-Match` returns
+    `304 Not Modified` without regenerating. `Content-Location` points at the
+    cacheable GET form of the same template.
+    
     Supported languages: Java 17, Python 3.12, C++20, JavaScript (Node 20)
     """
+    headers = {
+        "ETag": template_etag(template_cache_key(request.signature, request.language, request.options)),
+        "Content-Location": template_url(request.signature, request.language.value, request.options)
+    }
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    result = await run_in_threadpool(_render_template, request)
+    return FastJSONResponse(
+        {"language": result.language, "template": result.template},
+        status_code=status.HTTP_201_CREATED,
+        headers=headers
+    )
+
+
+@app.get(
+    "/api/v1/template/{language}/{signature_token}",
+    response_model=TemplateResponse,
+    responses={
+        304: {"description": "Not Modified - If-None-Match matched the template ETag"},
+        400: {"model": ErrorResponse, "description": "Bad Request - Validation Error"}
+    }
+)
+async def get_template(
+    language: SupportedLanguage,
+    signature_token: str,
+    options: GenerationOptions = Depends(),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Cacheable GET form of template generation.
+    
+    `signature_token` is the URL-safe base64 of the signature JSON, as returned
+    in the `Content-Location` header of `POST /api/v1/template`; generation
+    options are passed as query parameters. Responses are
+    public and carry an `ETag`, so CDNs and browsers can serve repeats.
+    """
     try:
-        # Validate the request
-        template_service.validate_request(request)
-        
-        # Generate the template
-        response = template_service.generate_template(request)
-        
-        return response
-        
-    except ValidationError as e:
-        error_details = {}
-        for error in e.errors():
-            field = ".".join(str(x) for x in error["loc"])
-            error_details[field] = error["msg"]
+        signature = decode_signature_token(signature_token)
+    except ValueError as e:
+        detail = {"error": "Validation failed", "details": None}
+        if isinstance(e, ValidationError):
+            detail["details"] = format_validation_errors(e)
+        else:
+            detail["error"] = str(e)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+    
+    headers = {
+        "ETag": template_etag(template_cache_key(signature, language, options)),
+        "Cache-Control": TEMPLATE_CACHE_CONTROL
+    }
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    request = TemplateRequest.model_construct(
+        question_id="",
+        title="",
+        description="",
+        signature=signature,
+        language=language,
+        options=options
+    )
+    result = await run_in_threadpool(_render_template, request)
+    return FastJSONResponse(
+        {"language": result.language, "template": result.template},
+        headers=headers
+    )
+
+
+@app.post("/api/v1/template/batch", response_model=BatchTemplateResponse)
+async def generate_template_batch(batch: BatchTemplateRequest):
+    """
+    Generate many templates in one request.
+    
+    Accepts either a list of `TemplateRequest` objects in `items`, or a single
+    `signature` with a list of `languages`. Each item gets its own result or
+    error, and identical signature/language pairs are generated only once.
+    """
+    try:
+        return await run_in_threadpool(template_service.generate_batch, batch)
+    
+    except Exception:
+        logger.exception("Unexpected error generating a template batch")
         
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={
-                "error": "Validation failed",
-                "details": error_details
+                "error": "Internal server error",
+                "details": None
             }
         )
+
+
+async def _iter_request_lines(request: Request, max_line_bytes: int):
+    """Yield the request body line by line without buffering it whole.
+    
+    Lines longer than max_line_bytes are discarded as they arrive and
+    yielded as None, so memory stays bounded by the cap.
+    """
+    pending = bytearray()
+    oversized = False
+    async for chunk in request.stream():
+        start = 0
+        while True:
+            newline = chunk.find(b"\n", start)
+            end = len(chunk) if newline < 0 else newline
+            if not oversized:
+                if len(pending) + end - start > max_line_bytes:
+                    oversized = True
+                    pending.clear()
+                else:
+                    pending += chunk[start:end]
+            if newline < 0:
+                break
+            yield None if oversized else bytes(pending)
+            pending.clear()
+            oversized = False
+            start = newline + 1
+    if oversized:
+        yield None
+    elif pending:
+        yield bytes(pending)
+
+
+async def _generate_ndjson(request: Request):
+    max_line_bytes = STREAM_MAX_LINE_BYTES
+    line_number = 0
+    async for line in _iter_request_lines(request, max_line_bytes):
+        line_number += 1
+        if line is None:
+            error = ErrorResponse(
+                error=f"Line exceeds {max_line_bytes} bytes",
+                details={"line": line_number}
+            )
+            yield error.model_dump_json() + "\n"
+        elif line.strip():
+            yield await run_in_threadpool(template_service.generate_json_line, line, line_number) + "\n"
+
+
+@app.post("/api/v1/template/stream", response_class=NDJSONStreamingResponse)
+async def generate_template_stream(request: Request):
+    """
+    Generate templates from a newline-delimited JSON body.
     
+    Each non-blank input line is a `TemplateRequest`, or a
+    `{"request_id", "title", "body"}` envelope whose `body` is one. Each output
+    line is the matching `TemplateResponse` or an error whose details carry the
+    input line number. Lines are read and written one at a time, and lines
+    over `TEMPLATE_STREAM_MAX_LINE_BYTES` are rejected, so memory use does not
+    grow with the size of the batch.
+    """
+    return NDJSONStreamingResponse(_generate_ndjson(request))
+
+
+@app.post(
+    "/api/v1/input/binary",
+    response_class=Response,
+    responses={
+        200: {"content": {"application/octet-stream": {}}, "description": "Test cases in the binary input layout"},
+        400: {"model": ErrorResponse, "description": "Bad Request - Validation Error"}
+    }
+)
+async def convert_binary_input(request: BinaryInputRequest):
+    """
+    Convert JSON test cases to the binary input layout.
+    
+    The body is a `signature` and a list of `cases`, each mapping parameter
+    names to JSON values. The response is the cases encoded back to back, ready
+    to pipe into a harness generated with `input_format=binary` (use
+    `harness_mode=multi` for more than one case).
+    """
+    try:
+        content = encode_test_cases(request.signature, request.cases)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -78,19 +422,94 @@ async def generate_template(request: TemplateRequest):
                 "details": None
             }
         )
+    return Response(content=content, media_type="application/octet-stream")
+
+
+@app.get("/api/v1/cache")
+async def get_cache_stats():
+    """Get template cache statistics."""
+    return template_service.cache_stats()
+
+
+@app.delete("/api/v1/cache")
+async def clear_cache():
+    """Flush the template cache."""
+    template_service.clear_cache()
+    return template_service.cache_stats()
+
+
+@app.get("/api/v1/profile")
+async def get_profiler_status():
+    """Get the sampling profiler settings and sample counters."""
+    return template_service.profiler.status()
+
+
+@app.put("/api/v1/profile")
+async def configure_profiler(settings: ProfilerSettings):
+    """Profile one in every `sample_every` template generations (0 turns profiling off).
     
-    except Exception as e:
-        # Log the error (in production, you'd use proper logging)
-        print(f"Unexpected error: {str(e)}")
-        print(traceback.format_exc())
-        
+    Samples collected so far are kept; DELETE drops them.
+    """
+    template_service.profiler.configure(settings.sample_every)
+    return template_service.profiler.status()
+
+
+@app.delete("/api/v1/profile")
+async def reset_profiler():
+    """Drop every collected profiling sample."""
+    template_service.profiler.reset()
+    return template_service.profiler.status()
+
+
+@app.get(
+    "/api/v1/profile/stats",
+    response_class=Response,
+    responses={
+        200: {
+            "content": {"text/plain": {}, "application/octet-stream": {}},
+            "description": "Aggregated profile of the sampled generations"
+        },
+        400: {"model": ErrorResponse, "description": "Bad Request - Unsupported sort key"}
+    }
+)
+async def get_profile_stats(format: str = "text", sort: str = "cumulative", limit: int = 50):
+    """
+    Dump the aggregated profile of sampled generations.
+    
+    `format=text` is the pstats report sorted by `sort` (`cumulative`,
+    `tottime`, `calls` or `name`) and cut to `limit` rows; `format=collapsed`
+    is one `frame;frame;... microseconds` line per stack, ready for flame
+    graph tools; `format=pstats` is a binary file for `pstats.Stats` or snakeviz.
+    """
+    profiler = template_service.profiler
+    if format == "pstats":
+        return Response(content=profiler.pstats_dump(), media_type="application/octet-stream")
+    try:
+        if format == "collapsed":
+            content = profiler.collapsed()
+        elif format == "text":
+            content = profiler.pstats_text(sort, limit)
+        else:
+            raise ValueError(f"Unsupported format: {format}")
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_400_BAD_REQUEST,
             detail={
-                "error": "Internal server error",
+                "error": str(e),
                 "details": None
             }
         )
+    return Response(content=content, media_type="text/plain; charset=utf-8")
+
+
+@app.get("/metrics", response_class=Response)
+async def get_metrics():
+    """Service metrics in the Prometheus text exposition format.
+    
+    Request counts, latency and template size by language, errors by
+    language and stage, per-stage generation latency, and cache counters.
+    """
+    return Response(content=template_service.render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 
 @app.get("/api/v1/languages")
@@ -127,16 +546,11 @@ async def get_supported_types():
 # Custom exception handler for validation errors
 @app.exception_handler(ValidationError)
 async def validation_exception_handler(request, exc: ValidationError):
-    error_details = {}
-    for error in exc.errors():
-        field = ".".join(str(x) for x in error["loc"])
-        error_details[field] = error["msg"]
-    
     return JSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={
             "error": "Validation failed",
-            "details": error_details
+            "details": format_validation_errors(exc)
         }
     )
 
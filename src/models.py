@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Any, ClassVar, Dict, List, Optional
 from enum import Enum
 
 
@@ -25,12 +25,72 @@ class FunctionSignature(BaseModel):
     returns: ReturnType = Field(..., description="Return type specification")
 
 
+class HarnessMode(str, Enum):
+    SINGLE = "single"
+    MULTI = "multi"
+
+
+class InputFormat(str, Enum):
+    JSON = "json"
+    BINARY = "binary"
+
+
+class GenerationOptions(BaseModel):
+    """Switches that change the generated harness code.
+    
+    Every field is part of the template cache key and ETag.
+    """
+    model_config = ConfigDict(frozen=True)
+    
+    fast_io: bool = Field(
+        False,
+        description=(
+            "Emit a faster I/O prologue: bulk binary stdin reads and a single buffered output write. "
+            "C++ allocates each input tree's nodes in one array, so solutions must not `delete` input nodes"
+        )
+    )
+    harness_mode: HarnessMode = Field(
+        HarnessMode.SINGLE,
+        description="`single` reads one JSON object; `multi` reads NDJSON test cases and writes one result line per case"
+    )
+    instrument: bool = Field(
+        False,
+        description="Time each solution call and report wall time, CPU time and peak memory on stderr"
+    )
+    large_stack: bool = Field(
+        False,
+        description="Run the harness on a thread with a large stack, so deeply recursive solutions do not overflow"
+    )
+    input_format: InputFormat = Field(
+        InputFormat.JSON,
+        description="`binary` reads the compact little-endian layout of POST /api/v1/input/binary instead of JSON"
+    )
+    typed_arrays: bool = Field(
+        False,
+        description="JavaScript only: pass int[] as Int32Array and float[]/double[] as Float64Array instead of plain arrays"
+    )
+
+
+class ProfilerSettings(BaseModel):
+    sample_every: int = Field(
+        ..., ge=0, description="Profile one in every N template generations; 0 turns profiling off"
+    )
+
+
 class TemplateRequest(BaseModel):
     question_id: str = Field(..., description="Unique identifier for the question")
     title: str = Field(..., description="Human-readable title")
     description: str = Field(..., description="Problem description")
     signature: FunctionSignature = Field(..., description="Function signature specification")
     language: SupportedLanguage = Field(..., description="Target programming language")
+    options: GenerationOptions = Field(default_factory=GenerationOptions, description="Harness generation options")
+
+
+class BinaryInputRequest(BaseModel):
+    signature: FunctionSignature = Field(..., description="Function signature the test cases are for")
+    cases: List[Dict[str, Any]] = Field(
+        ..., min_length=1, description="Test cases, each a parameter name -> JSON value mapping"
+    )
 
 
 class TemplateResponse(BaseModel):
@@ -41,3 +101,57 @@ class TemplateResponse(BaseModel):
 class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
     details: Optional[Dict[str, Any]] = Field(None, description="Additional error details")
+
+
+def _template_request_items_schema(schema: Dict[str, Any]) -> None:
+    """Document batch items as TemplateRequest objects in the OpenAPI schema."""
+    for variant in schema.get("anyOf", []):
+        if variant.get("type") == "array":
+            variant["items"] = {"$ref": "#/components/schemas/TemplateRequest"}
+
+
+class BatchTemplateRequest(BaseModel):
+    # Upper bound on items (or languages) per batch; the API sets it from
+    # TEMPLATE_BATCH_MAX_ITEMS at startup.
+    max_items: ClassVar[int] = 1000
+
+    items: Optional[List[Dict[str, Any]]] = Field(
+        None,
+        description="TemplateRequest objects; each item is validated on its own",
+        json_schema_extra=_template_request_items_schema
+    )
+    question_id: Optional[str] = Field(None, description="Question identifier for the signature form")
+    signature: Optional[FunctionSignature] = Field(
+        None, description="Single signature to generate for every language in `languages`"
+    )
+    languages: Optional[List[SupportedLanguage]] = Field(None, description="Target languages for `signature`")
+    options: GenerationOptions = Field(
+        default_factory=GenerationOptions, description="Harness generation options for the signature form"
+    )
+
+    @model_validator(mode="after")
+    def check_batch_form(self) -> "BatchTemplateRequest":
+        has_items = self.items is not None
+        has_signature = self.signature is not None or self.languages is not None
+        if has_items == has_signature:
+            raise ValueError("Provide either 'items' or 'signature' with 'languages'")
+        if has_signature and (self.signature is None or not self.languages):
+            raise ValueError("'signature' and a non-empty 'languages' list are both required")
+        size = len(self.items) if has_items else len(self.languages)
+        if size > self.max_items:
+            raise ValueError(f"Batch has {size} items; the limit is {self.max_items}")
+        return self
+
+
+class BatchTemplateResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the expanded batch")
+    question_id: Optional[str] = Field(None, description="Question identifier, if known")
+    language: Optional[str] = Field(None, description="Programming language, if known")
+    template: Optional[str] = Field(None, description="Generated code template")
+    error: Optional[ErrorResponse] = Field(None, description="Error for this item, if it failed")
+
+
+class BatchTemplateResponse(BaseModel):
+    results: List[BatchTemplateResult] = Field(..., description="Per-item results in request order")
+    succeeded: int = Field(..., description="Number of items with a template")
+    failed: int = Field(..., description="Number of items with an error")
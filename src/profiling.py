@@ -0,0 +1,203 @@
+"""Opt-in sampling profiler for template generation.
+
+With a sample rate of N, one in every N template generations runs under
+cProfile. A single profile accumulates every sample in memory and can be
+dumped as pstats text, a binary pstats file, or collapsed stacks for flame
+graph tools. While disabled, the only cost is one comparison per generation.
+"""
+import cProfile
+import io
+import itertools
+import marshal
+import os
+import pstats
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+# pstats function key: (file name, line number, function name)
+FunctionKey = Tuple[str, int, str]
+
+SORT_KEYS = ("cumulative", "tottime", "calls", "name")
+
+# Collapsed stacks are rebuilt from caller edges; bound their depth and fan-out
+MAX_STACK_DEPTH = 64
+MAX_STACKS_PER_FUNCTION = 64
+
+
+class SamplingProfiler:
+    """Profiles one in every N calls passed through run_sampled.
+
+    cProfile traces a single thread, so a sample that arrives while another
+    one is running is executed unprofiled and counted as skipped.
+    """
+
+    def __init__(self, sample_every: int = 0):
+        self._lock = threading.Lock()
+        self._skip_lock = threading.Lock()
+        self._profile = cProfile.Profile()
+        # Functions passed to run_sampled; the only stack roots worth reporting
+        self._roots: Set[FunctionKey] = set()
+        self.samples = 0
+        self.skipped = 0
+        self.configure(sample_every)
+
+    def configure(self, sample_every: int) -> None:
+        """Profile one in every sample_every calls; 0 turns profiling off."""
+        if sample_every < 0:
+            raise ValueError("Sample rate cannot be negative")
+        self._counter = itertools.count(1)
+        self.sample_every = sample_every
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_every > 0
+
+    def run_sampled(self, function: Callable[..., T], *args: Any) -> T:
+        """Call function, under the profiler if this call is sampled."""
+        every = self.sample_every
+        if every <= 0 or next(self._counter) % every:
+            return function(*args)
+        if not self._lock.acquire(blocking=False):
+            with self._skip_lock:
+                self.skipped += 1
+            return function(*args)
+        try:
+            self.samples += 1
+            self._roots.add(_function_key(function))
+            return self._profile.runcall(function, *args)
+        finally:
+            self._lock.release()
+
+    def reset(self) -> None:
+        """Drop every collected sample."""
+        with self._lock:
+            self._profile = cProfile.Profile()
+            self._roots = set()
+            self.samples = 0
+            with self._skip_lock:
+                self.skipped = 0
+
+    def status(self) -> Dict[str, Any]:
+        """Return the profiler settings and sample counters."""
+        return {
+            "enabled": self.enabled,
+            "sample_every": self.sample_every,
+            "samples": self.samples,
+            "skipped": self.skipped,
+        }
+
+    def _raw_stats(self) -> Dict[FunctionKey, tuple]:
+        with self._lock:
+            self._profile.create_stats()
+            return self._profile.stats
+
+    def _sampled_roots(self) -> Set[FunctionKey]:
+        with self._lock:
+            return set(self._roots)
+
+    def pstats_text(self, sort: str = "cumulative", limit: int = 50) -> str:
+        """Return the aggregated stats as pstats' text report."""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort}")
+        stats = self._raw_stats()
+        if not stats:
+            return ""
+        stream = io.StringIO()
+        report = pstats.Stats(stream=stream)
+        report.stats = stats
+        report.get_top_level_stats()
+        report.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def pstats_dump(self) -> bytes:
+        """Return the aggregated stats in the binary format pstats.Stats and snakeviz load."""
+        return marshal.dumps(self._raw_stats())
+
+    def collapsed(self) -> str:
+        """Return the aggregated stats as collapsed stacks, weighted in microseconds.
+
+        cProfile records caller -> callee edges rather than whole stacks, so
+        each function's own time is split across the stacks leading to it in
+        proportion to the time spent through each caller. Stacks rooted
+        anywhere but a sampled function, such as finalizers the garbage
+        collector ran mid-sample, are left out.
+        """
+        stats = self._raw_stats()
+        lines = []
+        for stack, seconds in sorted(_collapse(stats, self._sampled_roots()).items()):
+            weight = round(seconds * 1e6)
+            if weight:
+                lines.append(f"{';'.join(_frame_name(func) for func in stack)} {weight}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _function_key(function: Callable) -> Optional[FunctionKey]:
+    """Return the pstats key of a Python function or method, or None for builtins."""
+    code = getattr(getattr(function, "__func__", function), "__code__", None)
+    if code is None:
+        return None
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+
+def _frame_name(func: FunctionKey) -> str:
+    file_name, line, name = func
+    if file_name == "~":
+        return name
+    return f"{name} ({os.path.basename(file_name)}:{line})"
+
+
+def _collapse(stats: Dict[FunctionKey, tuple],
+              roots: Optional[Set[Optional[FunctionKey]]] = None) -> Dict[Tuple[FunctionKey, ...], float]:
+    """Map each reconstructed stack to the own time spent at its top.
+
+    Only functions without any recorded caller start a stack; when roots is
+    given and names only Python functions, stacks starting anywhere else are
+    dropped. A caller already on the stack is a recursive call and is not
+    followed again.
+    """
+    if roots is not None and None in roots:
+        roots = None
+    # Stacks of a function reached without cutting a recursive edge
+    memo: Dict[FunctionKey, List[Tuple[Tuple[FunctionKey, ...], float]]] = {}
+
+    def stacks(func: FunctionKey, active: frozenset) -> Tuple[List[Tuple[Tuple[FunctionKey, ...], float]], bool]:
+        if func in memo:
+            return memo[func], True
+        known = {caller: edge for caller, edge in stats[func][4].items() if caller in stats}
+        callers = {caller: edge for caller, edge in known.items() if caller not in active}
+        complete = len(callers) == len(known)
+        # Weight callers by time through them, or by call count when too fast to time
+        weights = {caller: edge[3] for caller, edge in callers.items()}
+        total = sum(weights.values())
+        if total <= 0:
+            weights = {caller: edge[1] for caller, edge in callers.items()}
+            total = sum(weights.values())
+        if not known:
+            result = [((func,), 1.0)] if roots is None or func in roots else []
+        elif not callers:
+            result = []
+        elif total <= 0 or len(active) >= MAX_STACK_DEPTH:
+            result = [((func,), 1.0)]
+            complete = False
+        else:
+            active = active | {func}
+            result = []
+            for caller, weight in weights.items():
+                caller_stacks, caller_complete = stacks(caller, active)
+                complete = complete and caller_complete
+                for stack, share in caller_stacks:
+                    result.append((stack + (func,), share * weight / total))
+            result.sort(key=lambda item: -item[1])
+            del result[MAX_STACKS_PER_FUNCTION:]
+        if complete:
+            memo[func] = result
+        return result, complete
+
+    collapsed: Dict[Tuple[FunctionKey, ...], float] = {}
+    for func, (_, _, own_time, _, _) in stats.items():
+        for stack, share in stacks(func, frozenset())[0]:
+            collapsed[stack] = collapsed.get(stack, 0.0) + own_time * share
+    return collapsed
@@ -0,0 +1,47 @@
+import json
+from typing import Any
+
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def dumps_json(content: Any) -> bytes:
+    """Serialize plain JSON data to compact UTF-8 bytes, using orjson if installed."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for plain dicts that skips FastAPI's generic encoder.
+
+    Routes return it directly with already JSON-compatible content, so the
+    response model is used for the OpenAPI schema only and the body is
+    serialized once by orjson (or the stdlib when orjson is missing).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Streaming NDJSON response whose body is produced from the request body.
+
+    Starlette's StreamingResponse watches for client disconnects by calling
+    receive() in a second task. That task would compete with request.stream()
+    for the request body and deadlock, so this response only streams; a
+    disconnect surfaces as ClientDisconnect from the body iterator instead.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+        if self.background is not None:
+            await self.background()
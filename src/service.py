@@ -1,21 +1,136 @@
-from .models import TemplateRequest, TemplateResponse
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from .models import (
+    BatchTemplateRequest,
+    BatchTemplateResponse,
+    BatchTemplateResult,
+    ErrorResponse,
+    SupportedLanguage,
+    TemplateRequest,
+    TemplateResponse,
+)
 from .generators.factory import GeneratorFactory
+from .cache import (
+    DEFAULT_SHARED_TTL,
+    SharedCacheBackend,
+    TemplateCache,
+    TemplateKey,
+    TieredTemplateCache,
+    template_cache_key,
+)
+from .catalog import TemplateCatalog
+from .metrics import SIZE_BUCKETS, MetricsRegistry
+from .profiling import SamplingProfiler
+from .singleflight import SingleFlight
+
+
+# Stages timed by template_stage_duration_seconds, in the order they run
+STAGES = ("validate", "generator_lookup", "type_mapping", "assembly")
+
+# SupportedLanguage members hash and compare like their values, so one
+# lookup serves both enum members and plain strings
+_LANGUAGE_LABELS = {language.value: language.value for language in SupportedLanguage}
+
+
+def _language_label(language: Any) -> str:
+    """Metric label for a language; unsupported names share one label to bound cardinality."""
+    return _LANGUAGE_LABELS.get(language, "other")
+
+
+def format_validation_errors(error: ValidationError) -> Dict[str, str]:
+    """Flatten Pydantic validation errors into a field -> message mapping."""
+    error_details = {}
+    for item in error.errors():
+        field = ".".join(str(x) for x in item["loc"])
+        error_details[field] = item["msg"]
+    return error_details
 
 
 class TemplateService:
     """Service class for generating code templates."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache_size: int = 1024,
+        cache_enabled: bool = True,
+        profile_sample_every: int = 0,
+        catalog: Optional[TemplateCatalog] = None,
+        shared_cache: Optional[SharedCacheBackend] = None,
+        shared_cache_ttl: int = DEFAULT_SHARED_TTL
+    ):
         self.generator_factory = GeneratorFactory()
+        if shared_cache is not None:
+            self.cache: TemplateCache = TieredTemplateCache(
+                shared_cache, max_size=cache_size, enabled=cache_enabled, ttl=shared_cache_ttl
+            )
+        else:
+            self.cache = TemplateCache(max_size=cache_size, enabled=cache_enabled)
+        # Pre-generated templates; hits are read from the mapping and never
+        # copied into the per-process cache
+        self.catalog = catalog
+        # Profiles one in every profile_sample_every generations; 0 is off
+        self.profiler = SamplingProfiler(profile_sample_every)
+        # Concurrent misses for the same key share one generation
+        self.flights = SingleFlight()
+        self._init_metrics()
+    
+    def _init_metrics(self) -> None:
+        self.metrics = MetricsRegistry()
+        self.requests_total = self.metrics.counter(
+            "template_requests_total", "Templates served, from the cache or generated.", ("language",)
+        )
+        self.errors_total = self.metrics.counter(
+            "template_errors_total", "Requests that failed, by the stage that raised.", ("language", "stage")
+        )
+        self.request_duration = self.metrics.histogram(
+            "template_request_duration_seconds", "Time to serve one template, including cache hits.", ("language",)
+        )
+        self.template_size = self.metrics.histogram(
+            "template_size_bytes", "UTF-8 size of served templates.", ("language",), SIZE_BUCKETS
+        )
+        self.stage_duration = self.metrics.histogram(
+            "template_stage_duration_seconds", "Time spent in each generation stage.", ("language", "stage")
+        )
+        for name, help_text in (
+            ("hits", "Template cache hits."),
+            ("misses", "Template cache misses."),
+            ("evictions", "Template cache evictions."),
+        ):
+            self.metrics.callback(
+                f"template_cache_{name}_total", help_text, "counter", lambda name=name: self.cache.stats()[name]
+            )
+        self.metrics.callback("template_cache_entries", "Templates in the cache.", "gauge", lambda: len(self.cache))
+        for name, help_text in (
+            ("hits", "Local cache misses found in the shared cache."),
+            ("misses", "Local cache misses not in the shared cache."),
+            ("errors", "Failed shared cache calls."),
+        ):
+            self.metrics.callback(
+                f"template_shared_cache_{name}_total", help_text, "counter",
+                lambda name=name: self.cache.stats().get("shared", {}).get(name, 0)
+            )
+        self.metrics.callback(
+            "template_generations_total", "Templates generated after a cache miss.", "counter",
+            lambda: self.flights.stats()["leaders"]
+        )
+        self.metrics.callback(
+            "template_coalesced_requests_total",
+            "Cache misses that waited for an identical generation already in flight.", "counter",
+            lambda: self.flights.stats()["coalesced"]
+        )
+        self.metrics.callback(
+            "template_catalog_hits_total", "Templates served from the catalog.", "counter",
+            lambda: self.catalog.hits if self.catalog is not None else 0
+        )
     
     def generate_template(self, request: TemplateRequest) -> TemplateResponse:
         """Generate a code template based on the request."""
         try:
-            # Get the appropriate generator
-            generator = self.generator_factory.get_generator(request.language)
-            
-            # Generate the template
-            template_code = generator.generate_template(request.signature)
+            template_code = self._get_or_generate(request)
             
             return TemplateResponse(
                 language=request.language,
@@ -25,8 +140,234 @@ class TemplateService:
         except Exception as e:
             raise ValueError(f"Failed to generate template: {str(e)}")
     
+    def generate_batch(self, batch: BatchTemplateRequest) -> BatchTemplateResponse:
+        """Generate templates for every item of a batch.
+        
+        Items that fail validation or generation get a per-item error instead
+        of failing the whole batch, and items that share a signature and
+        language are generated only once. Cached templates are fetched with
+        one multi-get and new ones are stored with one multi-put, so a shared
+        cache costs two round trips per batch.
+        """
+        if batch.items is not None:
+            entries = batch.items
+        else:
+            entries = [
+                TemplateRequest.model_construct(
+                    question_id=batch.question_id,
+                    title="",
+                    description="",
+                    signature=batch.signature,
+                    language=language,
+                    options=batch.options
+                )
+                for language in batch.languages
+            ]
+        
+        results = []
+        pending: List[Tuple[BatchTemplateResult, TemplateRequest, TemplateKey]] = []
+        for index, entry in enumerate(entries):
+            result = BatchTemplateResult(index=index)
+            results.append(result)
+            
+            if isinstance(entry, TemplateRequest):
+                request = entry
+            else:
+                try:
+                    request = TemplateRequest.model_validate(entry)
+                except ValidationError as e:
+                    question_id = entry.get("question_id")
+                    result.question_id = question_id if isinstance(question_id, str) else None
+                    result.error = ErrorResponse(
+                        error="Validation failed",
+                        details=format_validation_errors(e)
+                    )
+                    continue
+            
+            result.question_id = request.question_id
+            result.language = request.language.value
+            try:
+                self.validate_request(request)
+            except ValueError as e:
+                result.error = ErrorResponse(error=str(e))
+                continue
+            pending.append((result, request, template_cache_key(request.signature, request.language, request.options)))
+        
+        prefetched = self._lookup_many(list(dict.fromkeys(cache_key for _, _, cache_key in pending)))
+        templates: Dict[TemplateKey, str] = {}
+        generated: Dict[TemplateKey, str] = {}
+        for result, request, cache_key in pending:
+            try:
+                if cache_key not in templates:
+                    templates[cache_key] = self._get_or_generate(request, cache_key, prefetched)
+                    if cache_key not in prefetched:
+                        generated[cache_key] = templates[cache_key]
+                result.template = templates[cache_key]
+            except ValueError as e:
+                result.error = ErrorResponse(error=str(e))
+            except Exception as e:
+                result.error = ErrorResponse(error=f"Failed to generate template: {str(e)}")
+        self.cache.put_many(generated)
+        
+        failed = sum(1 for result in results if result.error is not None)
+        return BatchTemplateResponse(
+            results=results,
+            succeeded=len(results) - failed,
+            failed=failed
+        )
+    
+    def generate_json_line(self, line: Union[str, bytes], line_number: int) -> str:
+        """Generate a template from one NDJSON request line.
+        
+        The line is a TemplateRequest, or a ``{"request_id", "title", "body"}``
+        envelope (the backlog/JSONL layout) whose body is a TemplateRequest
+        object or its JSON string; the request_id is echoed in the output.
+        Returns a serialized TemplateResponse, or a serialized ErrorResponse
+        whose details include the input line number.
+        """
+        details: Dict[str, Any] = {"line": line_number}
+        try:
+            payload = json.loads(line)
+        except ValueError as e:
+            details["body"] = f"Invalid JSON: {str(e)}"
+            return ErrorResponse(error="Validation failed", details=details).model_dump_json()
+        
+        request_id = None
+        if isinstance(payload, dict) and "request_id" in payload and "body" in payload:
+            request_id = payload["request_id"]
+            details["request_id"] = request_id
+            payload = payload["body"]
+            if isinstance(payload, str):
+                try:
+                    payload = json.loads(payload)
+                except ValueError:
+                    details["body"] = "Envelope body is not a TemplateRequest"
+                    return ErrorResponse(error="Validation failed", details=details).model_dump_json()
+        
+        try:
+            request = TemplateRequest.model_validate(payload)
+        except ValidationError as e:
+            details.update(format_validation_errors(e))
+            return ErrorResponse(error="Validation failed", details=details).model_dump_json()
+        
+        try:
+            self.validate_request(request)
+            response = self.generate_template(request)
+        except ValueError as e:
+            return ErrorResponse(error=str(e), details=details).model_dump_json()
+        
+        if request_id is None:
+            return response.model_dump_json()
+        return json.dumps({"request_id": request_id, **response.model_dump(mode="json")})
+    
+    def _get_or_generate(
+        self,
+        request: TemplateRequest,
+        cache_key: Optional[TemplateKey] = None,
+        prefetched: Optional[Dict[TemplateKey, str]] = None
+    ) -> str:
+        """Return the template for a request, generating it on a cache miss.
+        
+        Batch callers pass the result of _lookup_many as prefetched; keys
+        missing from it are generated without another lookup and left for
+        the caller to store with cache.put_many.
+        """
+        language = _language_label(request.language)
+        started = time.perf_counter()
+        if cache_key is None:
+            cache_key = template_cache_key(request.signature, request.language, request.options)
+        
+        # Serve catalogued and repeat signatures without generating
+        if prefetched is not None:
+            template_code = prefetched.get(cache_key)
+        else:
+            template_code = self.catalog.get(cache_key) if self.catalog is not None else None
+            if template_code is None:
+                template_code = self.cache.get(cache_key)
+        if template_code is None:
+            template_code = self.flights.do(cache_key, self._generate_and_store, request, language,
+                                            cache_key if prefetched is None else None)
+        
+        self.requests_total.inc(language)
+        self.request_duration.observe(time.perf_counter() - started, language)
+        self.template_size.observe(len(template_code.encode("utf-8")), language)
+        return template_code
+    
+    def _generate_and_store(self, request: TemplateRequest, language: str, cache_key: Optional[TemplateKey]) -> str:
+        """Generate a template and, given a cache_key, cache it."""
+        template_code = self.profiler.run_sampled(self._generate, request, language)
+        if cache_key is not None:
+            self.cache.put(cache_key, template_code)
+        return template_code
+    
+    def _lookup_many(self, keys: List[TemplateKey]) -> Dict[TemplateKey, str]:
+        """Return the catalogued or cached templates among keys."""
+        found: Dict[TemplateKey, str] = {}
+        if self.catalog is not None:
+            for key in keys:
+                template_code = self.catalog.get(key)
+                if template_code is not None:
+                    found[key] = template_code
+        found.update(self.cache.get_many([key for key in keys if key not in found]))
+        return found
+    
+    def _generate(self, request: TemplateRequest, language: str) -> str:
+        """Generate a template, timing each stage into template_stage_duration_seconds."""
+        stage = STAGES[1]
+        started = time.perf_counter()
+        try:
+            # Get the appropriate generator
+            generator = self.generator_factory.get_generator(request.language)
+            started = self._end_stage(language, stage, started)
+            
+            # Parse and map every signature type up front, so assembly reads
+            # them from the warm parse memo
+            stage = STAGES[2]
+            for dsl_type in generator.get_all_types(request.signature):
+                generator.type_mapper.map_type(dsl_type)
+            started = self._end_stage(language, stage, started)
+            
+            # Generate the template
+            stage = STAGES[3]
+            template_code = generator.generate_template(request.signature, request.options)
+            self._end_stage(language, stage, started)
+        except Exception:
+            self.errors_total.inc(language, stage)
+            raise
+        return template_code
+    
+    def _end_stage(self, language: str, stage: str, started: float) -> float:
+        """Record a stage that began at started; returns the time it ended."""
+        now = time.perf_counter()
+        self.stage_duration.observe(now - started, language, stage)
+        return now
+    
+    def render_metrics(self) -> str:
+        """Return every service metric in the Prometheus text format."""
+        return self.metrics.render()
+    
+    def cache_stats(self) -> dict:
+        """Return hit/miss counters for the template cache."""
+        return self.cache.stats()
+    
+    def clear_cache(self) -> None:
+        """Flush every cached template."""
+        self.cache.clear()
+    
     def validate_request(self, request: TemplateRequest) -> bool:
         """Validate the template request."""
+        language = _language_label(request.language)
+        started = time.perf_counter()
+        try:
+            self._check_request(request)
+        except ValueError:
+            self.errors_total.inc(language, STAGES[0])
+            raise
+        finally:
+            self._end_stage(language, STAGES[0], started)
+        return True
+    
+    def _check_request(self, request: TemplateRequest) -> None:
         # Check if language is supported
         supported_languages = ['python', 'java', 'cpp', 'javascript']
         if request.language not in supported_languages:
@@ -46,5 +387,3 @@ class TemplateService:
         # Check if return type is valid
         if not request.signature.returns.type:
             raise ValueError("Return type cannot be empty")
-        
-        return True
@@ -1,14 +1,166 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterator, List, NamedTuple, Tuple
 import re
+import threading
+
+
+PRIMITIVE_TYPES = frozenset(['int', 'long', 'float', 'double', 'bool', 'string'])
+
+_TOKEN_PATTERN = re.compile(r'\s*(\w+|\[\]|[<>,])')
+
+
+class TypeNode(NamedTuple):
+    """A parsed DSL type.
+    
+    ``kind`` is one of ``primitive``, ``array``, ``list``, ``tree``, ``graph``
+    or ``named`` (an unknown type that mappers pass through verbatim).
+    Valid types are interned (up to a fixed table size), so equal types
+    usually parse to the same object; compare nodes with ``==``.
+    """
+    kind: str
+    name: str
+    args: Tuple['TypeNode', ...] = ()
+    
+    @property
+    def element(self) -> 'TypeNode':
+        """The element/value type of an array, list or typed tree."""
+        return self.args[0]
+    
+    def walk(self) -> Iterator['TypeNode']:
+        """Yield this node and every nested node, depth first."""
+        yield self
+        for arg in self.args:
+            yield from arg.walk()
+    
+    def contains(self, kind: str) -> bool:
+        """Check whether this type or any nested type is of the given kind."""
+        return kind in _node_kinds(self)
+
+
+# Type strings come from clients, so both the intern table and the parse
+# memo are bounded to keep unique strings from growing a worker forever.
+MAX_INTERNED_TYPES = 4096
+PARSE_CACHE_SIZE = 4096
+
+_interned: Dict[TypeNode, TypeNode] = {}
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _node_kinds(node: TypeNode) -> FrozenSet[str]:
+    return frozenset(inner.kind for inner in node.walk())
+
+
+def _intern(node: TypeNode) -> TypeNode:
+    if node.args:
+        node = node._replace(args=tuple(_intern(arg) for arg in node.args))
+    interned = _interned.get(node)
+    if interned is not None:
+        return interned
+    if len(_interned) >= MAX_INTERNED_TYPES:
+        return node
+    return _interned.setdefault(node, node)
+
+
+class _TypeParser:
+    """Recursive-descent parser for the type DSL.
+    
+    Grammar: ``type := IDENT ('<' type '>')? ('[]')*``
+    """
+    
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = []
+        pos = 0
+        source = source.rstrip()
+        while pos < len(source):
+            match = _TOKEN_PATTERN.match(source, pos)
+            if not match:
+                raise ValueError(f"Invalid type: {self.source}")
+            self.tokens.append((match.group(1), match.start(1)))
+            pos = match.end()
+        self.index = 0
+    
+    def parse(self) -> TypeNode:
+        node = self._parse_type()
+        if self.index != len(self.tokens):
+            raise ValueError(f"Invalid type: {self.source}")
+        return node
+    
+    def _peek(self) -> str:
+        if self.index < len(self.tokens):
+            return self.tokens[self.index][0]
+        return ''
+    
+    def _next(self) -> str:
+        token = self._peek()
+        if not token:
+            raise ValueError(f"Invalid type: {self.source}")
+        self.index += 1
+        return token
+    
+    def _parse_type(self) -> TypeNode:
+        start = self.tokens[self.index][1] if self.index < len(self.tokens) else 0
+        name = self._next()
+        if not re.fullmatch(r'\w+', name):
+            raise ValueError(f"Invalid type: {self.source}")
+        
+        args = []
+        if self._peek() == '<':
+            self._next()
+            args.append(self._parse_type())
+            while self._peek() == ',':
+                self._next()
+                args.append(self._parse_type())
+            if self._next() != '>':
+                raise ValueError(f"Invalid type: {self.source}")
+        
+        if name == 'List' and len(args) == 1:
+            node = TypeNode('list', name, tuple(args))
+        elif name == 'Tree' and len(args) <= 1:
+            node = TypeNode('tree', name, tuple(args))
+        elif name == 'Graph' and not args:
+            node = TypeNode('graph', name)
+        elif name in PRIMITIVE_TYPES and not args:
+            node = TypeNode('primitive', name)
+        elif not args:
+            node = TypeNode('named', name)
+        else:
+            # Unknown generic: keep its source text so mappers pass it through
+            end = self.tokens[self.index - 1][1] + 1
+            node = TypeNode('named', self.source[start:end])
+        
+        while self._peek() == '[]':
+            self._next()
+            node = TypeNode('array', '[]', (node,))
+        return node
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_type(dsl_type: str) -> TypeNode:
+    """Parse a DSL type string into an interned TypeNode.
+    
+    Results are memoized per string (LRU-bounded), so a recurring type is
+    tokenized once per process. Strings that are not valid DSL become ``named`` nodes.
+    """
+    try:
+        node = _TypeParser(dsl_type).parse()
+    except ValueError:
+        # Not interned: malformed strings are one-offs from bad requests
+        return TypeNode('named', dsl_type)
+    return _intern(node)
 
 
 class TypeMapper(ABC):
     """Abstract base class for type mapping between DSL and target languages."""
     
-    @abstractmethod
     def map_type(self, dsl_type: str) -> str:
         """Map a DSL type to the target language type."""
+        return self.render(parse_type(dsl_type))
+    
+    @abstractmethod
+    def render(self, node: TypeNode) -> str:
+        """Render a parsed DSL type as a target language type."""
         pass
     
     @abstractmethod
@@ -30,41 +182,27 @@ class PythonTypeMapper(TypeMapper):
         'Graph': 'Dict[int, List[int]]'
     }
     
-    def map_type(self, dsl_type: str) -> str:
-        # Handle arrays: int[] -> List[int]
-        array_match = re.match(r'(\w+)\[\]', dsl_type)
-        if array_match:
-            base_type = array_match.group(1)
-            mapped_base = self.TYPE_MAPPING.get(base_type, base_type)
-            return f'List[{mapped_base}]'
-        
-        # Handle generic List: List<int[]> -> List[List[int]]
-        list_match = re.match(r'List<(.+)>', dsl_type)
-        if list_match:
-            inner_type = list_match.group(1)
-            mapped_inner = self.map_type(inner_type)
-            return f'List[{mapped_inner}]'
-        
-        # Handle Tree: Tree<int> -> Optional[TreeNode[int]]
-        tree_match = re.match(r'Tree<(.+)>', dsl_type)
-        if tree_match:
-            inner_type = tree_match.group(1)
-            mapped_inner = self.map_type(inner_type)
-            return f'Optional[TreeNode[{mapped_inner}]]'
-        
-        # Handle simple Tree
-        if dsl_type == 'Tree':
+    def render(self, node: TypeNode) -> str:
+        # Handle arrays and generic List: int[], List<int> -> List[int]
+        if node.kind in ('array', 'list'):
+            return f'List[{self.render(node.element)}]'
+        
+        # Handle Tree: Tree<int> -> Optional[TreeNode[int]], Tree -> Optional[TreeNode]
+        if node.kind == 'tree':
+            if node.args:
+                return f'Optional[TreeNode[{self.render(node.element)}]]'
             return 'Optional[TreeNode]'
         
-        return self.TYPE_MAPPING.get(dsl_type, dsl_type)
+        return self.TYPE_MAPPING.get(node.name, node.name)
     
     def get_imports(self, dsl_types: List[str]) -> List[str]:
         imports = set()
         
         for dsl_type in dsl_types:
-            if 'List' in dsl_type or '[]' in dsl_type:
+            node = parse_type(dsl_type)
+            if node.contains('list') or node.contains('array'):
                 imports.add('from typing import List')
-            if 'Tree' in dsl_type:
+            if node.contains('tree'):
                 imports.add('from typing import Optional')
         
         return sorted(list(imports))
@@ -83,46 +221,40 @@ class JavaTypeMapper(TypeMapper):
         'Graph': 'Map<Integer, List<Integer>>'
     }
     
-    def map_type(self, dsl_type: str) -> str:
+    # Wrapper types used where Java generics cannot take primitives
+    BOXED_TYPES = {
+        'int': 'Integer',
+        'long': 'Long',
+        'float': 'Float',
+        'double': 'Double',
+        'boolean': 'Boolean'
+    }
+    
+    def render(self, node: TypeNode) -> str:
         # Handle arrays: int[] -> int[]
-        array_match = re.match(r'(\w+)\[\]', dsl_type)
-        if array_match:
-            base_type = array_match.group(1)
-            mapped_base = self.TYPE_MAPPING.get(base_type, base_type)
-            return f'{mapped_base}[]'
-        
-        # Handle generic List: List<int[]> -> List<int[]>
-        list_match = re.match(r'List<(.+)>', dsl_type)
-        if list_match:
-            inner_type = list_match.group(1)
-            mapped_inner = self.map_type(inner_type)
-            return f'List<{mapped_inner}>'
-        
-        # Handle Tree: Tree<int> -> TreeNode<Integer>
-        tree_match = re.match(r'Tree<(.+)>', dsl_type)
-        if tree_match:
-            inner_type = tree_match.group(1)
-            mapped_inner = self.map_type(inner_type)
-            # Convert primitive to wrapper for generics
-            if mapped_inner == 'int':
-                mapped_inner = 'Integer'
-            elif mapped_inner == 'boolean':
-                mapped_inner = 'Boolean'
-            return f'TreeNode<{mapped_inner}>'
-        
-        # Handle simple Tree
-        if dsl_type == 'Tree':
+        if node.kind == 'array':
+            return f'{self.render(node.element)}[]'
+        
+        # Handle generic List: List<int> -> List<Integer>, List<int[]> -> List<int[]>
+        if node.kind == 'list':
+            mapped_inner = self.render(node.element)
+            return f'List<{self.BOXED_TYPES.get(mapped_inner, mapped_inner)}>'
+        
+        # Handle Tree: Tree<int> and Tree -> TreeNode (the emitted TreeNode
+        # class holds an int and is not generic)
+        if node.kind == 'tree':
             return 'TreeNode'
         
-        return self.TYPE_MAPPING.get(dsl_type, dsl_type)
+        return self.TYPE_MAPPING.get(node.name, node.name)
     
     def get_imports(self, dsl_types: List[str]) -> List[str]:
         imports = set()
         
         for dsl_type in dsl_types:
-            if 'List' in dsl_type:
+            node = parse_type(dsl_type)
+            if node.contains('list'):
                 imports.add('import java.util.List;')
-            if 'Graph' in dsl_type:
+            if node.contains('graph'):
                 imports.add('import java.util.Map;')
                 imports.add('import java.util.List;')
         
@@ -142,43 +274,28 @@ class CppTypeMapper(TypeMapper):
         'Graph': 'unordered_map<int, vector<int>>'
     }
     
-    def map_type(self, dsl_type: str) -> str:
-        # Handle arrays: int[] -> vector<int>
-        array_match = re.match(r'(\w+)\[\]', dsl_type)
-        if array_match:
-            base_type = array_match.group(1)
-            mapped_base = self.TYPE_MAPPING.get(base_type, base_type)
-            return f'vector<{mapped_base}>'
-        
-        # Handle generic List: List<int[]> -> vector<vector<int>>
-        list_match = re.match(r'List<(.+)>', dsl_type)
-        if list_match:
-            inner_type = list_match.group(1)
-            mapped_inner = self.map_type(inner_type)
-            return f'vector<{mapped_inner}>'
-        
-        # Handle Tree: Tree<int> -> TreeNode<int>*
-        tree_match = re.match(r'Tree<(.+)>', dsl_type)
-        if tree_match:
-            inner_type = tree_match.group(1)
-            mapped_inner = self.map_type(inner_type)
-            return f'TreeNode<{mapped_inner}>*'
-        
-        # Handle simple Tree
-        if dsl_type == 'Tree':
+    def render(self, node: TypeNode) -> str:
+        # Handle arrays and generic List: int[], List<int> -> vector<int>
+        if node.kind in ('array', 'list'):
+            return f'vector<{self.render(node.element)}>'
+        
+        # Handle Tree: Tree<int> and Tree -> TreeNode* (the emitted TreeNode
+        # struct holds an int and is not a template)
+        if node.kind == 'tree':
             return 'TreeNode*'
         
-        return self.TYPE_MAPPING.get(dsl_type, dsl_type)
+        return self.TYPE_MAPPING.get(node.name, node.name)
     
     def get_imports(self, dsl_types: List[str]) -> List[str]:
         imports = set()
         
         for dsl_type in dsl_types:
-            if 'List' in dsl_type or '[]' in dsl_type:
+            node = parse_type(dsl_type)
+            if node.contains('list') or node.contains('array'):
                 imports.add('#include <vector>')
-            if 'string' in dsl_type:
+            if any(inner.name == 'string' for inner in node.walk()):
                 imports.add('#include <string>')
-            if 'Graph' in dsl_type:
+            if node.contains('graph'):
                 imports.add('#include <unordered_map>')
                 imports.add('#include <vector>')
         
@@ -188,62 +305,59 @@ class CppTypeMapper(TypeMapper):
 class JavaScriptTypeMapper(TypeMapper):
     """Type mapper for JavaScript."""
     
-    def map_type(self, dsl_type: str) -> str:
+    TYPE_MAPPING = {
+        'int': 'number',
+        'long': 'number',
+        'float': 'number',
+        'double': 'number',
+        'bool': 'boolean',
+        'string': 'string',
+        'Graph': 'Map<number, number[]>'
+    }
+    
+    def render(self, node: TypeNode) -> str:
         # JavaScript is dynamically typed, so we return generic descriptions
-        # Handle arrays: int[] -> number[]
-        array_match = re.match(r'(\w+)\[\]', dsl_type)
-        if array_match:
-            base_type = array_match.group(1)
-            js_base = self._get_js_type(base_type)
-            return f'{js_base}[]'
-        
-        # Handle generic List: List<int[]> -> number[][]
-        list_match = re.match(r'List<(.+)>', dsl_type)
-        if list_match:
-            inner_type = list_match.group(1)
-            mapped_inner = self.map_type(inner_type)
-            return f'{mapped_inner}[]'
+        # Handle arrays and generic List: int[] -> number[], List<int[]> -> number[][]
+        if node.kind in ('array', 'list'):
+            return f'{self.render(node.element)}[]'
         
         # Handle Tree: Tree<int> -> TreeNode
-        tree_match = re.match(r'Tree<(.+)>', dsl_type)
-        if tree_match:
-            return 'TreeNode'
-        
-        # Handle simple Tree
-        if dsl_type == 'Tree':
+        if node.kind == 'tree':
             return 'TreeNode'
         
-        if dsl_type == 'Graph':
-            return 'Map<number, number[]>'
-        
-        return self._get_js_type(dsl_type)
-    
-    def _get_js_type(self, dsl_type: str) -> str:
-        mapping = {
-            'int': 'number',
-            'long': 'number',
-            'float': 'number',
-            'double': 'number',
-            'bool': 'boolean',
-            'string': 'string'
-        }
-        return mapping.get(dsl_type, dsl_type)
+        return self.TYPE_MAPPING.get(node.name, node.name)
     
     def get_imports(self, dsl_types: List[str]) -> List[str]:
         # JavaScript doesn't require explicit imports for basic types
         return []
 
 
-def get_type_mapper(language: str) -> TypeMapper:
-    """Factory function to get the appropriate type mapper."""
-    mappers = {
-        'python': PythonTypeMapper(),
-        'java': JavaTypeMapper(),
-        'cpp': CppTypeMapper(),
-        'javascript': JavaScriptTypeMapper()
-    }
+# Mappers are stateless, so one instance per language is shared process-wide
+_TYPE_MAPPERS: Dict[str, TypeMapper] = {
+    'python': PythonTypeMapper(),
+    'java': JavaTypeMapper(),
+    'cpp': CppTypeMapper(),
+    'javascript': JavaScriptTypeMapper()
+}
+
+
+_TYPE_MAPPERS_LOCK = threading.Lock()
+
+
+def _register_type_mapper(language: str, mapper: TypeMapper) -> None:
+    """Register (or replace) the shared type mapper for a language.
     
-    if language not in mappers:
+    Generators capture their mapper when created, so go through
+    GeneratorFactory.register, which also drops the stale generator.
+    """
+    with _TYPE_MAPPERS_LOCK:
+        _TYPE_MAPPERS[language] = mapper
+
+
+def get_type_mapper(language: str) -> TypeMapper:
+    """Return the shared type mapper for the language."""
+    mapper = _TYPE_MAPPERS.get(language)
+    if mapper is None:
         raise ValueError(f"Unsupported language: {language}")
     
-    return mappers[language]
+    return mapper
@@ -0,0 +1,46 @@
+from benchmarks import run as bench_run
+from benchmarks.corpus import LANGUAGES, SIGNATURES, TYPES
+
+
+def document(rows):
+    return {"metadata": {}, "results": rows}
+
+
+class TestBenchmarkRunner:
+    """Test the benchmark runner and its regression check."""
+    
+    def test_corpus_covers_required_shapes(self):
+        assert {"int", "List<List<int>>", "Tree<int>", "Graph"} <= set(TYPES)
+        assert len(LANGUAGES) == 4
+        assert SIGNATURES
+    
+    def test_run_suites_tags_rows(self):
+        result = bench_run.run_suites(["mappers"], quick=True)
+        
+        assert result["metadata"]["quick"] is True
+        assert len(result["results"]) == len(LANGUAGES)
+        assert all(row["benchmark"] == "mappers" for row in result["results"])
+    
+    def test_compare_flags_slower_timings(self):
+        baseline = document([{"benchmark": "generation", "language": "java", "ns_per_template": 100.0}])
+        current = document([{"benchmark": "generation", "language": "java", "ns_per_template": 130.0}])
+        
+        regressions = bench_run.compare(baseline, current, threshold=0.1)
+        
+        assert len(regressions) == 1
+        assert regressions[0]["language"] == "java"
+        assert regressions[0]["metric"] == "ns_per_template"
+        assert bench_run.compare(baseline, current, threshold=0.5) == []
+    
+    def test_compare_flags_lower_throughput(self):
+        baseline = document([{"benchmark": "mappers", "language": "cpp", "types_per_second": 1000}])
+        faster = document([{"benchmark": "mappers", "language": "cpp", "types_per_second": 2000}])
+        slower = document([{"benchmark": "mappers", "language": "cpp", "types_per_second": 500}])
+        
+        assert bench_run.compare(baseline, faster, threshold=0.1) == []
+        assert bench_run.compare(baseline, slower, threshold=0.1)[0]["metric"] == "types_per_second"
+    
+    def test_compare_ignores_unmatched_rows(self):
+        baseline = document([{"benchmark": "generation", "language": "java", "ns_per_template": 100.0}])
+        current = document([{"benchmark": "generation", "language": "cpp", "ns_per_template": 900.0}])
+        assert bench_run.compare(baseline, current, threshold=0.1) == []
@@ -0,0 +1,81 @@
+import struct
+
+import pytest
+from src.binary_format import encode_test_case, encode_test_cases
+from src.models import FunctionSignature, Parameter, ReturnType
+
+
+def make_signature(*params):
+    return FunctionSignature(
+        function_name="solve",
+        parameters=[Parameter(name=name, type=dsl_type) for name, dsl_type in params],
+        returns=ReturnType(type="int")
+    )
+
+
+class TestEncodeTestCase:
+    """Test the binary input layout."""
+    
+    def test_scalars(self):
+        signature = make_signature(("a", "int"), ("b", "long"), ("c", "double"), ("d", "bool"))
+        encoded = encode_test_case(signature, {"a": -1, "b": 2**40, "c": 0.5, "d": True})
+        assert encoded == struct.pack("<iqd?", -1, 2**40, 0.5, True)
+    
+    def test_numeric_array(self):
+        encoded = encode_test_case(make_signature(("nums", "int[]")), {"nums": [1, 2, 3]})
+        assert encoded == struct.pack("<I3i", 3, 1, 2, 3)
+    
+    def test_string_is_length_prefixed_utf8(self):
+        encoded = encode_test_case(make_signature(("s", "string")), {"s": "é"})
+        assert encoded == struct.pack("<I", 2) + "é".encode("utf-8")
+    
+    def test_nested_collections(self):
+        signature = make_signature(("pairs", "List<int[]>"), ("words", "string[]"))
+        encoded = encode_test_case(signature, {"pairs": [[1], []], "words": ["ab"]})
+        assert encoded == (
+            struct.pack("<II", 2, 1) + struct.pack("<i", 1) + struct.pack("<I", 0)
+            + struct.pack("<II", 1, 2) + b"ab"
+        )
+    
+    def test_parameters_follow_signature_order(self):
+        signature = make_signature(("x", "int"), ("y", "int"))
+        assert encode_test_case(signature, {"y": 2, "x": 1}) == struct.pack("<ii", 1, 2)
+    
+    @pytest.mark.parametrize("values,message", [
+        ({}, "Missing value for parameter 'nums'"),
+        ({"nums": 3}, "Invalid value for parameter 'nums'"),
+        ({"nums": ["x"]}, "Invalid value for parameter 'nums'"),
+        ({"nums": [2**31]}, "Invalid value for parameter 'nums'"),
+    ])
+    def test_invalid_values(self, values, message):
+        with pytest.raises(ValueError, match=message):
+            encode_test_case(make_signature(("nums", "int[]")), values)
+    
+    @pytest.mark.parametrize("dsl_type,value", [
+        ("bool", 1),
+        ("bool", "yes"),
+        ("bool[]", [True, 0]),
+        ("int", True),
+        ("long[]", [1, False]),
+        ("double", True),
+    ])
+    def test_scalar_types_are_strict(self, dsl_type, value):
+        with pytest.raises(ValueError, match="Invalid value for parameter 'x'"):
+            encode_test_case(make_signature(("x", dsl_type)), {"x": value})
+    
+    @pytest.mark.parametrize("dsl_type", ["Tree<int>", "Graph", "List<Tree<int>>", "ListNode"])
+    def test_unsupported_types(self, dsl_type):
+        with pytest.raises(ValueError, match="Unsupported type for binary input"):
+            encode_test_case(make_signature(("x", dsl_type)), {"x": []})
+
+
+class TestEncodeTestCases:
+    """Test encoding several test cases."""
+    
+    def test_cases_are_concatenated(self):
+        signature = make_signature(("n", "int"))
+        assert encode_test_cases(signature, [{"n": 1}, {"n": 2}]) == struct.pack("<ii", 1, 2)
+    
+    def test_error_names_the_case(self):
+        with pytest.raises(ValueError, match="Case 1: Missing value"):
+            encode_test_cases(make_signature(("n", "int")), [{"n": 1}, {}])
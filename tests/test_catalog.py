@@ -0,0 +1,79 @@
+import pytest
+from src import catalog as catalog_module
+from src.cache import template_cache_key
+from src.catalog import TemplateCatalog, catalog_digest, write_catalog
+from src.models import GenerationOptions
+from src.service import TemplateService
+from tests.test_service import make_request, make_signature
+
+
+def key(function_name="twoSum", language="python", options=None):
+    return template_cache_key(make_signature(function_name), language, options)
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = tmp_path / "catalog.bin"
+    write_catalog(str(path), [
+        (catalog_digest(key("a")), "def a(): ¿"),
+        (catalog_digest(key("b")), "shared"),
+        (catalog_digest(key("c")), "shared"),
+    ])
+    return path
+
+
+class TestTemplateCatalog:
+    """Test writing and reading memory-mapped catalogs."""
+
+    def test_lookup(self, catalog_path):
+        catalog = TemplateCatalog(str(catalog_path))
+
+        assert len(catalog) == 3
+        assert catalog.get(key("a")) == "def a(): ¿"
+        assert catalog.get(key("c")) == "shared"
+        assert catalog.get(key("a", "java")) is None
+        assert catalog.get(key("a", options=GenerationOptions(fast_io=True))) is None
+        assert catalog.stats()["hits"] == 2
+        assert catalog.stats()["misses"] == 2
+        catalog.close()
+
+    def test_identical_templates_are_stored_once(self, catalog_path):
+        assert catalog_path.read_bytes().count(b"shared") == 1
+
+    def test_empty_catalog(self, tmp_path):
+        path = tmp_path / "empty.bin"
+        assert write_catalog(str(path), []) == 0
+        assert TemplateCatalog(str(path)).get(key()) is None
+
+    def test_rejects_other_files(self, tmp_path, catalog_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"not a catalog at all, just some bytes")
+        with pytest.raises(ValueError):
+            TemplateCatalog(str(path))
+        path.write_bytes(b"tiny")
+        with pytest.raises(ValueError):
+            TemplateCatalog(str(path))
+        path.write_bytes(catalog_path.read_bytes()[:60])
+        with pytest.raises(ValueError):
+            TemplateCatalog(str(path))
+
+    def test_rejects_stale_generator_version(self, catalog_path, monkeypatch):
+        monkeypatch.setattr(catalog_module, "GENERATOR_VERSION", "0")
+        with pytest.raises(ValueError, match="generator version"):
+            TemplateCatalog(str(catalog_path))
+
+
+class TestServiceCatalog:
+    """Test serving templates from a catalog."""
+
+    def test_catalog_hits_skip_generation_and_cache(self, tmp_path, monkeypatch):
+        path = tmp_path / "catalog.bin"
+        write_catalog(str(path), [(catalog_digest(key("twoSum", "cpp")), "// catalogued")])
+        service = TemplateService(catalog=TemplateCatalog(str(path)))
+        monkeypatch.setattr(service.generator_factory, "get_generator", lambda language: 1 / 0)
+
+        assert service.generate_template(make_request("cpp")).template == "// catalogued"
+        assert service.cache_stats()["size"] == 0
+        assert "template_catalog_hits_total 1" in service.render_metrics()
+        with pytest.raises(ValueError):
+            service.generate_template(make_request("java"))
@@ -0,0 +1,143 @@
+import json
+import os
+import pytest
+from src.cache import template_cache_key
+from src.catalog import TemplateCatalog
+from src.cli import main
+from src.models import TemplateRequest
+
+
+def make_request(question_id, language, function_name="twoSum"):
+    return {
+        "question_id": question_id,
+        "title": "Two Sum",
+        "description": "Given an integer array...",
+        "signature": {
+            "function_name": function_name,
+            "parameters": [
+                {"name": "nums", "type": "int[]"},
+                {"name": "target", "type": "int"}
+            ],
+            "returns": {"type": "int[]"}
+        },
+        "language": language
+    }
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    lines = [json.dumps(make_request(f"q{i}", language))
+             for i in range(5)
+             for language in ["python", "java", "cpp", "javascript"]]
+    lines.insert(3, "")
+    path = tmp_path / "requests.jsonl"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestGenerateCommand:
+    """Test the offline generate command."""
+
+    def test_ordered_jsonl_output(self, input_file, tmp_path):
+        output = tmp_path / "out.jsonl"
+        assert main(["generate", str(input_file), "--output", str(output), "--workers", "1", "--chunk-size", "3"]) == 0
+
+        results = read_jsonl(output)
+        assert len(results) == 20
+        assert [r["line"] for r in results] == sorted(r["line"] for r in results)
+        assert "class Solution:" in results[0]["template"]
+        assert results[1]["language"] == "java"
+
+    def test_process_pool_unordered(self, input_file, tmp_path):
+        output = tmp_path / "out.jsonl"
+        assert main(["generate", str(input_file), "-o", str(output), "-w", "2", "--chunk-size", "4", "--unordered"]) == 0
+
+        results = read_jsonl(output)
+        assert sorted(r["line"] for r in results) == [1, 2, 3] + list(range(5, 22))
+        assert all(r["template"] for r in results)
+
+    def test_process_pool_ordered(self, input_file, tmp_path):
+        output = tmp_path / "out.jsonl"
+        assert main(["generate", str(input_file), "-o", str(output), "-w", "2", "--chunk-size", "2"]) == 0
+
+        lines = [r["line"] for r in read_jsonl(output)]
+        assert lines == sorted(lines)
+
+    def test_output_dir(self, input_file, tmp_path):
+        output_dir = tmp_path / "templates"
+        assert main(["generate", str(input_file), "--output-dir", str(output_dir), "-w", "1"]) == 0
+
+        assert (output_dir / "q0" / "python" / "Solution.py").exists()
+        assert "public class Solution" in (output_dir / "q4" / "java" / "Solution.java").read_text()
+        assert len(os.listdir(output_dir)) == 5
+
+    def test_errors_set_exit_code(self, tmp_path, capsys):
+        path = tmp_path / "requests.jsonl"
+        path.write_text("\n".join([
+            json.dumps(make_request("../escape", "python")),
+            json.dumps(make_request("bad", "ruby")),
+            json.dumps(make_request("empty", "python", function_name="")),
+        ]))
+        output_dir = tmp_path / "templates"
+
+        assert main(["generate", str(path), "--output-dir", str(output_dir), "-w", "1"]) == 1
+
+        assert (output_dir / "_escape" / "python" / "Solution.py").exists()
+        stderr = capsys.readouterr().err
+        assert "line 2: Validation failed" in stderr
+        assert "line 3: Function name cannot be empty" in stderr
+        assert "Generated 1 templates (2 errors)" in stderr
+
+    def test_output_dir_collisions_are_errors(self, tmp_path, capsys):
+        path = tmp_path / "requests.jsonl"
+        path.write_text("\n".join([
+            json.dumps(make_request("two sum", "python")),
+            json.dumps(make_request("two/sum", "python")),
+            json.dumps(make_request("two sum", "java")),
+        ]))
+        output_dir = tmp_path / "templates"
+
+        assert main(["generate", str(path), "--output-dir", str(output_dir), "-w", "1"]) == 1
+
+        assert sorted(os.listdir(output_dir / "two_sum")) == ["java", "python"]
+        stderr = capsys.readouterr().err
+        assert "line 2: Output path" in stderr
+        assert "already written by line 1" in stderr
+        assert "Generated 2 templates (1 errors)" in stderr
+
+    def test_invalid_chunk_size(self, input_file):
+        with pytest.raises(SystemExit):
+            main(["generate", str(input_file), "--chunk-size", "0"])
+
+
+class TestBuildCatalogCommand:
+    """Test the build-catalog command."""
+
+    @pytest.mark.parametrize("workers", ["1", "2"])
+    def test_catalog_matches_generate(self, input_file, tmp_path, workers):
+        catalog_path = tmp_path / "catalog.bin"
+        output = tmp_path / "out.jsonl"
+
+        assert main(["build-catalog", str(input_file), "-o", str(catalog_path), "-w", workers, "--chunk-size", "3"]) == 0
+        assert main(["generate", str(input_file), "-o", str(output), "-w", "1"]) == 0
+
+        catalog = TemplateCatalog(str(catalog_path))
+        lines = [line for line in input_file.read_text().splitlines() if line]
+        for line, result in zip(lines, read_jsonl(output)):
+            request = TemplateRequest.model_validate_json(line)
+            assert catalog.get(template_cache_key(request.signature, request.language, request.options)) == result["template"]
+        # Requests differ only in question_id, so there is one entry per language
+        assert len(catalog) == 4
+
+    def test_errors_set_exit_code(self, tmp_path, capsys):
+        path = tmp_path / "requests.jsonl"
+        path.write_text(json.dumps(make_request("ok", "java")) + "\n" + json.dumps(make_request("bad", "ruby")) + "\n")
+
+        assert main(["build-catalog", str(path), "-o", str(tmp_path / "catalog.bin"), "-w", "1"]) == 1
+
+        assert len(TemplateCatalog(str(tmp_path / "catalog.bin"))) == 1
+        assert "Wrote 1 templates (1 errors)" in capsys.readouterr().err
@@ -1,10 +1,13 @@
 import pytest
+import threading
 from src.generators.factory import GeneratorFactory
 from src.generators.python_generator import PythonGenerator
 from src.generators.java_generator import JavaGenerator
 from src.generators.cpp_generator import CppGenerator
 from src.generators.javascript_generator import JavaScriptGenerator
-from src.models import FunctionSignature, Parameter, ReturnType
+from src.generators.fragments import CompiledTemplate
+from src.models import FunctionSignature, GenerationOptions, Parameter, ReturnType
+from src.type_mappers import PythonTypeMapper
 
 
 class TestGeneratorFactory:
@@ -29,6 +32,68 @@ class TestGeneratorFactory:
     def test_unsupported_language(self):
         with pytest.raises(ValueError):
             GeneratorFactory.get_generator("unsupported")
+    
+    def test_generators_are_shared(self):
+        assert GeneratorFactory.get_generator("python") is GeneratorFactory.get_generator("python")
+        assert GeneratorFactory.get_generator("java").type_mapper is GeneratorFactory.get_generator("java").type_mapper
+    
+    def test_concurrent_lookup_returns_one_instance(self):
+        seen = []
+        
+        def lookup():
+            seen.append(GeneratorFactory.get_generator("cpp"))
+        
+        threads = [threading.Thread(target=lookup) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len({id(generator) for generator in seen}) == 1
+    
+    def test_register_type_mapper_replaces_generator(self):
+        class CustomMapper(PythonTypeMapper):
+            pass
+        
+        mapper = CustomMapper()
+        original = GeneratorFactory.get_generator("python").type_mapper
+        GeneratorFactory.register("python", PythonGenerator, type_mapper=mapper)
+        try:
+            assert GeneratorFactory.get_generator("python").type_mapper is mapper
+        finally:
+            GeneratorFactory.register("python", PythonGenerator, type_mapper=original)
+        assert GeneratorFactory.get_generator("python").type_mapper is original
+    
+    def test_register_generator(self):
+        class CustomGenerator(PythonGenerator):
+            pass
+        
+        GeneratorFactory.register("custom", CustomGenerator)
+        try:
+            assert isinstance(GeneratorFactory.get_generator("custom"), CustomGenerator)
+        finally:
+            GeneratorFactory._generators.pop("custom")
+            GeneratorFactory._instances.pop("custom")
+
+
+class TestCompiledTemplate:
+    """Test the precompiled template fragments."""
+    
+    def test_render_fills_slots(self):
+        template = CompiledTemplate("int @{name}() {\n    return @{value};\n}")
+        assert template.slot_names == ["name", "value"]
+        assert template.render(name="f", value="0") == "int f() {\n    return 0;\n}"
+    
+    def test_static_text_only(self):
+        assert CompiledTemplate("{ plain }").render() == "{ plain }"
+    
+    def test_repeated_and_adjacent_slots(self):
+        template = CompiledTemplate("@{a}@{b}-@{a}")
+        assert template.render(a="x", b="y") == "xy-x"
+    
+    def test_missing_slot(self):
+        with pytest.raises(KeyError):
+            CompiledTemplate("@{a}").render()
 
 
 class TestPythonGenerator:
@@ -79,6 +144,8 @@ class TestPythonGenerator:
         assert "TreeNode" in template
         assert "Optional[TreeNode[int]]" in template
         assert "from typing import Optional" in template
+        assert template.startswith("from __future__ import annotations")
+        assert "queue.pop(0)" not in template
 
 
 class TestJavaGenerator:
@@ -115,6 +182,149 @@ class TestJavaGenerator:
         assert "int[] nums" in template
         assert "int target" in template
         assert "int[]" in template  # return type
+    
+    def test_primitive_arrays_skip_reflection(self):
+        signature = FunctionSignature(
+            function_name="solve",
+            parameters=[
+                Parameter(name="grid", type="int[][]"),
+                Parameter(name="nums", type="int[]"),
+                Parameter(name="flags", type="bool[]"),
+                Parameter(name="words", type="string[]")
+            ],
+            returns=ReturnType(type="int")
+        )
+        
+        template = JavaGenerator().generate_template(signature)
+        
+        assert 'int[][] grid = toIntArrayArray(data.getAsJsonArray("grid"));' in template
+        assert 'int[] nums = toIntArray(data.getAsJsonArray("nums"));' in template
+        assert 'boolean[] flags = toBooleanArray(data.getAsJsonArray("flags"));' in template
+        assert 'gson.fromJson(data.get("words"), String[].class)' in template
+        assert template.count("private static int[] toIntArray(JsonArray array)") == 1
+        assert "int[][] values = new int[array.size()][];" in template
+        assert "values[i] = array.get(i).getAsBoolean();" in template
+    
+    def test_fast_io_streams_parameters(self):
+        signature = FunctionSignature(
+            function_name="solve",
+            parameters=[
+                Parameter(name="root", type="Tree<int>"),
+                Parameter(name="grid", type="int[][]"),
+                Parameter(name="nums", type="int[]"),
+                Parameter(name="words", type="List<string>"),
+                Parameter(name="k", type="long")
+            ],
+            returns=ReturnType(type="Tree<int>")
+        )
+        
+        template = JavaGenerator().generate_template(signature, GenerationOptions(fast_io=True))
+        
+        assert "new JsonReader(" in template
+        assert "JsonObject" not in template
+        assert "StringBuilder" not in template
+        assert "root = readTree(reader);" in template
+        assert "grid = readIntArrayArray(reader);" in template
+        assert "words = readStringList(reader);" in template
+        assert "k = reader.nextLong();" in template
+        assert "long k = 0L;" in template
+        assert template.count("private static int[] readIntArray(") == 1
+        assert "writeTree(result, new JsonWriter(out));" in template
+    
+    def test_tree_result_is_serialized(self):
+        signature = FunctionSignature(
+            function_name="invertTree",
+            parameters=[Parameter(name="root", type="Tree<int>")],
+            returns=ReturnType(type="Tree<int>")
+        )
+        
+        template = JavaGenerator().generate_template(signature)
+        
+        assert "System.out.println(gson.toJson(serializeTree(result)));" in template
+        assert "result = serialized" not in template
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_multi_harness_mode(self, fast_io):
+        signature = FunctionSignature(
+            function_name="twoSum",
+            parameters=[Parameter(name="nums", type="int[]"), Parameter(name="target", type="int")],
+            returns=ReturnType(type="int[]")
+        )
+        
+        template = JavaGenerator().generate_template(
+            signature, GenerationOptions(fast_io=fast_io, harness_mode="multi")
+        )
+        
+        assert template.count("Solution solution = new Solution();") == 1
+        assert "out.flush();" in template
+        if fast_io:
+            assert "reader.setLenient(true);" in template
+            assert "while (reader.peek() != JsonToken.END_DOCUMENT) {" in template
+        else:
+            assert "if (line.isBlank()) continue;" in template
+            assert "            int target = gson.fromJson(data.get(\"target\"), int.class);" in template
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_instrument(self, fast_io):
+        signature = FunctionSignature(
+            function_name="twoSum",
+            parameters=[Parameter(name="nums", type="int[]"), Parameter(name="target", type="int")],
+            returns=ReturnType(type="int[]")
+        )
+        
+        template = JavaGenerator().generate_template(signature, GenerationOptions(fast_io=fast_io, instrument=True))
+        
+        assert "import java.lang.management.*;" in template
+        assert "        int[] result = solution.twoSum(nums, target);" in template
+        assert "getCurrentThreadCpuTime()" in template
+        assert 'System.err.println("#instrument wall_ns=" + wallNs' in template
+    
+    @pytest.mark.parametrize("harness_mode", ["single", "multi"])
+    def test_binary_input(self, harness_mode):
+        signature = FunctionSignature(
+            function_name="solve",
+            parameters=[
+                Parameter(name="nums", type="int[]"),
+                Parameter(name="pairs", type="List<int[]>"),
+                Parameter(name="words", type="string[]")
+            ],
+            returns=ReturnType(type="int")
+        )
+        
+        template = JavaGenerator().generate_template(
+            signature, GenerationOptions(input_format="binary", harness_mode=harness_mode)
+        )
+        
+        assert "ByteBuffer.wrap(System.in.readAllBytes()).order(ByteOrder.LITTLE_ENDIAN)" in template
+        assert "data.asIntBuffer().get(values);" in template
+        assert "List<int[]> pairs = readIntArrayList(data);" in template
+        assert "String[] words = readStringArray(data);" in template
+        assert template.count("private static int[] readIntArray(") == 1
+        assert template.count("private static String readString(") == 1
+        assert "JsonObject data" not in template
+        assert ("while (data.hasRemaining()) {" in template) == (harness_mode == "multi")
+    
+    def test_large_stack(self):
+        signature = FunctionSignature(
+            function_name="fibonacci",
+            parameters=[Parameter(name="n", type="int")],
+            returns=ReturnType(type="int")
+        )
+        
+        template = JavaGenerator().generate_template(signature, GenerationOptions(large_stack=True))
+        
+        assert '}, "harness", 256L << 20);' in template
+        assert "private static void runHarness() throws IOException {" in template
+        assert template.index("// Do not edit below this line") > template.index("runHarness() throws")
+    
+    def test_fast_io_unknown_type(self):
+        signature = FunctionSignature(
+            function_name="solve",
+            parameters=[Parameter(name="node", type="ListNode")],
+            returns=ReturnType(type="int")
+        )
+        with pytest.raises(ValueError):
+            JavaGenerator().generate_template(signature, GenerationOptions(fast_io=True))
 
 
 class TestCppGenerator:
@@ -151,6 +361,34 @@ class TestCppGenerator:
         assert "vector<int> nums" in template
         assert "vector<int>" in template  # return type
         assert "#include <vector>" in template
+    
+    def test_fast_io_mode(self):
+        signature = FunctionSignature(
+            function_name="invertTree",
+            parameters=[Parameter(name="root", type="Tree<int>")],
+            returns=ReturnType(type="Tree<int>")
+        )
+        
+        template = CppGenerator().generate_template(signature, GenerationOptions(fast_io=True))
+        
+        assert "ios::sync_with_stdio(false);" in template
+        assert "fread(chunk, 1, sizeof(chunk), stdin)" in template
+        assert "new TreeNode[count]" in template
+        assert "getline" not in template
+        assert "endl" not in template
+    
+    def test_multi_harness_mode(self):
+        signature = FunctionSignature(
+            function_name="fibonacci",
+            parameters=[Parameter(name="n", type="int")],
+            returns=ReturnType(type="int")
+        )
+        
+        template = CppGenerator().generate_template(signature, GenerationOptions(harness_mode="multi"))
+        
+        assert "while (getline(cin, line)) {" in template
+        assert "        auto n = data[\"n\"].get<int>();" in template
+        assert "cout << json(result) << endl;" in template
 
 
 class TestJavaScriptGenerator:
@@ -168,7 +406,7 @@ class TestJavaScriptGenerator:
         
         assert "function fibonacci(n)" in template
         assert "return 0;" in template
-        assert "const readline = require('readline')" in template
+        assert "Buffer.concat(chunks)" in template
     
     def test_array_parameters(self):
         signature = FunctionSignature(
@@ -186,3 +424,23 @@ class TestJavaScriptGenerator:
         assert "function twoSum(nums, target)" in template
         assert "number[]" in template  # in JSDoc comment
         assert "return [];" in template
+    
+    def test_typed_arrays(self):
+        signature = FunctionSignature(
+            function_name="solve",
+            parameters=[
+                Parameter(name="nums", type="int[]"),
+                Parameter(name="grid", type="float[][]"),
+                Parameter(name="big", type="long[]")
+            ],
+            returns=ReturnType(type="double[]")
+        )
+        
+        template = JavaScriptGenerator().generate_template(signature, GenerationOptions(typed_arrays=True))
+        
+        assert "{nums: Int32Array}, {grid: Float64Array[]}, {big: number[]}" in template
+        assert "return new Float64Array(0);" in template
+        assert "const nums = Int32Array.from(data.nums);" in template
+        assert "const grid = data.grid.map((item) => Float64Array.from(item));" in template
+        assert "const big = data.big;" in template
+        assert "JSON.stringify(result, typedArrayReplacer)" in template
@@ -0,0 +1,573 @@
+import glob
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmarks.bench_harness import compile_cpp, nlohmann_include_dir
+from src.binary_format import encode_test_cases
+from src.generators.factory import GeneratorFactory
+from src.models import FunctionSignature, GenerationOptions, Parameter, ReturnType
+
+SOLUTION_PLACEHOLDER = "        # Write your logic here\n        pass"
+
+
+def run_python_template(template, payload, body="        return None", raw_input=None, ndjson=False):
+    """Run a generated Python template in-process with payload as its stdin.
+
+    body replaces the empty solution method; the template's stdout is
+    parsed as JSON (one value per line when ndjson) and returned.
+    """
+    source = template.replace(SOLUTION_PLACEHOLDER, body)
+    data = raw_input if raw_input is not None else json.dumps(payload).encode("utf-8")
+    stdin = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+    stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    original = sys.stdin, sys.stdout
+    sys.stdin, sys.stdout = stdin, stdout
+    try:
+        exec(compile(source, "<template>", "exec"), {"__name__": "__main__"})
+        stdout.flush()
+    finally:
+        sys.stdin, sys.stdout = original
+    if ndjson:
+        return parse_ndjson(stdout.buffer.getvalue())
+    return json.loads(stdout.buffer.getvalue())
+
+
+def run_python_process(template, stdin, body, tmp_path):
+    """Run a generated Python template in a fresh interpreter; returns the CompletedProcess."""
+    path = tmp_path / "solution.py"
+    path.write_text(template.replace(SOLUTION_PLACEHOLDER, body))
+    return subprocess.run([sys.executable, str(path)], input=stdin, capture_output=True, timeout=60)
+
+
+def run_node_template(template, payload, tmp_path, body="    return null;", raw_input=None, ndjson=False):
+    """Run a generated JavaScript template with node and parse its JSON output."""
+    source = re.sub(r"    // Write your logic here\n    .*\n", lambda _: body + "\n", template, count=1)
+    path = tmp_path / "solution.js"
+    path.write_text(source)
+    stdin = raw_input if raw_input is not None else json.dumps(payload).encode("utf-8")
+    completed = subprocess.run(["node", str(path)], input=stdin, capture_output=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr.decode()
+    if ndjson:
+        return parse_ndjson(completed.stdout)
+    return json.loads(completed.stdout)
+
+
+def gson_jar():
+    """Find a Gson jar for compiling Java templates, or None."""
+    candidates = [os.environ.get("GSON_JAR"), "/usr/share/java/gson.jar"]
+    candidates += sorted(glob.glob(os.path.expanduser("~/.m2/repository/com/google/code/gson/gson/*/gson-*.jar")))
+    for candidate in candidates:
+        if candidate and os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def run_java_template(template, payload, tmp_path, body="        return null;"):
+    """Compile a generated Java template against Gson, run it and parse its JSON output."""
+    source = re.sub(r"        // Write your logic here\n        .*\n", lambda _: body + "\n", template, count=1)
+    (tmp_path / "Solution.java").write_text(source)
+    classpath = os.pathsep.join([str(tmp_path), gson_jar()])
+    compiled = subprocess.run(["javac", "-cp", classpath, "-d", str(tmp_path), str(tmp_path / "Solution.java")],
+                              capture_output=True, timeout=120)
+    assert compiled.returncode == 0, compiled.stderr.decode()
+    completed = subprocess.run(["java", "-cp", classpath, "Solution"], input=json.dumps(payload).encode("utf-8"),
+                               capture_output=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr.decode()
+    return json.loads(completed.stdout)
+
+
+def tree_signature():
+    return FunctionSignature(
+        function_name="invertTree",
+        parameters=[Parameter(name="root", type="Tree<int>")],
+        returns=ReturnType(type="Tree<int>")
+    )
+
+
+def ndjson_cases(trees):
+    """NDJSON stdin holding one tree test case per line, with a blank line in between."""
+    lines = [json.dumps({"root": tree}) for tree in trees]
+    lines.insert(1, "")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def parse_ndjson(output):
+    return [json.loads(line) for line in output.splitlines()]
+
+
+MULTI_TREES = [[1, 2, 3, None, 4], [], [7], [5, None, 6]]
+
+INSTRUMENT_LINE = re.compile(r"^#instrument wall_ns=\d+ cpu_ns=\d+ peak_kb=\d+$")
+
+
+def instrument_lines(stderr):
+    """Return the instrumentation lines of a harness's stderr, checking their format."""
+    lines = [line for line in stderr.splitlines() if line.startswith("#instrument")]
+    assert all(INSTRUMENT_LINE.match(line) for line in lines), lines
+    return lines
+
+
+def depth_signature():
+    return FunctionSignature(
+        function_name="depth",
+        parameters=[Parameter(name="root", type="Tree<int>")],
+        returns=ReturnType(type="int")
+    )
+
+
+def binary_signature():
+    return FunctionSignature(
+        function_name="describe",
+        parameters=[
+            Parameter(name="nums", type="int[]"),
+            Parameter(name="big", type="long[]"),
+            Parameter(name="xs", type="double[]"),
+            Parameter(name="pairs", type="List<int[]>"),
+            Parameter(name="words", type="string[]"),
+            Parameter(name="flag", type="bool")
+        ],
+        returns=ReturnType(type="string")
+    )
+
+
+# The string parameter leaves later arrays unaligned, exercising the copy paths
+BINARY_CASES = [
+    {"nums": [1, -2, 3], "big": [2**40], "xs": [0.5], "pairs": [[1, 2], [3]], "words": ["a", "é"], "flag": True},
+    {"nums": [], "big": [], "xs": [], "pairs": [], "words": [], "flag": False},
+]
+
+
+def binary_expected(cases):
+    """What a solution returning json of its arguments prints for each case."""
+    return [[case[name] for name in ("nums", "big", "xs", "pairs", "words", "flag")] for case in cases]
+
+
+def complete_tree(size):
+    return list(range(size))
+
+
+def skewed_tree(size):
+    """Level-order list of a right-leaning chain of size nodes."""
+    values = [0]
+    for value in range(1, size):
+        values.extend([None, value])
+    return values
+
+
+class TestPythonTreeHarness:
+    """Run generated Python templates on tree inputs."""
+    
+    def test_round_trip(self):
+        template = GeneratorFactory.get_generator("python").generate_template(tree_signature())
+        tree = [1, 2, 3, None, 4, None, 5]
+        assert run_python_template(template, {"root": tree}, "        return root") == tree
+    
+    def test_empty_tree(self):
+        template = GeneratorFactory.get_generator("python").generate_template(tree_signature())
+        assert run_python_template(template, {"root": []}, "        return root") == []
+    
+    def test_deep_tree_does_not_recurse(self):
+        template = GeneratorFactory.get_generator("python").generate_template(tree_signature())
+        tree = skewed_tree(100000)
+        assert run_python_template(template, {"root": tree}, "        return root") == tree
+    
+    def test_serialization_is_linear(self):
+        template = GeneratorFactory.get_generator("python").generate_template(tree_signature())
+        
+        def seconds(size):
+            payload = {"root": complete_tree(size)}
+            best = float("inf")
+            for _ in range(3):
+                started = time.perf_counter()
+                run_python_template(template, payload, "        return root")
+                best = min(best, time.perf_counter() - started)
+            return best
+        
+        small, large = seconds(25000), seconds(200000)
+        # 8x the nodes; a quadratic pass would take ~64x as long
+        assert large / small < 20
+
+
+class TestPythonFastIO:
+    """Run Python templates generated with fast_io."""
+    
+    def test_fast_io_prologue(self):
+        template = GeneratorFactory.get_generator("python").generate_template(
+            tree_signature(), GenerationOptions(fast_io=True)
+        )
+        assert "sys.stdin.buffer.read()" in template
+        assert "print(" not in template
+    
+    def test_fast_io_output_matches_default(self):
+        signature = FunctionSignature(
+            function_name="twoSum",
+            parameters=[Parameter(name="nums", type="int[]"), Parameter(name="target", type="int")],
+            returns=ReturnType(type="int[]")
+        )
+        payload = {"nums": list(range(1000)), "target": 7}
+        generator = GeneratorFactory.get_generator("python")
+        
+        default = generator.generate_template(signature)
+        fast = generator.generate_template(signature, GenerationOptions(fast_io=True))
+        
+        body = "        return nums[::-1]"
+        assert run_python_template(fast, payload, body) == run_python_template(default, payload, body)
+    
+    def test_fast_io_tree_round_trip(self):
+        template = GeneratorFactory.get_generator("python").generate_template(
+            tree_signature(), GenerationOptions(fast_io=True)
+        )
+        tree = [5, 3, 8, None, 4]
+        assert run_python_template(template, {"root": tree}, "        return root") == tree
+
+
+class TestPythonMultiHarness:
+    """Run Python templates generated with harness_mode=multi."""
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_one_result_per_case(self, fast_io):
+        template = GeneratorFactory.get_generator("python").generate_template(
+            tree_signature(), GenerationOptions(fast_io=fast_io, harness_mode="multi")
+        )
+        results = run_python_template(template, None, "        return root",
+                                      raw_input=ndjson_cases(MULTI_TREES), ndjson=True)
+        assert results == MULTI_TREES
+    
+    def test_fresh_solution_per_case(self):
+        signature = FunctionSignature(
+            function_name="count",
+            parameters=[Parameter(name="n", type="int")],
+            returns=ReturnType(type="int")
+        )
+        template = GeneratorFactory.get_generator("python").generate_template(
+            signature, GenerationOptions(harness_mode="multi")
+        )
+        body = "        self.calls = getattr(self, 'calls', 0) + 1\n        return n * 10 + self.calls"
+        raw = b'{"n": 1}\n{"n": 2}\n'
+        assert run_python_template(template, None, body, raw_input=raw, ndjson=True) == [11, 21]
+
+
+class TestPythonInstrument:
+    """Run Python templates generated with instrument."""
+    
+    @pytest.mark.parametrize("harness_mode", ["single", "multi"])
+    def test_one_line_per_call(self, capsys, harness_mode):
+        template = GeneratorFactory.get_generator("python").generate_template(
+            tree_signature(), GenerationOptions(harness_mode=harness_mode, instrument=True)
+        )
+        if harness_mode == "multi":
+            results = run_python_template(template, None, "        return root",
+                                          raw_input=ndjson_cases(MULTI_TREES), ndjson=True)
+            assert results == MULTI_TREES
+        else:
+            assert run_python_template(template, {"root": [1, 2]}, "        return root") == [1, 2]
+        
+        expected = len(MULTI_TREES) if harness_mode == "multi" else 1
+        assert len(instrument_lines(capsys.readouterr().err)) == expected
+
+
+class TestPythonLargeStack:
+    """Run Python templates generated with large_stack in their own process."""
+    
+    BODY = "        return 0 if root is None else 1 + max(self.depth(root.left), self.depth(root.right))"
+    
+    def test_deep_recursion(self, tmp_path):
+        template = GeneratorFactory.get_generator("python").generate_template(
+            depth_signature(), GenerationOptions(large_stack=True)
+        )
+        stdin = json.dumps({"root": skewed_tree(100000)}).encode()
+        
+        completed = run_python_process(template, stdin, self.BODY, tmp_path)
+        
+        assert completed.returncode == 0, completed.stderr.decode()
+        assert json.loads(completed.stdout) == 100000
+    
+    def test_failure_exits_nonzero(self, tmp_path):
+        template = GeneratorFactory.get_generator("python").generate_template(
+            depth_signature(), GenerationOptions(large_stack=True)
+        )
+        
+        completed = run_python_process(template, b'{"root": [1]}', "        raise KeyError('boom')", tmp_path)
+        
+        assert completed.returncode != 0
+        assert b"KeyError: 'boom'" in completed.stderr
+
+
+class TestPythonBinaryInput:
+    """Run Python templates generated with input_format=binary."""
+    
+    BODY = "        return json.dumps([nums, big, xs, pairs, words, flag])"
+    
+    @pytest.mark.parametrize("harness_mode", ["single", "multi"])
+    def test_decodes_encoded_cases(self, harness_mode):
+        template = GeneratorFactory.get_generator("python").generate_template(
+            binary_signature(), GenerationOptions(input_format="binary", harness_mode=harness_mode)
+        )
+        cases = BINARY_CASES if harness_mode == "multi" else BINARY_CASES[:1]
+        raw = encode_test_cases(binary_signature(), cases)
+        
+        results = run_python_template(template, None, self.BODY, raw_input=raw, ndjson=True)
+        
+        assert [json.loads(result) for result in results] == binary_expected(cases)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+class TestJavaScriptHarness:
+    """Run generated JavaScript templates with node."""
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_tree_round_trip(self, tmp_path, fast_io):
+        template = GeneratorFactory.get_generator("javascript").generate_template(
+            tree_signature(), GenerationOptions(fast_io=fast_io)
+        )
+        tree = [1, 2, 3, None, 4, None, 5]
+        assert run_node_template(template, {"root": tree}, tmp_path, "    return root;") == tree
+        assert run_node_template(template, {"root": []}, tmp_path, "    return root;") == []
+    
+    def test_multiline_input(self, tmp_path):
+        signature = FunctionSignature(
+            function_name="concat",
+            parameters=[Parameter(name="words", type="List<string>")],
+            returns=ReturnType(type="string")
+        )
+        template = GeneratorFactory.get_generator("javascript").generate_template(signature)
+        raw = json.dumps({"words": ["a", "b c"]}, indent=2).encode("utf-8")
+        
+        result = run_node_template(template, None, tmp_path, "    return words.join('|');", raw_input=raw)
+        
+        assert result == "a|b c"
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_multi_harness(self, tmp_path, fast_io):
+        template = GeneratorFactory.get_generator("javascript").generate_template(
+            tree_signature(), GenerationOptions(fast_io=fast_io, harness_mode="multi")
+        )
+        results = run_node_template(template, None, tmp_path, "    return root;",
+                                    raw_input=ndjson_cases(MULTI_TREES), ndjson=True)
+        assert results == MULTI_TREES
+    
+    @pytest.mark.parametrize("harness_mode", ["single", "multi"])
+    def test_binary_input(self, tmp_path, harness_mode):
+        template = GeneratorFactory.get_generator("javascript").generate_template(
+            binary_signature(), GenerationOptions(input_format="binary", harness_mode=harness_mode)
+        )
+        cases = BINARY_CASES if harness_mode == "multi" else BINARY_CASES[:1]
+        body = "    return JSON.stringify([nums, big, xs, pairs, words, flag]);"
+        
+        results = run_node_template(template, None, tmp_path, body,
+                                    raw_input=encode_test_cases(binary_signature(), cases), ndjson=True)
+        
+        assert [json.loads(result) for result in results] == binary_expected(cases)
+    
+    @pytest.mark.parametrize("input_format", ["json", "binary"])
+    def test_typed_arrays(self, tmp_path, input_format):
+        signature = FunctionSignature(
+            function_name="kinds",
+            parameters=[
+                Parameter(name="nums", type="int[]"),
+                Parameter(name="grid", type="double[][]"),
+                Parameter(name="big", type="long[]")
+            ],
+            returns=ReturnType(type="int[][]")
+        )
+        template = GeneratorFactory.get_generator("javascript").generate_template(
+            signature, GenerationOptions(typed_arrays=True, input_format=input_format)
+        )
+        case = {"nums": [1, -2, 3], "grid": [[0.5], []], "big": [2**40]}
+        raw_input = encode_test_cases(signature, [case]) if input_format == "binary" else None
+        body = ("    return [Int32Array.of(nums instanceof Int32Array, grid[0] instanceof Float64Array,"
+                " Array.isArray(big), big[0] === 2 ** 40), nums];")
+        
+        assert run_node_template(template, case, tmp_path, body, raw_input=raw_input) == [[1, 1, 1, 1], [1, -2, 3]]
+    
+    def test_typed_arrays_in_list_result(self, tmp_path):
+        signature = FunctionSignature(
+            function_name="rows",
+            parameters=[Parameter(name="nums", type="int[]")],
+            returns=ReturnType(type="List<List<int>>")
+        )
+        template = GeneratorFactory.get_generator("javascript").generate_template(
+            signature, GenerationOptions(typed_arrays=True)
+        )
+        body = "    return [nums, nums.subarray(1)];"
+        
+        assert run_node_template(template, {"nums": [4, 5, 6]}, tmp_path, body) == [[4, 5, 6], [5, 6]]
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_large_stack(self, tmp_path, fast_io):
+        template = GeneratorFactory.get_generator("javascript").generate_template(
+            depth_signature(), GenerationOptions(fast_io=fast_io, large_stack=True)
+        )
+        body = "    return root === null ? 0 : 1 + Math.max(depth(root.left), depth(root.right));"
+        
+        assert run_node_template(template, {"root": skewed_tree(200000)}, tmp_path, body) == 200000
+    
+    def test_instrument(self, tmp_path):
+        template = GeneratorFactory.get_generator("javascript").generate_template(
+            tree_signature(), GenerationOptions(harness_mode="multi", instrument=True)
+        )
+        source = re.sub(r"    // Write your logic here\n    .*\n", "    return root;\n", template, count=1)
+        (tmp_path / "solution.js").write_text(source)
+        completed = subprocess.run(["node", str(tmp_path / "solution.js")], input=ndjson_cases(MULTI_TREES),
+                                   capture_output=True, timeout=60, check=True)
+        
+        assert parse_ndjson(completed.stdout) == MULTI_TREES
+        assert len(instrument_lines(completed.stderr.decode())) == len(MULTI_TREES)
+    
+    def test_serialization_is_linear(self, tmp_path):
+        template = GeneratorFactory.get_generator("javascript").generate_template(tree_signature())
+        
+        def seconds(size):
+            tree = complete_tree(size)
+            started = time.perf_counter()
+            assert run_node_template(template, {"root": tree}, tmp_path, "    return root;") == tree
+            return time.perf_counter() - started
+        
+        small, large = seconds(25000), seconds(200000)
+        # 8x the nodes; the old queue.shift() harness took ~50x as long
+        assert large / small < 20
+
+
+@pytest.mark.skipif(shutil.which("g++") is None or nlohmann_include_dir() is None,
+                    reason="g++ or nlohmann/json is not installed")
+class TestCppHarness:
+    """Compile and run generated C++ templates."""
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_tree_round_trip(self, tmp_path, fast_io):
+        template = GeneratorFactory.get_generator("cpp").generate_template(
+            tree_signature(), GenerationOptions(fast_io=fast_io)
+        )
+        source = re.sub(r"// Write your logic here\n        .*\n", "return root;\n", template, count=1)
+        (tmp_path / "solution.cpp").write_text(source)
+        compile_cpp(str(tmp_path / "solution.cpp"), str(tmp_path / "solution"))
+        
+        def run(tree):
+            completed = subprocess.run([str(tmp_path / "solution")], input=json.dumps({"root": tree}).encode(),
+                                       capture_output=True, timeout=60, check=True)
+            return json.loads(completed.stdout)
+        
+        assert run([1, 2, 3, None, 4, None, 5, None, None]) == [1, 2, 3, None, 4, None, 5]
+        assert run([]) == []
+        assert run(skewed_tree(100000)) == skewed_tree(100000)
+        
+        # A regular file on stdin is read into a buffer reserved to its size
+        (tmp_path / "input.json").write_text(json.dumps({"root": complete_tree(1000)}))
+        with open(tmp_path / "input.json", "rb") as stdin:
+            completed = subprocess.run([str(tmp_path / "solution")], stdin=stdin,
+                                       capture_output=True, timeout=60, check=True)
+        assert json.loads(completed.stdout) == complete_tree(1000)
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_multi_harness(self, tmp_path, fast_io):
+        template = GeneratorFactory.get_generator("cpp").generate_template(
+            tree_signature(), GenerationOptions(fast_io=fast_io, harness_mode="multi")
+        )
+        source = re.sub(r"// Write your logic here\n        .*\n", "return root;\n", template, count=1)
+        (tmp_path / "solution.cpp").write_text(source)
+        compile_cpp(str(tmp_path / "solution.cpp"), str(tmp_path / "solution"))
+        
+        completed = subprocess.run([str(tmp_path / "solution")], input=ndjson_cases(MULTI_TREES),
+                                   capture_output=True, timeout=60, check=True)
+        assert parse_ndjson(completed.stdout) == MULTI_TREES
+    
+    def test_instrument(self, tmp_path):
+        template = GeneratorFactory.get_generator("cpp").generate_template(
+            tree_signature(), GenerationOptions(fast_io=True, instrument=True)
+        )
+        source = re.sub(r"// Write your logic here\n        .*\n", "return root;\n", template, count=1)
+        (tmp_path / "solution.cpp").write_text(source)
+        compile_cpp(str(tmp_path / "solution.cpp"), str(tmp_path / "solution"))
+        
+        completed = subprocess.run([str(tmp_path / "solution")], input=b'{"root": [1, 2, 3]}',
+                                   capture_output=True, timeout=60, check=True)
+        assert json.loads(completed.stdout) == [1, 2, 3]
+        assert len(instrument_lines(completed.stderr.decode())) == 1
+    
+    @pytest.mark.parametrize("harness_mode", ["single", "multi"])
+    def test_binary_input(self, tmp_path, harness_mode):
+        template = GeneratorFactory.get_generator("cpp").generate_template(
+            binary_signature(), GenerationOptions(input_format="binary", harness_mode=harness_mode)
+        )
+        body = "return json({nums, big, xs, pairs, words, flag}).dump();\n"
+        source = re.sub(r"// Write your logic here\n        .*\n", body, template, count=1)
+        (tmp_path / "solution.cpp").write_text(source)
+        compile_cpp(str(tmp_path / "solution.cpp"), str(tmp_path / "solution"))
+        cases = BINARY_CASES if harness_mode == "multi" else BINARY_CASES[:1]
+        
+        completed = subprocess.run([str(tmp_path / "solution")], input=encode_test_cases(binary_signature(), cases),
+                                   capture_output=True, timeout=60, check=True)
+        
+        assert [json.loads(result) for result in parse_ndjson(completed.stdout)] == binary_expected(cases)
+    
+    def test_large_stack(self, tmp_path):
+        template = GeneratorFactory.get_generator("cpp").generate_template(
+            depth_signature(), GenerationOptions(fast_io=True, large_stack=True)
+        )
+        body = "return root == nullptr ? 0 : 1 + max(depth(root->left), depth(root->right));\n"
+        source = re.sub(r"// Write your logic here\n        .*\n", body, template, count=1)
+        (tmp_path / "solution.cpp").write_text(source)
+        compile_cpp(str(tmp_path / "solution.cpp"), str(tmp_path / "solution"))
+        
+        completed = subprocess.run([str(tmp_path / "solution")], input=json.dumps({"root": skewed_tree(1000000)}).encode(),
+                                   capture_output=True, timeout=60, check=True)
+        assert json.loads(completed.stdout) == 1000000
+
+
+@pytest.mark.skipif(shutil.which("javac") is None or gson_jar() is None,
+                    reason="javac or the Gson jar is not installed")
+class TestJavaHarness:
+    """Compile and run generated Java templates."""
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_tree_round_trip(self, tmp_path, fast_io):
+        template = GeneratorFactory.get_generator("java").generate_template(
+            tree_signature(), GenerationOptions(fast_io=fast_io)
+        )
+        tree = [1, 2, 3, None, 4, None, 5]
+        
+        assert run_java_template(template, {"root": tree}, tmp_path, "        return root;") == tree
+    
+    def test_fast_io_decodes_each_parameter(self, tmp_path):
+        signature = FunctionSignature(
+            function_name="describe",
+            parameters=[
+                Parameter(name="nums", type="int[]"),
+                Parameter(name="rows", type="List<List<int>>"),
+                Parameter(name="root", type="Tree<int>"),
+                Parameter(name="word", type="string")
+            ],
+            returns=ReturnType(type="List<int>")
+        )
+        template = GeneratorFactory.get_generator("java").generate_template(signature, GenerationOptions(fast_io=True))
+        payload = {"ignored": {"a": [1]}, "nums": [4, 5, 6], "rows": [[], [7, 8]], "root": [1, None, 9], "word": "héllo"}
+        body = "        return Arrays.asList(nums.length, rows.get(1).get(0), root.right.val, word.length());"
+        
+        assert run_java_template(template, payload, tmp_path, body) == [3, 7, 9, 5]
+    
+    @pytest.mark.parametrize("fast_io", [False, True])
+    def test_primitive_array_decoders(self, tmp_path, fast_io):
+        signature = FunctionSignature(
+            function_name="decode",
+            parameters=[
+                Parameter(name="nums", type="int[]"),
+                Parameter(name="big", type="long[]"),
+                Parameter(name="xs", type="double[]"),
+                Parameter(name="grid", type="int[][]"),
+                Parameter(name="flags", type="bool[]")
+            ],
+            returns=ReturnType(type="double[]")
+        )
+        template = GeneratorFactory.get_generator("java").generate_template(signature, GenerationOptions(fast_io=fast_io))
+        payload = {"nums": [1, -2, 3], "big": [2**40], "xs": [0.25, 0.5], "grid": [[], [7]], "flags": [True, False]}
+        body = "        return new double[] {nums[2], big[0], xs[1], grid[1][0], flags[0] ? 1 : 0, grid[0].length};"
+        
+        assert run_java_template(template, payload, tmp_path, body) == [3, 2**40, 0.5, 7, 1, 0]
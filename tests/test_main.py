@@ -1,7 +1,14 @@
 import pytest
 import json
+import threading
+import asyncio
+import time
+import httpx
 from fastapi.testclient import TestClient
-from src.main import app
+from src import cache, main, responses
+from src.catalog import write_catalog
+from src.main import app, _cache_size_from_env, DEFAULT_CACHE_SIZE
+from src.service import TemplateService
 
 client = TestClient(app)
 
@@ -197,7 +204,7 @@ class TestTemplateGeneration:
         result = response.json()
         assert result["language"] == "javascript"
         assert "function twoSum(nums, target)" in result["template"]
-        assert "const readline = require('readline')" in result["template"]
+        assert "Buffer.concat(chunks)" in result["template"]
     
     def test_graph_problem(self):
         """Test Graph input: DetectCycle(graph: Graph) -> bool"""
@@ -285,3 +292,457 @@ class TestErrorHandling:
         
         response = client.post("/api/v1/template", json=request)
         assert response.status_code == 400
+
+
+class TestTemplateCache:
+    """Test the template cache endpoints."""
+    
+    def test_cache_stats_and_clear(self):
+        client.delete("/api/v1/cache")
+        request = {
+            "question_id": "fibonacci",
+            "title": "Fibonacci Number",
+            "description": "Calculate the nth Fibonacci number",
+            "signature": {
+                "function_name": "fibonacci",
+                "parameters": [{"name": "n", "type": "int"}],
+                "returns": {"type": "int"}
+            },
+            "language": "python"
+        }
+        
+        first = client.post("/api/v1/template", json=request)
+        second = client.post("/api/v1/template", json=request)
+        assert first.json() == second.json()
+        
+        stats = client.get("/api/v1/cache").json()
+        assert stats["hits"] >= 1
+        assert stats["size"] >= 1
+        
+        cleared = client.delete("/api/v1/cache").json()
+        assert cleared["size"] == 0
+
+
+class TestRequestCoalescing:
+    """Test that concurrent identical HTTP requests share one generation."""
+    
+    def test_concurrent_identical_requests_generate_once(self, monkeypatch):
+        service = TemplateService()
+        generate = service._generate
+        
+        def slow_generate(request, language):
+            # Keep the first generation in flight until every request has arrived
+            time.sleep(0.2)
+            return generate(request, language)
+        
+        monkeypatch.setattr(service, "_generate", slow_generate)
+        monkeypatch.setattr(main, "template_service", service)
+        
+        async def post_all(count):
+            async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+                return await asyncio.gather(*[
+                    http.post("/api/v1/template", json=FIBONACCI_REQUEST) for _ in range(count)
+                ])
+        
+        results = asyncio.run(post_all(8))
+        
+        assert [response.status_code for response in results] == [201] * 8
+        assert len({response.json()["template"] for response in results}) == 1
+        assert service.flights.stats() == {"leaders": 1, "coalesced": 7, "in_flight": 0}
+
+
+FIBONACCI_REQUEST = {
+    "question_id": "fibonacci",
+    "title": "Fibonacci Number",
+    "description": "Calculate the nth Fibonacci number",
+    "signature": {
+        "function_name": "fibonacci",
+        "parameters": [{"name": "n", "type": "int"}],
+        "returns": {"type": "int"}
+    },
+    "language": "python"
+}
+
+
+class TestMetricsEndpoint:
+    """Test the Prometheus metrics endpoint."""
+    
+    def test_metrics_endpoint(self):
+        payload = {
+            "question_id": "metrics",
+            "title": "Metrics",
+            "description": "",
+            "signature": {"function_name": "solve", "parameters": [], "returns": {"type": "int"}},
+            "language": "javascript"
+        }
+        assert client.post("/api/v1/template", json=payload).status_code == 201
+        
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE template_request_duration_seconds histogram" in response.text
+        assert 'template_requests_total{language="javascript"}' in response.text
+        assert 'template_stage_duration_seconds_count{language="javascript",stage="validate"}' in response.text
+
+
+class TestProfilerEndpoints:
+    """Test the sampling profiler endpoints."""
+    
+    def test_profiler_endpoints(self):
+        assert client.put("/api/v1/profile", json={"sample_every": -1}).status_code == 422
+        assert client.put("/api/v1/profile", json={"sample_every": 1}).json()["enabled"] is True
+        try:
+            payload = {
+                "question_id": "profile",
+                "title": "Profile",
+                "description": "",
+                "signature": {"function_name": "profiled", "parameters": [], "returns": {"type": "long"}},
+                "language": "cpp"
+            }
+            assert client.post("/api/v1/template", json=payload).status_code == 201
+            assert client.get("/api/v1/profile").json()["samples"] >= 1
+        
+            text = client.get("/api/v1/profile/stats", params={"sort": "tottime", "limit": 5})
+            assert text.status_code == 200
+            assert "function calls" in text.text
+            assert "generate_template" in client.get("/api/v1/profile/stats", params={"format": "collapsed"}).text
+            pstats_dump = client.get("/api/v1/profile/stats", params={"format": "pstats"})
+            assert pstats_dump.headers["content-type"] == "application/octet-stream"
+            assert client.get("/api/v1/profile/stats", params={"format": "svg"}).status_code == 400
+            assert client.get("/api/v1/profile/stats", params={"sort": "bogus"}).status_code == 400
+        finally:
+            client.put("/api/v1/profile", json={"sample_every": 0})
+            assert client.delete("/api/v1/profile").json()["samples"] == 0
+
+
+class TestTemplateETag:
+    """Test conditional and cacheable template requests."""
+    
+    def test_post_sets_etag_and_content_location(self):
+        response = client.post("/api/v1/template", json=FIBONACCI_REQUEST)
+        assert response.status_code == 201
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["content-location"].startswith("/api/v1/template/python/")
+    
+    def test_etag_ignores_question_metadata(self):
+        first = client.post("/api/v1/template", json=FIBONACCI_REQUEST)
+        second = client.post("/api/v1/template", json=dict(FIBONACCI_REQUEST, question_id="other"))
+        java = client.post("/api/v1/template", json=dict(FIBONACCI_REQUEST, language="java"))
+        assert first.headers["etag"] == second.headers["etag"]
+        assert first.headers["etag"] != java.headers["etag"]
+    
+    def test_if_none_match_skips_generation(self):
+        etag = client.post("/api/v1/template", json=FIBONACCI_REQUEST).headers["etag"]
+        client.delete("/api/v1/cache")
+        
+        response = client.post("/api/v1/template", json=FIBONACCI_REQUEST, headers={"If-None-Match": f'"stale", W/{etag}'})
+        
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert client.get("/api/v1/cache").json()["misses"] == 0
+    
+    def test_if_none_match_wildcard_is_not_honored(self):
+        invalid = dict(FIBONACCI_REQUEST, signature={
+            "function_name": "fibonacci",
+            "parameters": [{"name": "", "type": "int"}],
+            "returns": {"type": "int"}
+        })
+        
+        assert client.post("/api/v1/template", json=invalid, headers={"If-None-Match": "*"}).status_code == 400
+        assert client.post("/api/v1/template", json=FIBONACCI_REQUEST, headers={"If-None-Match": "*"}).status_code == 201
+    
+    def test_get_variant(self):
+        posted = client.post("/api/v1/template", json=FIBONACCI_REQUEST)
+        
+        response = client.get(posted.headers["content-location"])
+        
+        assert response.status_code == 200
+        assert response.json()["template"] == posted.json()["template"]
+        assert response.headers["etag"] == posted.headers["etag"]
+        assert "max-age" in response.headers["cache-control"]
+        
+        conditional = client.get(posted.headers["content-location"], headers={"If-None-Match": posted.headers["etag"]})
+        assert conditional.status_code == 304
+    
+    def test_options_change_etag_and_get_query(self):
+        default = client.post("/api/v1/template", json=FIBONACCI_REQUEST)
+        fast = client.post("/api/v1/template", json=dict(FIBONACCI_REQUEST, options={"fast_io": True}))
+        
+        assert fast.headers["etag"] != default.headers["etag"]
+        assert fast.headers["content-location"].endswith("?fast_io=true")
+        
+        response = client.get(fast.headers["content-location"])
+        assert response.json()["template"] == fast.json()["template"]
+        assert response.headers["etag"] == fast.headers["etag"]
+    
+    def test_get_variant_rejects_bad_token(self):
+        assert client.get("/api/v1/template/python/not-a-token").status_code == 400
+        assert client.get("/api/v1/template/python/e30").status_code == 400
+        assert client.get("/api/v1/template/ruby/e30").status_code == 422
+
+
+class TestFastJSONResponse:
+    """Test the pre-serialized template response."""
+    
+    def test_template_response_body(self):
+        response = client.post("/api/v1/template", json=dict(FIBONACCI_REQUEST, language="java"))
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["language"] == "java"
+        assert "class Solution" in response.json()["template"]
+    
+    def test_openapi_still_documents_template_response(self):
+        schema = client.get("/openapi.json").json()
+        content = schema["paths"]["/api/v1/template"]["post"]["responses"]["201"]["content"]
+        assert content["application/json"]["schema"]["$ref"].endswith("/TemplateResponse")
+    
+    def test_stdlib_fallback_matches_orjson(self, monkeypatch):
+        content = {"language": "python", "template": "def f():\n    return \"é\"\n"}
+        fast = responses.dumps_json(content)
+        monkeypatch.setattr(responses, "orjson", None)
+        assert responses.dumps_json(content) == fast
+        assert json.loads(fast) == content
+
+
+class TestBinaryInputConversion:
+    """Test the binary input conversion endpoint."""
+    
+    SIGNATURE = {
+        "function_name": "sum",
+        "parameters": [{"name": "nums", "type": "int[]"}],
+        "returns": {"type": "int"}
+    }
+    
+    def test_cases_are_encoded(self):
+        response = client.post("/api/v1/input/binary", json={
+            "signature": self.SIGNATURE,
+            "cases": [{"nums": [1, 2]}, {"nums": []}]
+        })
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert response.content == bytes([2, 0, 0, 0, 1, 0, 0, 0, 2, 0, 0, 0, 0, 0, 0, 0])
+    
+    def test_invalid_value(self):
+        response = client.post("/api/v1/input/binary", json={
+            "signature": self.SIGNATURE,
+            "cases": [{"nums": ["x"]}]
+        })
+        
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"].startswith("Case 0: Invalid value for parameter 'nums'")
+    
+    def test_template_rejects_unsupported_binary_type(self):
+        request = dict(FIBONACCI_REQUEST, options={"input_format": "binary"})
+        request["signature"] = dict(self.SIGNATURE, parameters=[{"name": "root", "type": "Tree<int>"}])
+        
+        response = client.post("/api/v1/template", json=request)
+        
+        assert response.status_code == 400
+        assert "Unsupported type for binary input" in response.json()["detail"]["error"]
+
+
+class TestBatchTemplateGeneration:
+    """Test the batch template endpoint."""
+    
+    def test_batch_items(self):
+        item = {
+            "question_id": "two-sum",
+            "title": "Two Sum",
+            "description": "Given an integer array...",
+            "signature": {
+                "function_name": "twoSum",
+                "parameters": [
+                    {"name": "nums", "type": "int[]"},
+                    {"name": "target", "type": "int"}
+                ],
+                "returns": {"type": "int[]"}
+            },
+            "language": "python"
+        }
+        
+        response = client.post("/api/v1/template/batch", json={
+            "items": [item, dict(item, language="java"), dict(item, language="ruby")]
+        })
+        assert response.status_code == 200
+        
+        result = response.json()
+        assert result["succeeded"] == 2
+        assert result["failed"] == 1
+        assert "def twoSum(self" in result["results"][0]["template"]
+        assert "public class Solution" in result["results"][1]["template"]
+        assert result["results"][2]["error"]["error"] == "Validation failed"
+    
+    def test_batch_signature_languages(self):
+        response = client.post("/api/v1/template/batch", json={
+            "question_id": "fibonacci",
+            "signature": {
+                "function_name": "fibonacci",
+                "parameters": [{"name": "n", "type": "int"}],
+                "returns": {"type": "int"}
+            },
+            "languages": ["cpp", "javascript"]
+        })
+        assert response.status_code == 200
+        
+        results = response.json()["results"]
+        assert [r["language"] for r in results] == ["cpp", "javascript"]
+        assert all(r["question_id"] == "fibonacci" for r in results)
+    
+    def test_batch_items_schema_is_documented(self):
+        schema = client.get("/openapi.json").json()["components"]["schemas"]["BatchTemplateRequest"]
+        assert "TemplateRequest" in json.dumps(schema["properties"]["items"])
+    
+    def test_batch_requires_one_form(self):
+        response = client.post("/api/v1/template/batch", json={})
+        assert response.status_code == 422
+
+
+@pytest.mark.parametrize("value,expected", [
+    (None, DEFAULT_CACHE_SIZE),
+    ("0", 0),
+    ("64", 64),
+    ("lots", DEFAULT_CACHE_SIZE),
+    ("-5", DEFAULT_CACHE_SIZE),
+])
+def test_cache_size_from_env(monkeypatch, value, expected):
+    """Test TEMPLATE_CACHE_SIZE parsing and fallback."""
+    if value is None:
+        monkeypatch.delenv("TEMPLATE_CACHE_SIZE", raising=False)
+    else:
+        monkeypatch.setenv("TEMPLATE_CACHE_SIZE", value)
+    assert _cache_size_from_env() == expected
+
+
+def test_catalog_from_env(monkeypatch, tmp_path):
+    """Test TEMPLATE_CATALOG_PATH loading; unusable catalogs are skipped."""
+    monkeypatch.delenv("TEMPLATE_CATALOG_PATH", raising=False)
+    assert main._catalog_from_env() is None
+    
+    monkeypatch.setenv("TEMPLATE_CATALOG_PATH", str(tmp_path / "missing.bin"))
+    assert main._catalog_from_env() is None
+    
+    path = tmp_path / "catalog.bin"
+    write_catalog(str(path), [])
+    monkeypatch.setenv("TEMPLATE_CATALOG_PATH", str(path))
+    assert len(main._catalog_from_env()) == 0
+
+
+def test_shared_cache_from_env(monkeypatch):
+    """Test TEMPLATE_REDIS_URL; without the redis package the shared tier is skipped."""
+    monkeypatch.delenv("TEMPLATE_REDIS_URL", raising=False)
+    assert main._shared_cache_from_env() is None
+    
+    monkeypatch.setenv("TEMPLATE_REDIS_URL", "redis://localhost:6379/0")
+    monkeypatch.setattr(cache, "redis", None)
+    assert main._shared_cache_from_env() is None
+
+
+def post_with_timeout(url, timeout=10, **kwargs):
+    """POST through the test client, failing instead of hanging the run."""
+    outcome = {}
+    
+    def send():
+        try:
+            outcome["response"] = client.post(url, **kwargs)
+        except Exception as e:
+            outcome["error"] = e
+    
+    thread = threading.Thread(target=send, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), f"POST {url} did not return within {timeout}s"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["response"]
+
+
+class TestStreamTemplateGeneration:
+    """Test the NDJSON streaming endpoint."""
+    
+    item = {
+        "question_id": "fibonacci",
+        "title": "Fibonacci Number",
+        "description": "Calculate the nth Fibonacci number",
+        "signature": {
+            "function_name": "fibonacci",
+            "parameters": [{"name": "n", "type": "int"}],
+            "returns": {"type": "int"}
+        },
+        "language": "python"
+    }
+    
+    def post_stream(self, body):
+        return post_with_timeout(
+            "/api/v1/template/stream",
+            content=body,
+            headers={"content-type": "application/x-ndjson"}
+        )
+    
+    def test_stream_lines(self):
+        body = "\n".join([
+            json.dumps(self.item),
+            "",
+            "not json",
+            json.dumps(dict(self.item, language="javascript")),
+        ])
+        
+        response = self.post_stream(body)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 3
+        assert lines[0]["language"] == "python"
+        assert "def fibonacci(self, n: int) -> int:" in lines[0]["template"]
+        assert lines[1]["error"] == "Validation failed"
+        assert lines[1]["details"]["line"] == 3
+        assert "function fibonacci(n)" in lines[2]["template"]
+    
+    def test_empty_body(self):
+        response = self.post_stream(b"")
+        assert response.status_code == 200
+        assert response.text == ""
+    
+    def test_request_envelope(self):
+        body = "\n".join([
+            json.dumps({"request_id": "req-1", "title": "Fib", "body": self.item}),
+            json.dumps({"request_id": "req-2", "title": "Note", "body": "free text"}),
+        ])
+        
+        lines = [json.loads(line) for line in self.post_stream(body).text.splitlines()]
+        assert lines[0]["request_id"] == "req-1"
+        assert "class Solution:" in lines[0]["template"]
+        assert lines[1]["error"] == "Validation failed"
+        assert lines[1]["details"]["request_id"] == "req-2"
+    
+    def test_oversized_line(self, monkeypatch):
+        monkeypatch.setattr(main, "STREAM_MAX_LINE_BYTES", 64)
+        body = "\n".join(["x" * 200, json.dumps({"request_id": "r", "body": "y" * 10})])
+        
+        lines = [json.loads(line) for line in self.post_stream(body).text.splitlines()]
+        assert lines[0]["error"] == "Line exceeds 64 bytes"
+        assert lines[0]["details"]["line"] == 1
+        assert lines[1]["details"]["line"] == 2
+
+
+def test_iter_request_lines_across_chunks():
+    """Test NDJSON line splitting when lines span many chunks."""
+    class ChunkedRequest:
+        def __init__(self, chunks):
+            self.chunks = chunks
+        
+        async def stream(self):
+            for chunk in self.chunks:
+                yield chunk
+    
+    async def collect(chunks, max_line_bytes):
+        request = ChunkedRequest(chunks)
+        return [line async for line in main._iter_request_lines(request, max_line_bytes)]
+    
+    body = b'{"a": 1}\n\n' + b"z" * 50 + b'\n{"b": 2}'
+    chunks = [body[i:i + 3] for i in range(0, len(body), 3)]
+    
+    assert asyncio.run(collect(chunks, 1024)) == [b'{"a": 1}', b"", b"z" * 50, b'{"b": 2}']
+    assert asyncio.run(collect(chunks, 16)) == [b'{"a": 1}', b"", None, b'{"b": 2}']
@@ -0,0 +1,75 @@
+import pytest
+from src.metrics import Counter, Histogram, MetricsRegistry
+
+
+class TestCounter:
+    """Test labelled counters."""
+
+    def test_inc_and_samples(self):
+        counter = Counter("requests_total", "Requests.", ("language",))
+        counter.inc("python")
+        counter.inc("python", amount=2)
+        counter.inc("java")
+
+        assert counter.value("python") == 3
+        assert counter.value("cpp") == 0
+        assert counter.samples() == ['requests_total{language="java"} 1', 'requests_total{language="python"} 3']
+
+    def test_label_values_are_escaped(self):
+        counter = Counter("errors_total", "Errors.", ("reason",))
+        counter.inc('a "b"\\\n')
+        assert counter.samples() == ['errors_total{reason="a \\"b\\"\\\\\\n"} 1']
+
+
+class TestHistogram:
+    """Test labelled histograms."""
+
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram("size_bytes", "Sizes.", ("language",), buckets=(10, 100))
+        for value in (5, 10, 50, 500):
+            histogram.observe(value, "python")
+
+        assert histogram.snapshot("python") == ([2, 3, 4], 565)
+        assert histogram.samples() == [
+            'size_bytes_bucket{language="python",le="10"} 2',
+            'size_bytes_bucket{language="python",le="100"} 3',
+            'size_bytes_bucket{language="python",le="+Inf"} 4',
+            'size_bytes_sum{language="python"} 565',
+            'size_bytes_count{language="python"} 4',
+        ]
+
+    def test_empty_snapshot(self):
+        histogram = Histogram("latency_seconds", "Latency.", buckets=(0.5,))
+        assert histogram.snapshot() == ([0, 0], 0)
+        assert histogram.samples() == []
+
+
+class TestMetricsRegistry:
+    """Test the text exposition output."""
+
+    def test_render(self):
+        registry = MetricsRegistry()
+        registry.counter("hits_total", "Hits.").inc()
+        registry.histogram("latency_seconds", "Latency.", buckets=(0.25,)).observe(0.5)
+        registry.callback("entries", "Entries.", "gauge", lambda: 7)
+
+        assert registry.render() == "\n".join([
+            "# HELP hits_total Hits.",
+            "# TYPE hits_total counter",
+            "hits_total 1",
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{le="0.25"} 0',
+            'latency_seconds_bucket{le="+Inf"} 1',
+            "latency_seconds_sum 0.5",
+            "latency_seconds_count 1",
+            "# HELP entries Entries.",
+            "# TYPE entries gauge",
+            "entries 7",
+        ]) + "\n"
+
+    def test_duplicate_name(self):
+        registry = MetricsRegistry()
+        registry.counter("hits_total", "Hits.")
+        with pytest.raises(ValueError):
+            registry.counter("hits_total", "Hits.")
@@ -0,0 +1,86 @@
+import pstats
+
+import pytest
+from src.profiling import SamplingProfiler, _collapse
+from src.service import TemplateService
+from tests.test_service import make_request
+
+
+def profiled_service(sample_every):
+    service = TemplateService(cache_enabled=False, profile_sample_every=sample_every)
+    for language in ["python", "java", "cpp", "javascript"]:
+        service.generate_template(make_request(language))
+    return service
+
+
+class TestSamplingProfiler:
+    """Test the sampling profiler."""
+
+    def test_disabled_by_default(self):
+        service = profiled_service(0)
+        assert service.profiler.status() == {"enabled": False, "sample_every": 0, "samples": 0, "skipped": 0}
+        assert service.profiler.pstats_text() == ""
+        assert service.profiler.collapsed() == ""
+
+    def test_samples_one_in_n(self):
+        service = profiled_service(2)
+        assert service.profiler.samples == 2
+        assert "generate_template" in service.profiler.pstats_text(sort="tottime", limit=5)
+
+    def test_collapsed_stacks(self):
+        lines = profiled_service(1).profiler.collapsed().splitlines()
+        stacks = [line.rsplit(" ", 1) for line in lines]
+
+        assert all(int(weight) > 0 for _, weight in stacks)
+        assert all(stack.startswith("_generate (service.py:") for stack, _ in stacks)
+        assert any("generate_template (java_generator.py:" in stack for stack, _ in stacks)
+
+    def test_collapsed_drops_unsampled_roots(self):
+        root, child, finalizer = ("a.py", 1, "root"), ("a.py", 5, "child"), ("b.py", 1, "__del__")
+        stats = {
+            root: (1, 1, 0.5, 1.0, {}),
+            child: (1, 1, 0.5, 0.5, {root: (1, 1, 0.5, 0.5)}),
+            finalizer: (1, 1, 0.25, 0.25, {}),
+        }
+
+        assert _collapse(stats, {root}) == {(root,): 0.5, (root, child): 0.5}
+        assert (finalizer,) in _collapse(stats)
+
+    def test_collapsed_recursion_keeps_root(self):
+        root, recursive = ("a.py", 1, "root"), ("a.py", 5, "walk")
+        stats = {
+            root: (1, 1, 0.5, 1.0, {}),
+            recursive: (3, 1, 0.5, 0.5, {root: (1, 1, 0.2, 0.5), recursive: (2, 2, 0.3, 0.3)}),
+        }
+
+        collapsed = _collapse(stats, {root})
+        assert all(stack[0] == root for stack in collapsed)
+        assert sum(collapsed.values()) == pytest.approx(1.0)
+
+    def test_pstats_dump(self, tmp_path):
+        path = tmp_path / "templates.prof"
+        path.write_bytes(profiled_service(1).profiler.pstats_dump())
+
+        functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+        assert "_generate" in functions
+
+    def test_busy_profiler_skips_sample(self):
+        profiler = SamplingProfiler(1)
+        with profiler._lock:
+            assert profiler.run_sampled(len, "abc") == 3
+        assert profiler.status()["skipped"] == 1
+        assert profiler.samples == 0
+
+    def test_configure_and_reset(self):
+        profiler = SamplingProfiler(1)
+        profiler.run_sampled(len, "abc")
+        profiler.configure(0)
+        profiler.run_sampled(len, "abc")
+        assert profiler.samples == 1
+
+        profiler.reset()
+        assert profiler.samples == 0
+        with pytest.raises(ValueError):
+            profiler.configure(-1)
+        with pytest.raises(ValueError):
+            profiler.pstats_text(sort="bogus")
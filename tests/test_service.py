@@ -0,0 +1,377 @@
+import pytest
+from src import cache as cache_module
+from src.cache import (
+    RedisCacheBackend,
+    TemplateCache,
+    TieredTemplateCache,
+    shared_cache_key,
+    template_cache_key,
+    template_digest,
+)
+from src.models import (
+    BatchTemplateRequest,
+    FunctionSignature,
+    GenerationOptions,
+    Parameter,
+    ReturnType,
+    TemplateRequest,
+)
+from src.service import TemplateService
+
+
+def make_signature(function_name="twoSum"):
+    return FunctionSignature(
+        function_name=function_name,
+        parameters=[
+            Parameter(name="nums", type="int[]"),
+            Parameter(name="target", type="int")
+        ],
+        returns=ReturnType(type="int[]")
+    )
+
+
+def make_request(language="python", question_id="two-sum", function_name="twoSum", options=None):
+    return TemplateRequest(
+        question_id=question_id,
+        title="Two Sum",
+        description="Given an integer array...",
+        signature=make_signature(function_name),
+        language=language,
+        options=options or GenerationOptions()
+    )
+
+
+class TestTemplateCacheKey:
+    """Test the canonical cache key."""
+
+    def test_key_is_stable(self):
+        assert template_cache_key(make_signature(), "python") == template_cache_key(make_signature(), "python")
+
+    def test_key_depends_on_language(self):
+        assert template_cache_key(make_signature(), "python") != template_cache_key(make_signature(), "java")
+
+    def test_key_depends_on_signature(self):
+        assert template_cache_key(make_signature("a"), "python") != template_cache_key(make_signature("b"), "python")
+
+    def test_key_depends_on_options(self):
+        default = template_cache_key(make_signature(), "python")
+        assert default == template_cache_key(make_signature(), "python", GenerationOptions())
+        assert default != template_cache_key(make_signature(), "python", GenerationOptions(fast_io=True))
+        assert default != template_cache_key(make_signature(), "python", GenerationOptions(harness_mode="multi"))
+        assert default != template_cache_key(make_signature(), "python", GenerationOptions(instrument=True))
+        assert default != template_cache_key(make_signature(), "python", GenerationOptions(input_format="binary"))
+        assert default != template_cache_key(make_signature(), "python", GenerationOptions(large_stack=True))
+        assert default != template_cache_key(make_signature(), "python", GenerationOptions(typed_arrays=True))
+    
+    def test_digest_is_stable_hex(self):
+        digest = template_digest(template_cache_key(make_signature(), "python"))
+        assert digest == template_digest(template_cache_key(make_signature(), "python"))
+        assert len(digest) == 64
+
+
+class TestTemplateCache:
+    """Test the LRU template cache."""
+
+    def test_hit_and_miss_counters(self):
+        cache = TemplateCache(max_size=2)
+        assert cache.get("a") is None
+        cache.put("a", "template")
+        assert cache.get("a") == "template"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+
+    def test_lru_eviction(self):
+        cache = TemplateCache(max_size=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert cache.stats()["evictions"] == 1
+
+    def test_disabled_cache(self):
+        cache = TemplateCache(max_size=0)
+        cache.put("a", "1")
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_clear(self):
+        cache = TemplateCache()
+        cache.put("a", "1")
+        cache.get("a")
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 0
+
+    def test_negative_size(self):
+        with pytest.raises(ValueError):
+            TemplateCache(max_size=-1)
+
+
+class FakeRedis:
+    """In-process stand-in for the redis.Redis calls RedisCacheBackend makes."""
+    
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.round_trips = 0
+        self.down = False
+    
+    def _round_trip(self):
+        if self.down:
+            raise ConnectionError("connection refused")
+        self.round_trips += 1
+    
+    def mget(self, keys):
+        self._round_trip()
+        return [self.values.get(key) for key in keys]
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+    
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value, ex))
+    
+    def execute(self):
+        self.client._round_trip()
+        for key, value, ex in self.commands:
+            self.client.values[key] = value.encode("utf-8")
+            self.client.ttls[key] = ex
+        return [True] * len(self.commands)
+
+
+class TestTieredTemplateCache:
+    """Test the local LRU in front of a shared store."""
+    
+    def keys(self, count):
+        return [template_cache_key(make_signature(f"f{i}"), "python") for i in range(count)]
+    
+    def test_write_through_and_shared_hits(self):
+        client = FakeRedis()
+        writer = TieredTemplateCache(RedisCacheBackend(client), ttl=60)
+        reader = TieredTemplateCache(RedisCacheBackend(client))
+        key = self.keys(1)[0]
+        
+        writer.put(key, "template")
+        assert client.ttls[shared_cache_key(key)] == 60
+        assert reader.get(key) == "template"
+        # The shared hit is kept locally
+        assert reader.get(key) == "template"
+        assert client.round_trips == 2
+        assert reader.stats()["shared"]["hits"] == 1
+        assert reader.stats()["hits"] == 1
+    
+    def test_disabled_cache_skips_both_tiers(self):
+        client = FakeRedis()
+        cache = TieredTemplateCache(RedisCacheBackend(client), max_size=0)
+        key = self.keys(1)[0]
+        
+        cache.put(key, "template")
+        cache.put_many({key: "template"})
+        assert cache.get(key) is None
+        assert cache.get_many([key]) == {}
+        assert client.round_trips == 0
+    
+    def test_many_use_one_round_trip(self):
+        client = FakeRedis()
+        cache = TieredTemplateCache(RedisCacheBackend(client))
+        keys = self.keys(5)
+        
+        cache.put_many({key: f"t{i}" for i, key in enumerate(keys[:3])})
+        cache.clear()
+        found = cache.get_many(keys)
+        
+        assert found == {key: f"t{i}" for i, key in enumerate(keys[:3])}
+        assert client.round_trips == 2
+        assert cache.stats()["shared"]["misses"] == 2
+    
+    def test_down_backend_is_skipped(self):
+        client = FakeRedis()
+        client.down = True
+        cache = TieredTemplateCache(RedisCacheBackend(client), retry_after=60)
+        key = self.keys(1)[0]
+        
+        assert cache.get(key) is None
+        cache.put(key, "template")
+        assert cache.get(key) == "template"
+        assert cache.stats()["shared"] == {"available": False, "ttl": 86400, "hits": 0, "misses": 0, "errors": 1}
+        
+        client.down = False
+        cache.retry_after = 0
+        cache._retry_at = 0
+        cache.put(key, "template")
+        assert client.values[shared_cache_key(key)] == b"template"
+    
+    def test_from_url_needs_redis(self, monkeypatch):
+        monkeypatch.setattr(cache_module, "redis", None)
+        with pytest.raises(ValueError):
+            RedisCacheBackend.from_url("redis://localhost:6379/0")
+
+
+class TestTemplateService:
+    """Test the template service."""
+
+    def test_repeat_request_hits_cache(self):
+        service = TemplateService()
+        first = service.generate_template(make_request())
+        second = service.generate_template(make_request(question_id="other-id"))
+
+        assert first.template == second.template
+        stats = service.cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_languages_are_cached_separately(self):
+        service = TemplateService()
+        python = service.generate_template(make_request("python"))
+        java = service.generate_template(make_request("java"))
+
+        assert python.template != java.template
+        assert service.cache_stats()["size"] == 2
+
+    def test_options_are_cached_separately(self):
+        service = TemplateService()
+        default = service.generate_template(make_request())
+        fast = make_request(options=GenerationOptions(fast_io=True))
+        
+        assert service.generate_template(fast).template != default.template
+        assert service.cache_stats()["size"] == 2
+    
+    def test_cache_can_be_disabled(self):
+        service = TemplateService(cache_enabled=False)
+        service.generate_template(make_request())
+        service.generate_template(make_request())
+
+        assert service.cache_stats()["size"] == 0
+        assert service.cache_stats()["hits"] == 0
+
+    def test_clear_cache(self):
+        service = TemplateService()
+        service.generate_template(make_request())
+        service.clear_cache()
+        assert service.cache_stats()["size"] == 0
+    
+    def test_metrics(self):
+        service = TemplateService()
+        request = make_request("java")
+        for _ in range(2):
+            service.validate_request(request)
+            template = service.generate_template(request).template
+        
+        assert service.requests_total.value("java") == 2
+        assert service.request_duration.snapshot("java")[0][-1] == 2
+        assert service.template_size.snapshot("java")[1] == 2 * len(template.encode("utf-8"))
+        assert service.stage_duration.snapshot("java", "validate")[0][-1] == 2
+        # The second request is a cache hit and skips generation
+        for stage in ("generator_lookup", "type_mapping", "assembly"):
+            assert service.stage_duration.snapshot("java", stage)[0][-1] == 1
+        
+        text = service.render_metrics()
+        assert 'template_requests_total{language="java"} 2' in text
+        assert "template_cache_hits_total 1" in text
+        assert "template_cache_entries 1" in text
+    
+    def test_error_metrics(self, monkeypatch):
+        service = TemplateService()
+        with pytest.raises(ValueError):
+            service.validate_request(make_request(function_name=""))
+        with pytest.raises(ValueError):
+            service.validate_request(TemplateRequest.model_construct(
+                signature=make_signature(), language="ruby", options=GenerationOptions()
+            ))
+        generator = service.generator_factory.get_generator("cpp")
+        monkeypatch.setattr(generator, "generate_template", lambda *args: 1 / 0)
+        with pytest.raises(ValueError):
+            service.generate_template(make_request("cpp"))
+        
+        assert service.errors_total.value("python", "validate") == 1
+        assert service.errors_total.value("other", "validate") == 1
+        assert service.errors_total.value("cpp", "assembly") == 1
+        assert service.requests_total.value("cpp") == 0
+
+
+class TestGenerateBatch:
+    """Test batch template generation."""
+
+    def test_items_with_duplicates_are_generated_once(self):
+        service = TemplateService()
+        item = make_request().model_dump(mode="json")
+        batch = BatchTemplateRequest(items=[item, dict(item, question_id="copy"), dict(item, language="java")])
+
+        response = service.generate_batch(batch)
+
+        assert response.succeeded == 3
+        assert response.results[0].template == response.results[1].template
+        assert response.results[1].question_id == "copy"
+        assert response.results[2].language == "java"
+        assert service.cache_stats()["misses"] == 2
+
+    def test_signature_with_languages(self):
+        service = TemplateService()
+        batch = BatchTemplateRequest(
+            question_id="two-sum",
+            signature=make_signature(),
+            languages=["python", "java", "cpp", "javascript"]
+        )
+
+        response = service.generate_batch(batch)
+
+        assert [result.language for result in response.results] == ["python", "java", "cpp", "javascript"]
+        assert all(result.template for result in response.results)
+
+    def test_shared_cache_round_trips(self):
+        client = FakeRedis()
+        batch = BatchTemplateRequest(signature=make_signature(), languages=["python", "java", "cpp"])
+        
+        first = TemplateService(shared_cache=RedisCacheBackend(client)).generate_batch(batch)
+        assert client.round_trips == 2
+        
+        # Another process sharing the store generates nothing
+        other = TemplateService(shared_cache=RedisCacheBackend(client))
+        other.generator_factory = None
+        second = other.generate_batch(batch)
+        
+        assert client.round_trips == 3
+        assert [r.template for r in second.results] == [r.template for r in first.results]
+        assert "template_shared_cache_hits_total 3" in other.render_metrics()
+    
+    def test_per_item_errors(self):
+        service = TemplateService()
+        valid = make_request().model_dump(mode="json")
+        invalid = dict(valid, language="ruby")
+        empty_name = make_request(function_name="").model_dump(mode="json")
+
+        response = service.generate_batch(BatchTemplateRequest(items=[invalid, valid, empty_name]))
+
+        assert response.succeeded == 1
+        assert response.failed == 2
+        assert response.results[0].error.error == "Validation failed"
+        assert "language" in response.results[0].error.details
+        assert response.results[1].template
+        assert response.results[2].error.error == "Function name cannot be empty"
+
+    def test_batch_size_limit(self, monkeypatch):
+        monkeypatch.setattr(BatchTemplateRequest, "max_items", 2)
+        item = make_request().model_dump(mode="json")
+        with pytest.raises(ValueError):
+            BatchTemplateRequest(items=[item, item, item])
+        with pytest.raises(ValueError):
+            BatchTemplateRequest(signature=make_signature(), languages=["python", "java", "cpp"])
+
+    def test_batch_form_is_exclusive(self):
+        with pytest.raises(ValueError):
+            BatchTemplateRequest(items=[], signature=make_signature(), languages=["python"])
+        with pytest.raises(ValueError):
+            BatchTemplateRequest(signature=make_signature())
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+from src.service import TemplateService
+from src.singleflight import SingleFlight
+from tests.test_service import make_request
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def run_threads(count, target):
+    outcomes = [None] * count
+
+    def run(index):
+        try:
+            outcomes[index] = target()
+        except Exception as e:
+            outcomes[index] = e
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return outcomes
+
+
+class TestSingleFlight:
+    """Test single-flight deduplication."""
+
+    def test_concurrent_calls_share_one_result(self):
+        flights = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            # Hold the flight open until every other caller has joined it
+            wait_for(lambda: flights.coalesced == 4)
+            return "result"
+
+        assert run_threads(5, lambda: flights.do("key", compute)) == ["result"] * 5
+        assert len(calls) == 1
+        assert flights.stats() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+
+    def test_errors_are_shared(self):
+        flights = SingleFlight()
+
+        def fail():
+            wait_for(lambda: flights.coalesced == 2)
+            raise KeyError("boom")
+
+        outcomes = run_threads(3, lambda: flights.do("key", fail))
+        assert all(isinstance(outcome, KeyError) for outcome in outcomes)
+        assert len(flights) == 0
+
+    def test_sequential_calls_run_again(self):
+        flights = SingleFlight()
+        assert flights.do("key", len, "ab") == 2
+        assert flights.do("key", len, "abc") == 3
+        assert flights.do("other", len, "") == 0
+        assert flights.stats()["leaders"] == 3
+        assert flights.stats()["coalesced"] == 0
+
+
+class TestServiceCoalescing:
+    """Test that the service generates concurrent identical requests once."""
+
+    @pytest.mark.parametrize("cache_enabled", [True, False])
+    def test_identical_misses_are_coalesced(self, monkeypatch, cache_enabled):
+        service = TemplateService(cache_enabled=cache_enabled)
+        generator = service.generator_factory.get_generator("java")
+        generate = generator.generate_template
+
+        def slow_generate(*args):
+            wait_for(lambda: service.flights.coalesced == 7)
+            return generate(*args)
+
+        monkeypatch.setattr(generator, "generate_template", slow_generate)
+        templates = run_threads(8, lambda: service.generate_template(make_request("java")).template)
+
+        assert len(set(templates)) == 1
+        assert "public class Solution" in templates[0]
+        text = service.render_metrics()
+        assert "template_generations_total 1" in text
+        assert "template_coalesced_requests_total 7" in text
+        assert service.requests_total.value("java") == 8
@@ -1,13 +1,56 @@
 import pytest
+from src import type_mappers
 from src.type_mappers import (
     PythonTypeMapper,
     JavaTypeMapper,
     CppTypeMapper,
     JavaScriptTypeMapper,
-    get_type_mapper
+    TypeNode,
+    get_type_mapper,
+    parse_type
 )
 
 
+class TestParseType:
+    """Test the DSL type parser."""
+    
+    def test_primitive(self):
+        assert parse_type("int") == TypeNode("primitive", "int")
+    
+    def test_array(self):
+        node = parse_type("int[]")
+        assert node.kind == "array"
+        assert node.element == TypeNode("primitive", "int")
+    
+    def test_nested_list(self):
+        node = parse_type("List<List<int>>")
+        assert node.kind == "list"
+        assert node.element.kind == "list"
+        assert node.element.element.name == "int"
+    
+    def test_tree_and_graph(self):
+        assert parse_type("Tree").kind == "tree"
+        assert parse_type("Tree<int>").element.name == "int"
+        assert parse_type("Graph").kind == "graph"
+        assert parse_type("List<Tree>").contains("tree")
+        assert not parse_type("List<int>").contains("tree")
+    
+    def test_nodes_are_interned(self):
+        assert parse_type("List<int[]>") is parse_type("List< int[] >")
+        assert parse_type("List<int[]>").element is parse_type("int[]")
+    
+    def test_unknown_types_pass_through(self):
+        assert parse_type("Foo") == TypeNode("named", "Foo")
+        assert parse_type("Map<int,int>") == TypeNode("named", "Map<int,int>")
+        assert parse_type("List<int") == TypeNode("named", "List<int")
+    
+    def test_caches_are_bounded(self):
+        before = len(type_mappers._interned)
+        parse_type("List<Bogus>>")
+        assert len(type_mappers._interned) == before
+        assert parse_type.cache_info().maxsize == type_mappers.PARSE_CACHE_SIZE
+
+
 class TestPythonTypeMapper:
     """Test Python type mapper."""
     
@@ -32,6 +75,8 @@ class TestPythonTypeMapper:
         
         assert mapper.map_type("List<int>") == "List[int]"
         assert mapper.map_type("List<int[]>") == "List[List[int]]"
+        assert mapper.map_type("List<List<int>>") == "List[List[int]]"
+        assert mapper.map_type("int[][]") == "List[List[int]]"
     
     def test_tree_types(self):
         mapper = PythonTypeMapper()
@@ -74,14 +119,14 @@ class TestJavaTypeMapper:
     def test_list_types(self):
         mapper = JavaTypeMapper()
         
-        assert mapper.map_type("List<int>") == "List<int>"
+        assert mapper.map_type("List<int>") == "List<Integer>"
         assert mapper.map_type("List<int[]>") == "List<int[]>"
     
     def test_tree_types(self):
         mapper = JavaTypeMapper()
         
         assert mapper.map_type("Tree") == "TreeNode"
-        assert mapper.map_type("Tree<int>") == "TreeNode<Integer>"
+        assert mapper.map_type("Tree<int>") == "TreeNode"
 
 
 class TestCppTypeMapper:
@@ -105,7 +150,7 @@ class TestCppTypeMapper:
         mapper = CppTypeMapper()
         
         assert mapper.map_type("Tree") == "TreeNode*"
-        assert mapper.map_type("Tree<int>") == "TreeNode<int>*"
+        assert mapper.map_type("Tree<int>") == "TreeNode*"
 
 
 class TestJavaScriptTypeMapper:
@@ -138,6 +183,7 @@ def test_get_type_mapper():
     assert isinstance(get_type_mapper("java"), JavaTypeMapper)
     assert isinstance(get_type_mapper("cpp"), CppTypeMapper)
     assert isinstance(get_type_mapper("javascript"), JavaScriptTypeMapper)
+    assert get_type_mapper("python") is get_type_mapper("python")
     
     with pytest.raises(ValueError):
         get_type_mapper("unsupported")